@@ -0,0 +1,52 @@
+"""Add foreign-key, listing and lookup indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+Indexes are built CONCURRENTLY so existing tables stay writable during the
+upgrade; that needs to run outside the migration transaction.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_utility_bills_user_id_created_at', 'utility_bills',
+     ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], None),
+    ('ix_utility_bills_user_id_billing_year', 'utility_bills', ['user_id', 'billing_year'], None),
+    ('ix_utility_bills_contract_id', 'utility_bills', ['contract_id'], None),
+    ('ix_bill_positions_bill_id', 'bill_positions', ['bill_id'], None),
+    ('ix_check_results_bill_id', 'check_results', ['bill_id'], None),
+    ('ix_objection_letters_bill_id', 'objection_letters', ['bill_id'], None),
+    ('ix_rental_contracts_user_id_created_at', 'rental_contracts', ['user_id', sa.text('created_at DESC')], None),
+    ('ix_feedback_user_id_created_at', 'feedback', ['user_id', sa.text('created_at DESC')], None),
+    ('ix_users_verification_token', 'users', ['verification_token'], 'verification_token IS NOT NULL'),
+    ('ix_users_reset_token', 'users', ['reset_token'], 'reset_token IS NOT NULL'),
+    ('ix_users_stripe_customer_id', 'users', ['stripe_customer_id'], 'stripe_customer_id IS NOT NULL'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
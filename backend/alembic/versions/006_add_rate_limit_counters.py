@@ -0,0 +1,33 @@
+"""Add rate_limit_counters
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+UNLOGGED: counters are throwaway state, so skip the WAL; a crash just resets them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rate_limit_counters',
+        sa.Column('key', sa.String(255), primary_key=True),
+        sa.Column('window_index', sa.BigInteger(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('prev_count', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.BigInteger(), nullable=False),
+        prefixes=['UNLOGGED'],
+    )
+    op.create_index('ix_rate_limit_counters_expires_at', 'rate_limit_counters', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rate_limit_counters_expires_at', table_name='rate_limit_counters')
+    op.drop_table('rate_limit_counters')
@@ -0,0 +1,31 @@
+"""Add ocr_results
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ocr_results',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('document_sha256', sa.String(64), primary_key=True),
+        sa.Column('extractor', sa.String(100), primary_key=True),
+        sa.Column('result', postgresql.JSONB(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_ocr_results_created_at', 'ocr_results', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ocr_results_created_at', table_name='ocr_results')
+    op.drop_table('ocr_results')
@@ -0,0 +1,37 @@
+"""Index utility_bills.document_path for document reference counts
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+Built CONCURRENTLY, like the indexes of 005.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_utility_bills_document_path',
+            'utility_bills',
+            ['document_path'],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('document_path IS NOT NULL'),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_utility_bills_document_path',
+            table_name='utility_bills',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""Turn email_logs into the outbox of the email dispatcher
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('email_logs', sa.Column('text_body', sa.Text(), nullable=True))
+    op.add_column('email_logs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column(
+        'email_logs',
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column('email_logs', sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_email_logs_outbox_due',
+        'email_logs',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_logs_outbox_due', table_name='email_logs')
+    op.drop_column('email_logs', 'sent_at')
+    op.drop_column('email_logs', 'next_attempt_at')
+    op.drop_column('email_logs', 'attempts')
+    op.drop_column('email_logs', 'text_body')
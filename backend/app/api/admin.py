@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
@@ -13,7 +13,10 @@ from app.models.objection_letter import ObjectionLetter
 from app.schemas.user import UserRead, UserAdminUpdate
 from app.schemas.feedback import FeedbackRead, FeedbackAdminUpdate, FeedbackReadWithUser
 from app.core.auth import get_admin_user
-from app.services.email_service import send_feedback_response_email
+from app.core import user_cache
+from app.core.security import token_cache_stats
+from app.services.email_service import build_feedback_response_email
+from app.services import pdf_renderer, ocr_preprocess, email_outbox, bill_recheck
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -48,6 +51,39 @@ async def get_stats(
     }
 
 
+@router.get("/pdf-render-stats")
+async def get_pdf_render_stats(admin: User = Depends(get_admin_user)):
+    """Queue depth, counters and latency of the PDF render pool of this API process."""
+    return pdf_renderer.stats.snapshot()
+
+
+@router.get("/token-cache-stats")
+async def get_token_cache_stats(admin: User = Depends(get_admin_user)):
+    """Hit/miss counters of the verified access-token cache of this API process."""
+    return token_cache_stats()
+
+
+@router.get("/ocr-preprocess-stats")
+async def get_ocr_preprocess_stats(admin: User = Depends(get_admin_user)):
+    """Bytes saved by shrinking OCR uploads in this API process."""
+    return ocr_preprocess.stats.snapshot()
+
+
+@router.post("/recheck-bills")
+async def recheck_bills(
+    after_id: int = Query(0, ge=0, description="next_after_id of the previous call"),
+    limit: int = Query(bill_recheck.RECHECK_BATCH_SIZE, ge=1, le=bill_recheck.RECHECK_MAX_BATCH_SIZE),
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Re-run all checks on one page of checked bills, e.g. after the reference
+    tables changed. Call again with after_id=next_after_id until it is null;
+    each call is committed on its own, so a timed-out call can simply be repeated.
+    """
+    return await bill_recheck.recheck_page(db, after_id=after_id, limit=limit)
+
+
 @router.get("/users", response_model=List[UserRead])
 async def list_users(
     admin: User = Depends(get_admin_user),
@@ -89,6 +125,7 @@ async def update_user(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(user, field, value)
+    user_cache.invalidate(user.id, db)
     db.add(user)
     await db.flush()
     await db.refresh(user)
@@ -139,15 +176,8 @@ async def update_feedback(
 
     # Send email notification if admin responded
     if data.admin_response and fb.user and old_status != fb.status:
-        import asyncio
-        asyncio.create_task(
-            send_feedback_response_email(
-                fb.user.email,
-                fb.user.name,
-                fb.title,
-                data.admin_response,
-            )
-        )
+        subject, html = build_feedback_response_email(fb.user.name, fb.title, data.admin_response)
+        email_outbox.enqueue(db, fb.user.email, subject, html)
 
     return fb
 
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 import secrets
 import logging
-import time
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -14,38 +13,35 @@ from app.models.user import User
 from app.schemas.auth import LoginRequest, Token
 from app.schemas.user import UserCreate, UserRead
 from app.core.security import (
-    hash_password, verify_password,
+    hash_password_async, verify_password_async, password_needs_rehash,
     create_access_token, create_refresh_token, decode_refresh_token,
 )
 from app.core.auth import get_current_user
+from app.core import user_cache
+from app.core.rate_limit import get_limiter
 from app.config import settings
+from app.services import email_outbox
 from app.services.email_service import (
-    send_email, build_welcome_email, build_verification_email,
-    build_password_reset_email,
+    build_welcome_email, build_verification_email, build_password_reset_email,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# In-memory rate limiter for auth endpoints: max attempts per IP per 15 minutes
-_auth_attempts: dict[str, list[float]] = defaultdict(list)
+# Rate limit for auth endpoints: max attempts per IP per 15 minutes (login and register share the count)
 _LOGIN_LIMIT = 10
 _REGISTER_LIMIT = 5
 _AUTH_WINDOW = 15 * 60  # 15 minutes
 
 
-def _check_auth_rate_limit(request: Request, limit: int):
+async def _check_auth_rate_limit(request: Request, limit: int):
     ip = request.client.host if request.client else "unknown"
-    now = time.time()
-    window_start = now - _AUTH_WINDOW
-    attempts = [t for t in _auth_attempts[ip] if t > window_start]
-    _auth_attempts[ip] = attempts
-    if len(attempts) >= limit:
-        retry_after = int(_AUTH_WINDOW - (now - attempts[0]))
+    retry_after = await get_limiter().hit(f"auth:{ip}", limit, _AUTH_WINDOW)
+    if retry_after is not None:
         raise HTTPException(
             status_code=429,
-            detail=f"Zu viele Versuche. Bitte in {retry_after // 60} Minuten erneut versuchen.",
+            detail=f"Zu viele Versuche. Bitte in {math.ceil(retry_after / 60)} Minuten erneut versuchen.",
+            headers={"Retry-After": str(retry_after)},
         )
-    _auth_attempts[ip].append(now)
 
 
 COOKIE_SETTINGS = {
@@ -62,7 +58,7 @@ def _set_cookies(response: Response, access_token: str, refresh_token: str) -> N
 
 @router.post("/register", response_model=UserRead, status_code=201)
 async def register(request: Request, data: UserCreate, response: Response, db: AsyncSession = Depends(get_db)):
-    _check_auth_rate_limit(request, _REGISTER_LIMIT)
+    await _check_auth_rate_limit(request, _REGISTER_LIMIT)
     result = await db.execute(select(User).where(User.email == data.email.lower()))
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="E-Mail bereits registriert")
@@ -75,7 +71,7 @@ async def register(request: Request, data: UserCreate, response: Response, db: A
     user = User(
         email=data.email.lower(),
         name=data.name,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
         role=role,
         is_verified=False,
         verification_token=verification_token,
@@ -85,19 +81,14 @@ async def register(request: Request, data: UserCreate, response: Response, db: A
     await db.flush()
     await db.refresh(user)
 
+    # Queued with the new user; the outbox dispatcher sends them after the commit
     verify_url = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
-    try:
-        html, text = build_verification_email(user.name, verify_url)
-        await send_email(user.email, "E-Mail verifizieren – MietCheck", html, text)
-    except Exception as e:
-        logger.warning("Email send failed: %s", e)
+    html, text = build_verification_email(user.name, verify_url)
+    email_outbox.enqueue(db, user.email, "E-Mail verifizieren – MietCheck", html, text)
 
     # Send welcome email after verification would be ideal, but send now for UX
-    try:
-        html, text = build_welcome_email(user.name)
-        await send_email(user.email, "Willkommen bei MietCheck!", html, text)
-    except Exception as e:
-        logger.warning("Email send failed: %s", e)
+    html, text = build_welcome_email(user.name)
+    email_outbox.enqueue(db, user.email, "Willkommen bei MietCheck!", html, text)
 
     # Auto-login after registration
     access_token = create_access_token(user.id, user.role)
@@ -109,11 +100,11 @@ async def register(request: Request, data: UserCreate, response: Response, db: A
 
 @router.post("/login")
 async def login(request: Request, data: LoginRequest, response: Response, db: AsyncSession = Depends(get_db)):
-    _check_auth_rate_limit(request, _LOGIN_LIMIT)
+    await _check_auth_rate_limit(request, _LOGIN_LIMIT)
     result = await db.execute(select(User).where(User.email == data.email.lower()))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.password_hash):
+    if not user or not await verify_password_async(data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Ungültige E-Mail oder Passwort")
 
     if not user.is_active:
@@ -122,6 +113,11 @@ async def login(request: Request, data: LoginRequest, response: Response, db: As
     if not user.is_verified:
         raise HTTPException(status_code=403, detail="Bitte verifizieren Sie zuerst Ihre E-Mail-Adresse")
 
+    # Upgrade hashes from an older BCRYPT_ROUNDS while the plain password is at hand;
+    # only for logins that succeed, since a 403 rolls the new hash back anyway
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(data.password)
+
     access_token = create_access_token(user.id, user.role)
     refresh_token = create_refresh_token(user.id, user.role)
     _set_cookies(response, access_token, refresh_token)
@@ -182,6 +178,7 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     user.is_verified = True
     user.verification_token = None
     user.verification_token_expires = None
+    user_cache.invalidate(user.id, db)
     await db.commit()
 
     return {"message": "E-Mail erfolgreich verifiziert"}
@@ -197,14 +194,11 @@ async def resend_verification(data: dict, db: AsyncSession = Depends(get_db)):
         token = secrets.token_urlsafe(32)
         user.verification_token = token
         user.verification_token_expires = datetime.now(timezone.utc) + timedelta(hours=48)
-        await db.commit()
 
         verify_url = f"{settings.FRONTEND_URL}/verify-email?token={token}"
-        try:
-            html, text = build_verification_email(user.name, verify_url)
-            await send_email(user.email, "E-Mail verifizieren – MietCheck", html, text)
-        except Exception as e:
-            logger.warning("Email send failed: %s", e)
+        html, text = build_verification_email(user.name, verify_url)
+        email_outbox.enqueue(db, user.email, "E-Mail verifizieren – MietCheck", html, text)
+        await db.commit()
 
     return {"message": "Falls ein unverifiziertes Konto existiert, wurde die E-Mail erneut gesendet."}
 
@@ -219,14 +213,11 @@ async def forgot_password(data: dict, db: AsyncSession = Depends(get_db)):
         token = secrets.token_urlsafe(32)
         user.reset_token = token
         user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
-        await db.commit()
 
         reset_url = f"{settings.FRONTEND_URL}/reset-password?token={token}"
-        try:
-            html, text = build_password_reset_email(user.name, reset_url)
-            await send_email(user.email, "Passwort zurücksetzen – MietCheck", html, text)
-        except Exception as e:
-            logger.warning("Email send failed: %s", e)
+        html, text = build_password_reset_email(user.name, reset_url)
+        email_outbox.enqueue(db, user.email, "Passwort zurücksetzen – MietCheck", html, text)
+        await db.commit()
 
     return {"message": "Falls ein Konto mit dieser E-Mail existiert, wurde eine E-Mail gesendet."}
 
@@ -248,9 +239,10 @@ async def reset_password(data: dict, db: AsyncSession = Depends(get_db)):
     if user.reset_token_expires < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Token abgelaufen – bitte erneut anfordern")
 
-    user.password_hash = hash_password(new_password)
+    user.password_hash = await hash_password_async(new_password)
     user.reset_token = None
     user.reset_token_expires = None
+    user_cache.invalidate(user.id, db)
     await db.commit()
 
     return {"message": "Passwort erfolgreich geändert"}
@@ -265,13 +257,14 @@ async def change_password(
     current_password = data.get("current_password", "")
     new_password = data.get("new_password", "")
 
-    if not verify_password(current_password, current_user.password_hash):
+    if not await verify_password_async(current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Aktuelles Passwort ist falsch")
 
     if len(new_password) < 8:
         raise HTTPException(status_code=400, detail="Neues Passwort muss mindestens 8 Zeichen lang sein")
 
-    current_user.password_hash = hash_password(new_password)
+    current_user.password_hash = await hash_password_async(new_password)
+    user_cache.invalidate(current_user.id, db)
     await db.commit()
 
     return {"message": "Passwort erfolgreich geändert"}
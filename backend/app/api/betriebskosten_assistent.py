@@ -5,8 +5,7 @@ gemäß § 2 BetrKV (Betriebskostenverordnung).
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from typing import List, Optional
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import get_current_user_claims, CurrentUserClaims
 
 router = APIRouter(prefix="/betriebskosten-assistent", tags=["betriebskosten-assistent"])
 
@@ -291,7 +290,7 @@ class AssistentAnalyseResponse(BaseModel):
 
 @router.get("/arten")
 async def get_betriebskosten_arten(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """Alle 17 Betriebskostenarten gemäß § 2 BetrKV."""
     return {
@@ -303,7 +302,7 @@ async def get_betriebskosten_arten(
 @router.post("/analyse", response_model=AssistentAnalyseResponse)
 async def analysiere_betriebskosten(
     data: AssistentAnalyseRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """Analysiere die eingegebenen Betriebskosten auf Plausibilität und häufige Fehler."""
     wohnflaeche = data.wohnflaeche_qm
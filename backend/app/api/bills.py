@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, inspect, tuple_
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
+import asyncio
 import logging
 import os
-import uuid
 import base64
+import hashlib
+import itertools
 import json
+import zipfile
 import aiofiles
 import httpx
+from pydantic import TypeAdapter
 from app.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -22,27 +27,26 @@ from app.models.bill_position import BillPosition
 from app.models.check_result import CheckResult
 from app.models.rental_contract import RentalContract
 from app.schemas.utility_bill import (
-    UtilityBillCreate, UtilityBillRead, UtilityBillUpdate, BillPositionCreate
+    UtilityBillCreate, UtilityBillRead, UtilityBillListItem, UtilityBillUpdate, BillPositionCreate,
+    BillPositionRead, CheckResultRead,
 )
 from app.core.auth import get_current_user
-from app.core.bill_checker import run_all_checks
+from app.core import downloads
+from app.core.bill_checker import run_all_checks, affected_checks, checks_read_contract
 from app.config import settings
+from app.services import report_cache, ocr_client, ocr_cache, ocr_preprocess, uploads, document_store, bill_recheck
 
-UPLOADS_DIR = "/app/uploads"
 ALLOWED_TYPES = {"application/pdf", "image/jpeg", "image/png", "image/webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
-os.makedirs(UPLOADS_DIR, exist_ok=True)
-
 router = APIRouter(prefix="/bills", tags=["bills"])
 
 FREE_TIER_LIMIT = 1
 
 
-async def _check_free_tier(user: User, db: AsyncSession, billing_year: int, exclude_bill_id: int | None = None):
-    """Free users limited to 1 bill check per billing year."""
+async def _free_tier_exhausted(user: User, db: AsyncSession, billing_year: int, exclude_bill_id: int | None = None) -> bool:
     if user.is_premium or user.role == "admin":
-        return
+        return False
     query = (
         select(func.count())
         .select_from(UtilityBill)
@@ -54,29 +58,375 @@ async def _check_free_tier(user: User, db: AsyncSession, billing_year: int, excl
     if exclude_bill_id is not None:
         query = query.where(UtilityBill.id != exclude_bill_id)
     result = await db.execute(query)
-    count = result.scalar()
-    if count >= FREE_TIER_LIMIT:
+    return result.scalar() >= FREE_TIER_LIMIT
+
+
+async def _check_free_tier(user: User, db: AsyncSession, billing_year: int, exclude_bill_id: int | None = None):
+    """Free users limited to 1 bill check per billing year."""
+    if await _free_tier_exhausted(user, db, billing_year, exclude_bill_id):
         raise HTTPException(
             status_code=402,
             detail=f"Free tier allows {FREE_TIER_LIMIT} bill check per year. Upgrade to Premium for unlimited checks.",
         )
 
 
-@router.get("", response_model=List[UtilityBillRead])
+async def _ensure_loaded(db: AsyncSession, obj, fields) -> None:
+    # Expired columns and unloaded relationships are what a lazy load would fetch
+    state = inspect(obj)
+    unloaded = (state.expired_attributes | state.unloaded.intersection(state.mapper.relationships.keys())) & fields
+    if not unloaded:
+        return
+    message = (
+        f"{type(obj).__name__} attributes {sorted(unloaded)} are not loaded; "
+        "serializing them would lazy-load per object"
+    )
+    if settings.ENVIRONMENT != "production":
+        # Surface a missing selectinload in development and tests
+        raise RuntimeError(message)
+    logger.warning("%s, loading them", message)
+    await db.refresh(obj, attribute_names=sorted(unloaded))
+
+
+_BILL_FIELDS = frozenset(UtilityBillRead.model_fields)
+_POSITION_FIELDS = frozenset(BillPositionRead.model_fields)
+_CHECK_RESULT_FIELDS = frozenset(CheckResultRead.model_fields)
+
+
+async def _bill_response(db: AsyncSession, bill: UtilityBill) -> UtilityBillRead:
+    """
+    Serialize a bill from the objects already in the session, without re-reading it.
+
+    The bill must have been loaded (or written) together with its positions and
+    check results. Outside production anything that would need a lazy load
+    raises, so a missing selectinload shows up as an error rather than as extra
+    queries; in production it is loaded and logged instead of failing the request.
+    """
+    await _ensure_loaded(db, bill, _BILL_FIELDS)
+    for pos in bill.positions:
+        await _ensure_loaded(db, pos, _POSITION_FIELDS)
+    for cr in bill.check_results:
+        await _ensure_loaded(db, cr, _CHECK_RESULT_FIELDS)
+    return UtilityBillRead.model_validate(bill)
+
+
+def _position_values(bill_id: int, pos: BillPosition) -> dict:
+    """Column values of a transient, already checked position for a bulk INSERT."""
+    return {
+        "bill_id": bill_id,
+        "category": pos.category,
+        "name": pos.name,
+        "total_amount": pos.total_amount,
+        "distribution_key": pos.distribution_key,
+        "tenant_share_percent": pos.tenant_share_percent,
+        "tenant_amount": pos.tenant_amount,
+        "is_allowed": pos.is_allowed,
+        "reference_value_low": pos.reference_value_low,
+        "reference_value_high": pos.reference_value_high,
+        "is_plausible": pos.is_plausible,
+        "notes": pos.notes,
+    }
+
+
+async def _sync_check_results(
+    bill: UtilityBill,
+    contract: Optional[RentalContract],
+    check_types: tuple[str, ...] | None = None,
+) -> None:
+    """
+    Re-run the given checks (all when None) and bring bill.check_results in
+    line; see bill_recheck.apply_check_results. Expects bill.positions and
+    bill.check_results to be loaded.
+    """
+    check_items, _score = run_all_checks(bill, bill.positions, contract, only=check_types)
+    bill_recheck.apply_check_results(bill, check_items, check_types)
+
+
+# Listing: scalar columns that can be selected with fields=, and the related
+# rows that can be added with include=. Values are serialized exactly as
+# UtilityBillRead would serialize them.
+_LIST_COLUMNS = {
+    name: getattr(UtilityBill, name)
+    for name in UtilityBillRead.model_fields
+    if name not in ("positions", "check_results")
+}
+_LIST_ADAPTERS = {
+    name: TypeAdapter(UtilityBillRead.model_fields[name].annotation) for name in _LIST_COLUMNS
+}
+_LIST_INCLUDES = {
+    "positions": (BillPosition, BillPositionRead),
+    "check_results": (CheckResult, CheckResultRead),
+}
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 100
+ZIP_RENDER_ATTEMPTS = 3
+ZIP_COPY_CHUNK = 256 * 1024
+
+
+def _parse_names(value: Optional[str], allowed, param: str) -> List[str]:
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {param}: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def _encode_cursor(created_at: datetime, bill_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{bill_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, bill_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(bill_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get(
+    "",
+    response_model=List[UtilityBillListItem],
+    responses={200: {"headers": {"X-Next-Cursor": {
+        "description": "Cursor of the next page; absent on the last one",
+        "schema": {"type": "string"},
+    }}}},
+)
 async def list_bills(
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated bill fields; default all"),
+    include: str = Query("positions,check_results", description="positions, check_results or empty"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
+    """
+    List the user's bills, newest first.
+
+    Bills are paged by (created_at, id), LIST_DEFAULT_LIMIT per page unless
+    limit= says otherwise; the X-Next-Cursor response header holds the cursor
+    for the next page and is absent on the last one. Entries carry only the
+    fields= columns and include= rows (UtilityBillListItem). The bills themselves are read with a single column query;
+    every include= adds one query for the related rows of the whole page.
+    """
+    output = _parse_names(fields, _LIST_COLUMNS, "fields") or list(_LIST_COLUMNS)
+    includes = _parse_names(include, _LIST_INCLUDES, "include")
+    selected = list(dict.fromkeys(["id", "created_at", *output]))
+
+    query = (
+        select(*(_LIST_COLUMNS[name] for name in selected))
+        .where(UtilityBill.user_id == current_user.id)
+        .order_by(UtilityBill.created_at.desc(), UtilityBill.id.desc())
+    )
+    if cursor:
+        query = query.where(tuple_(UtilityBill.created_at, UtilityBill.id) < tuple_(*_decode_cursor(cursor)))
+    rows = (await db.execute(query.limit(limit + 1))).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    items = [
+        {name: _LIST_ADAPTERS[name].dump_python(getattr(row, name), mode="json") for name in output}
+        for row in rows
+    ]
+
+    bill_ids = [row.id for row in rows]
+    for name in includes:
+        model, schema = _LIST_INCLUDES[name]
+        grouped = {bill_id: [] for bill_id in bill_ids}
+        if bill_ids:
+            related = await db.execute(
+                select(model).where(model.bill_id.in_(bill_ids)).order_by(model.id)
+            )
+            for obj in related.scalars():
+                grouped[obj.bill_id].append(schema.model_validate(obj).model_dump(mode="json"))
+        for item, bill_id in zip(items, bill_ids):
+            item[name] = grouped[bill_id]
+
+    return JSONResponse(items, headers=headers)
+
+
+def _report_inputs(bill: UtilityBill, tenant_name: str, property_address: str) -> dict:
+    """Arguments for generate_check_report_pdf; plain data, safe to pickle and hash."""
+    from app.services.pdf_service import ReportItem, ReportPosition
+
+    return dict(
+        tenant_name=tenant_name,
+        property_address=property_address,
+        billing_year=bill.billing_year,
+        billing_period_start=str(bill.billing_period_start),
+        billing_period_end=str(bill.billing_period_end),
+        check_score=bill.check_score,
+        check_results=[ReportItem.of(cr) for cr in bill.check_results],
+        positions=[ReportPosition.of(pos) for pos in bill.positions],
+        total_costs=str(bill.total_costs) if bill.total_costs else None,
+        result_amount=str(bill.result_amount) if bill.result_amount else None,
+    )
+
+
+def _report_key(report_inputs: dict) -> str:
+    # The report prints its creation date, so a render is valid for one day
+    return report_cache.report_key({**report_inputs, "created_on": date.today().isoformat()})
+
+
+class _ZipSink:
+    """Write-only, unseekable file object; zipfile then streams with data descriptors."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _zip_entry_source(bill_id: int, key: str, report_inputs: dict):
+    """The cached report opened for reading (copied into the ZIP later), or a fresh render."""
+    from app.services.pdf_service import generate_check_report_pdf
+    from app.services import pdf_renderer
+
+    path = await asyncio.to_thread(report_cache.lookup, bill_id, key)
+    if path is not None:
+        try:
+            # Opened now, so a later eviction cannot take the file away
+            return await aiofiles.open(path, "rb")
+        except FileNotFoundError:
+            pass
+
+    for attempt in range(ZIP_RENDER_ATTEMPTS):
+        try:
+            pdf = await pdf_renderer.render(generate_check_report_pdf, **report_inputs)
+            break
+        except pdf_renderer.RenderQueueFull as e:
+            # The response is already streaming, so wait instead of answering 503
+            if attempt == ZIP_RENDER_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(e.retry_after)
+    await asyncio.to_thread(report_cache.store, bill_id, key, pdf)
+    return pdf
+
+
+def _zip_error_entry(arcname: str) -> tuple[str, str]:
+    return (
+        f"{arcname.removesuffix('.pdf')}_fehler.txt",
+        f"Der Prüfbericht {arcname} konnte nicht erstellt werden.\n"
+        "Bitte laden Sie ihn später einzeln herunter.\n",
+    )
+
+
+async def _stream_reports_zip(entries: list[tuple[str, int, str, dict]]):
+    """
+    Yield the ZIP archive piece by piece, adding each report as soon as it is ready.
+
+    At most one report per render worker is in flight, and the next one is
+    only started once a finished one has been handed to the client, so a
+    slow download holds back the renders instead of piling them up in
+    memory. Cached reports are copied in ZIP_COPY_CHUNK pieces. A report
+    that cannot be rendered is replaced by a short text file, the rest of
+    the archive is still delivered.
+    """
+    window = max(1, settings.PDF_RENDER_WORKERS)
+    remaining = iter(entries)
+    tasks = {}
+
+    def fill() -> None:
+        for arcname, bill_id, key, report_inputs in itertools.islice(remaining, window - len(tasks)):
+            tasks[asyncio.create_task(_zip_entry_source(bill_id, key, report_inputs))] = arcname
+
+    sink = _ZipSink()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            fill()
+            while tasks:
+                done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    arcname = tasks.pop(task)
+                    try:
+                        source = task.result()
+                    except Exception:
+                        logger.exception("Report %s could not be rendered for the ZIP export", arcname)
+                        archive.writestr(*_zip_error_entry(arcname))
+                    else:
+                        if isinstance(source, bytes):
+                            archive.writestr(arcname, source)
+                        else:
+                            try:
+                                with archive.open(arcname, "w") as member:
+                                    while chunk := await source.read(ZIP_COPY_CHUNK):
+                                        member.write(chunk)
+                                        yield sink.drain()
+                            finally:
+                                await source.close()
+                    yield sink.drain()
+                fill()
+        # Central directory
+        yield sink.drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Wait for them: an open() running in its thread still completes, and
+        # cached reports that were opened but never copied must be closed
+        for source in await asyncio.gather(*tasks, return_exceptions=True):
+            if not isinstance(source, (bytes, BaseException)):
+                await source.close()
+
+
+# Registered before the /{bill_id} routes, which would otherwise match "reports.zip"
+@router.get("/reports.zip")
+async def download_reports_zip(
+    contract_id: Optional[int] = Query(None),
+    billing_year: Optional[int] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download the check reports of all (or the filtered) bills as one streamed ZIP archive."""
+    query = (
         select(UtilityBill)
         .where(UtilityBill.user_id == current_user.id)
         .options(
             selectinload(UtilityBill.positions),
             selectinload(UtilityBill.check_results),
         )
-        .order_by(UtilityBill.created_at.desc())
+        .order_by(UtilityBill.billing_year.desc(), UtilityBill.id.desc())
+    )
+    if contract_id is not None:
+        query = query.where(UtilityBill.contract_id == contract_id)
+    if billing_year is not None:
+        query = query.where(UtilityBill.billing_year == billing_year)
+    bills = (await db.execute(query)).scalars().all()
+    if not bills:
+        raise HTTPException(status_code=404, detail="No bills found")
+
+    contract_ids = {bill.contract_id for bill in bills}
+    contracts = await db.execute(
+        select(RentalContract.id, RentalContract.property_address).where(RentalContract.id.in_(contract_ids))
+    )
+    addresses = dict(contracts.all())
+
+    # Everything the stream needs is copied out here; the session is not used after returning
+    entries = []
+    for bill in bills:
+        report_inputs = _report_inputs(bill, current_user.name, addresses.get(bill.contract_id, "Unbekannt"))
+        entries.append((
+            f"pruefbericht_{bill.billing_year}_{bill.id}.pdf",
+            bill.id,
+            _report_key(report_inputs),
+            report_inputs,
+        ))
+
+    return StreamingResponse(
+        _stream_reports_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="pruefberichte.zip"'},
     )
-    return result.scalars().all()
 
 
 @router.post("", response_model=UtilityBillRead, status_code=201)
@@ -109,50 +459,53 @@ async def create_bill(
         total_advance_paid=data.total_advance_paid,
         result_amount=data.result_amount,
         notes=data.notes,
-        status="pending",
     )
-    db.add(bill)
-    await db.flush()
-
-    # Add positions
-    positions = []
-    for pos_data in data.positions:
-        pos = BillPosition(bill_id=bill.id, **pos_data.model_dump())
-        db.add(pos)
-        positions.append(pos)
 
-    await db.flush()
-
-    # Run checks
+    # Run checks on the transient positions first, so their annotations and the
+    # score are part of the initial INSERTs
+    positions = [BillPosition(is_allowed=True, **pos_data.model_dump()) for pos_data in data.positions]
     check_items, score = run_all_checks(bill, positions, contract)
-    for check_type, severity, title, description, recommendation in check_items:
-        result_obj = CheckResult(
-            bill_id=bill.id,
-            check_type=check_type,
-            severity=severity,
-            title=title,
-            description=description,
-            recommendation=recommendation,
-        )
-        db.add(result_obj)
-
     bill.check_score = score
     bill.status = "checked"
-    db.add(bill)
 
+    db.add(bill)
     await db.flush()
-    await db.refresh(bill)
 
-    # Reload with relationships
-    final_result = await db.execute(
-        select(UtilityBill)
-        .where(UtilityBill.id == bill.id)
-        .options(
-            selectinload(UtilityBill.positions),
-            selectinload(UtilityBill.check_results),
+    # One multi-row INSERT ... RETURNING each for positions and check results;
+    # the response is built from the returned rows
+    position_rows = []
+    if positions:
+        result = await db.execute(
+            insert(BillPosition)
+            .returning(BillPosition, sort_by_parameter_order=True)
+            .execution_options(render_nulls=True),
+            [_position_values(bill.id, pos) for pos in positions],
         )
-    )
-    return final_result.scalar_one()
+        position_rows = list(result.scalars())
+
+    check_rows = []
+    if check_items:
+        result = await db.execute(
+            insert(CheckResult)
+            .returning(CheckResult, sort_by_parameter_order=True)
+            .execution_options(render_nulls=True),
+            [
+                {
+                    "bill_id": bill.id,
+                    "check_type": check_type,
+                    "severity": severity,
+                    "title": title,
+                    "description": description,
+                    "recommendation": recommendation,
+                }
+                for check_type, severity, title, description, recommendation in check_items
+            ],
+        )
+        check_rows = list(result.scalars())
+
+    set_committed_value(bill, "positions", position_rows)
+    set_committed_value(bill, "check_results", check_rows)
+    return await _bill_response(db, bill)
 
 
 @router.get("/{bill_id}", response_model=UtilityBillRead)
@@ -183,9 +536,11 @@ async def update_bill(
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(UtilityBill).where(
-            UtilityBill.id == bill_id,
-            UtilityBill.user_id == current_user.id,
+        select(UtilityBill)
+        .where(UtilityBill.id == bill_id, UtilityBill.user_id == current_user.id)
+        .options(
+            selectinload(UtilityBill.positions),
+            selectinload(UtilityBill.check_results),
         )
     )
     bill = result.scalar_one_or_none()
@@ -193,20 +548,36 @@ async def update_bill(
         raise HTTPException(status_code=404, detail="Bill not found")
 
     update_data = data.model_dump(exclude_unset=True)
+    changed_fields = set()
     for field, value in update_data.items():
+        if getattr(bill, field) != value:
+            changed_fields.add(f"bill.{field}")
         setattr(bill, field, value)
+
+    # Only re-run the checks that read one of the changed fields
+    check_types = affected_checks(changed_fields) if bill.check_results else ()
+    if check_types and await _free_tier_exhausted(
+        current_user, db, billing_year=bill.billing_year, exclude_bill_id=bill_id,
+    ):
+        # Same entitlement as POST /recheck: the edit is saved, the stored
+        # results are kept and the bill is marked as no longer checked
+        check_types = ()
+        bill.status = "pending"
+    if check_types:
+        contract = None
+        if checks_read_contract(check_types):
+            contract_result = await db.execute(
+                select(RentalContract).where(RentalContract.id == bill.contract_id)
+            )
+            contract = contract_result.scalar_one_or_none()
+        await _sync_check_results(bill, contract, check_types)
+    if changed_fields:
+        await asyncio.to_thread(report_cache.invalidate, bill.id)
+
     db.add(bill)
     await db.flush()
 
-    final_result = await db.execute(
-        select(UtilityBill)
-        .where(UtilityBill.id == bill_id)
-        .options(
-            selectinload(UtilityBill.positions),
-            selectinload(UtilityBill.check_results),
-        )
-    )
-    return final_result.scalar_one()
+    return await _bill_response(db, bill)
 
 
 @router.delete("/{bill_id}", status_code=204)
@@ -225,6 +596,7 @@ async def delete_bill(
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
     await db.delete(bill)
+    await asyncio.to_thread(report_cache.invalidate, bill_id)
 
 
 @router.post("/{bill_id}/recheck", response_model=UtilityBillRead)
@@ -253,38 +625,14 @@ async def recheck_bill(
     )
     contract = contract_result.scalar_one_or_none()
 
-    # Delete old check results
-    for cr in bill.check_results:
-        await db.delete(cr)
-    await db.flush()
-
-    # Re-run
-    check_items, score = run_all_checks(bill, bill.positions, contract)
-    for check_type, severity, title, description, recommendation in check_items:
-        cr = CheckResult(
-            bill_id=bill.id,
-            check_type=check_type,
-            severity=severity,
-            title=title,
-            description=description,
-            recommendation=recommendation,
-        )
-        db.add(cr)
-
-    bill.check_score = score
+    # Re-run; only rows whose result changed are written
+    await _sync_check_results(bill, contract)
     bill.status = "checked"
+    await asyncio.to_thread(report_cache.invalidate, bill.id)
     db.add(bill)
     await db.flush()
 
-    final_result = await db.execute(
-        select(UtilityBill)
-        .where(UtilityBill.id == bill_id)
-        .options(
-            selectinload(UtilityBill.positions),
-            selectinload(UtilityBill.check_results),
-        )
-    )
-    return final_result.scalar_one()
+    return await _bill_response(db, bill)
 
 
 @router.post("/{bill_id}/upload", response_model=UtilityBillRead)
@@ -296,9 +644,11 @@ async def upload_document(
 ):
     """Upload a PDF or image of the utility bill document."""
     result = await db.execute(
-        select(UtilityBill).where(
-            UtilityBill.id == bill_id,
-            UtilityBill.user_id == current_user.id,
+        select(UtilityBill)
+        .where(UtilityBill.id == bill_id, UtilityBill.user_id == current_user.id)
+        .options(
+            selectinload(UtilityBill.positions),
+            selectinload(UtilityBill.check_results),
         )
     )
     bill = result.scalar_one_or_none()
@@ -311,35 +661,28 @@ async def upload_document(
             detail="Ungültiger Dateityp. Erlaubt: PDF, JPEG, PNG, WebP",
         )
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
+    store = document_store.get_store()
+    try:
+        received = await uploads.receive(file, store.staging_dir, MAX_FILE_SIZE)
+    except uploads.UploadTooLarge:
         raise HTTPException(status_code=400, detail="Datei zu groß. Maximal 10 MB erlaubt.")
+    key = document_store.blob_key(received.sha256, file.content_type)
+    await store.put(received.path, key)
 
-    # Delete old file if exists
-    if bill.document_path and os.path.exists(bill.document_path):
-        os.remove(bill.document_path)
-
-    # Save new file
-    ext = os.path.splitext(file.filename or "")[1] or ".pdf"
-    filename = f"bill_{bill_id}_{uuid.uuid4().hex}{ext}"
-    filepath = os.path.join(UPLOADS_DIR, filename)
-
-    async with aiofiles.open(filepath, "wb") as f:
-        await f.write(contents)
-
-    bill.document_path = filepath
+    # The previous blob is left to the background sweep once nothing references it
+    previous = bill.document_path
+    bill.document_path = key
     db.add(bill)
     await db.flush()
+    await _discard_legacy_document(previous)
+
+    return await _bill_response(db, bill)
 
-    upload_result = await db.execute(
-        select(UtilityBill)
-        .where(UtilityBill.id == bill_id)
-        .options(
-            selectinload(UtilityBill.positions),
-            selectinload(UtilityBill.check_results),
-        )
-    )
-    return upload_result.scalar_one()
+
+async def _discard_legacy_document(document_path: Optional[str]) -> None:
+    """Remove a file uploaded before the document store, which nothing else shares."""
+    if document_path and not document_store.is_blob_key(document_path):
+        await asyncio.to_thread(uploads.discard, document_path)
 
 
 @router.delete("/{bill_id}/upload", status_code=204)
@@ -359,19 +702,24 @@ async def delete_document(
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
 
-    if bill.document_path and os.path.exists(bill.document_path):
-        os.remove(bill.document_path)
+    previous = bill.document_path
     bill.document_path = None
     db.add(bill)
+    await db.flush()
+    await _discard_legacy_document(previous)
 
 
 @router.get("/{bill_id}/document")
 async def download_document(
     bill_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Download the uploaded bill document."""
+    """
+    Download the uploaded bill document. Supports Range/If-Range for resumed
+    downloads; the content hash in the store key is the (strong) ETag.
+    """
     result = await db.execute(
         select(UtilityBill).where(
             UtilityBill.id == bill_id,
@@ -381,51 +729,35 @@ async def download_document(
     bill = result.scalar_one_or_none()
     if not bill or not bill.document_path:
         raise HTTPException(status_code=404, detail="Kein Dokument vorhanden")
-    if not os.path.exists(bill.document_path):
-        raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
-
-    return FileResponse(
-        bill.document_path,
-        filename=os.path.basename(bill.document_path),
-    )
 
+    key = bill.document_path
+    filename = f"abrechnung_{bill_id}{os.path.splitext(key)[1]}"
+    if not document_store.is_blob_key(key):
+        # Uploaded before the document store: a plain file path
+        path, etag = key, None
+    else:
+        store = document_store.get_store()
+        path, etag = store.local_path(key), key.split(".")[0]
+        if path is None:
+            headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+            if downloads.is_not_modified(request, headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            if not await store.exists(key):
+                raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
+            headers["Content-Disposition"] = downloads.content_disposition(filename)
+            return StreamingResponse(store.read(key), media_type=document_store.media_type(key), headers=headers)
 
-@router.post("/ocr-extract")
-async def ocr_extract_bill(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Upload a photo or scan of a utility bill (Nebenkostenabrechnung) and extract
-    structured data using AI vision. Returns pre-filled form data.
-    """
-    if file.content_type not in ALLOWED_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail="Ungültiger Dateityp. Erlaubt: PDF, JPEG, PNG, WebP",
+    try:
+        return await downloads.file_response(
+            request, path, media_type=document_store.media_type(path), filename=filename, etag=etag,
         )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="Datei zu groß. Maximal 10 MB erlaubt.")
-
-    if not settings.ANTHROPIC_API_KEY:
-        raise HTTPException(
-            status_code=503,
-            detail="OCR-Service nicht konfiguriert. Bitte ANTHROPIC_API_KEY setzen.",
-        )
 
-    # Determine media type for vision API
-    media_type = file.content_type
-    # For PDF, use document type; for images, use image type
-    if media_type == "application/pdf":
-        source_type = "document"
-        encoded = base64.standard_b64encode(contents).decode("utf-8")
-    else:
-        source_type = "image"
-        encoded = base64.standard_b64encode(contents).decode("utf-8")
+OCR_MODEL = "claude-haiku-4-5-20251001"
 
-    prompt = """Du analysierst eine deutsche Nebenkostenabrechnung (Betriebskostenabrechnung).
+OCR_PROMPT = """Du analysierst eine deutsche Nebenkostenabrechnung (Betriebskostenabrechnung).
 Extrahiere alle sichtbaren Daten und gib sie als JSON zurück.
 
 Antworte NUR mit validem JSON in diesem Format (keine anderen Texte):
@@ -464,8 +796,61 @@ Kategorien-Zuordnung:
 
 Extrahiere alle Positionen die du erkennst. Falls du einen Wert nicht sicher erkennst, setze null."""
 
+# Identifies what produced a cached extraction; changing model or prompt starts a fresh cache
+OCR_EXTRACTOR = f"{OCR_MODEL}:{hashlib.sha256(OCR_PROMPT.encode()).hexdigest()[:12]}"
+
+
+def _prepare_ocr_upload(path: str, media_type: str) -> ocr_preprocess.PreparedUpload:
+    with open(path, "rb") as f:
+        contents = f.read()
+    return ocr_preprocess.preprocess(contents, media_type)
+
+
+@router.post("/ocr-extract")
+async def ocr_extract_bill(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Upload a photo or scan of a utility bill (Nebenkostenabrechnung) and extract
+    structured data using AI vision. Returns pre-filled form data.
+
+    Extractions are cached per user by the SHA-256 of the upload, so sending
+    the same file again answers from the cache without an upstream call.
+    On a miss, images are downscaled and PDFs trimmed to their cost-table
+    pages before they are sent (see ocr_preprocess).
+    """
+    if file.content_type not in ALLOWED_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Ungültiger Dateityp. Erlaubt: PDF, JPEG, PNG, WebP",
+        )
+
     try:
-        if source_type == "document":
+        received = await uploads.receive_temporary(file, MAX_FILE_SIZE)
+    except uploads.UploadTooLarge:
+        raise HTTPException(status_code=400, detail="Datei zu groß. Maximal 10 MB erlaubt.")
+
+    digest = received.sha256
+    try:
+        cached = await ocr_cache.lookup(db, current_user.id, digest, OCR_EXTRACTOR)
+        if cached is not None:
+            return cached
+
+        if not settings.ANTHROPIC_API_KEY:
+            raise HTTPException(
+                status_code=503,
+                detail="OCR-Service nicht konfiguriert. Bitte ANTHROPIC_API_KEY setzen.",
+            )
+
+        prepared = await asyncio.to_thread(_prepare_ocr_upload, received.path, file.content_type)
+    finally:
+        uploads.discard(received.path)
+    encoded = base64.standard_b64encode(prepared.data).decode("utf-8")
+
+    try:
+        if prepared.media_type == "application/pdf":
             # PDF: use document source type
             message_content = [
                 {
@@ -476,7 +861,7 @@ Extrahiere alle Positionen die du erkennst. Falls du einen Wert nicht sicher erk
                         "data": encoded,
                     },
                 },
-                {"type": "text", "text": prompt},
+                {"type": "text", "text": OCR_PROMPT},
             ]
         else:
             # Image: use image source type
@@ -485,28 +870,18 @@ Extrahiere alle Positionen die du erkennst. Falls du einen Wert nicht sicher erk
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": media_type,
+                        "media_type": prepared.media_type,
                         "data": encoded,
                     },
                 },
-                {"type": "text", "text": prompt},
+                {"type": "text", "text": OCR_PROMPT},
             ]
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": settings.ANTHROPIC_API_KEY,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                    "anthropic-beta": "pdfs-2024-09-25",
-                },
-                json={
-                    "model": "claude-haiku-4-5-20251001",
-                    "max_tokens": 2048,
-                    "messages": [{"role": "user", "content": message_content}],
-                },
-            )
+        response = await ocr_client.get_client().create_message({
+            "model": OCR_MODEL,
+            "max_tokens": 2048,
+            "messages": [{"role": "user", "content": message_content}],
+        })
 
         if response.status_code != 200:
             raise HTTPException(
@@ -523,6 +898,7 @@ Extrahiere alle Positionen die du erkennst. Falls du einen Wert nicht sicher erk
             text = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
 
         extracted = json.loads(text)
+        await ocr_cache.store(db, current_user.id, digest, OCR_EXTRACTOR, extracted)
         return extracted
 
     except json.JSONDecodeError:
@@ -539,15 +915,24 @@ Extrahiere alle Positionen die du erkennst. Falls du einen Wert nicht sicher erk
         raise HTTPException(status_code=500, detail="OCR-Fehler: Bitte erneut versuchen.")
 
 
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_chunks(data: bytes):
+    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+        yield data[start:start + STREAM_CHUNK_SIZE]
+
+
 @router.get("/{bill_id}/report")
 async def download_check_report(
     bill_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Generate and download a PDF check report for a bill."""
+    """Download the PDF check report for a bill, rendered once per bill state."""
     from app.services.pdf_service import generate_check_report_pdf
-    from app.models.rental_contract import RentalContract
+    from app.services import pdf_renderer
 
     result = await db.execute(
         select(UtilityBill)
@@ -567,32 +952,42 @@ async def download_check_report(
     contract = contract_result.scalar_one_or_none()
     property_address = contract.property_address if contract else "Unbekannt"
 
+    report_inputs = _report_inputs(bill, current_user.name, property_address)
+    key = _report_key(report_inputs)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+
+    if downloads.is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    filename = f"pruefbericht_{bill.billing_year}.pdf"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    pdf_path = await asyncio.to_thread(report_cache.lookup, bill.id, key)
+    if pdf_path is not None:
+        try:
+            return await downloads.file_response(
+                request, pdf_path, media_type="application/pdf", filename=filename, etag=key,
+            )
+        except FileNotFoundError:
+            pass  # evicted since the lookup; render again
+
     try:
-        pdf_path = generate_check_report_pdf(
-            tenant_name=current_user.name,
-            property_address=property_address,
-            billing_year=bill.billing_year,
-            billing_period_start=str(bill.billing_period_start),
-            billing_period_end=str(bill.billing_period_end),
-            check_score=bill.check_score,
-            check_results=bill.check_results,
-            positions=bill.positions,
-            total_costs=str(bill.total_costs) if bill.total_costs else None,
-            result_amount=str(bill.result_amount) if bill.result_amount else None,
+        pdf = await pdf_renderer.render(generate_check_report_pdf, **report_inputs)
+    except pdf_renderer.RenderQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF-Erstellung ist gerade ausgelastet. Bitte gleich erneut versuchen.",
+            headers={"Retry-After": str(e.retry_after)},
         )
     except Exception as e:
         logger.error("PDF report generation failed: %s", e)
         raise HTTPException(status_code=500, detail="PDF-Generierung fehlgeschlagen. Bitte erneut versuchen.")
 
-    def cleanup(path: str):
-        try:
-            os.remove(path)
-        except OSError:
-            pass
-
-    return FileResponse(
-        pdf_path,
-        filename=f"pruefbericht_{bill.billing_year}.pdf",
+    # Sent straight from memory; the cache copy is written once the response is out
+    headers["Content-Length"] = str(len(pdf))
+    return StreamingResponse(
+        _iter_chunks(pdf),
         media_type="application/pdf",
-        background=BackgroundTask(cleanup, pdf_path),
+        headers=headers,
+        background=BackgroundTask(report_cache.store, bill.id, key, pdf),
     )
@@ -11,6 +11,7 @@ from app.models.rental_contract import RentalContract
 from app.models.utility_bill import UtilityBill
 from app.models.feedback import Feedback
 from app.core.auth import get_current_user
+from app.core import user_cache
 
 router = APIRouter(prefix="/gdpr", tags=["gdpr"])
 
@@ -74,4 +75,5 @@ async def delete_my_account(
 ):
     """Permanently delete all user data (DSGVO Art. 17)."""
     await db.delete(current_user)
+    user_cache.invalidate(current_user.id, db)
     # Cascade deletes will handle related data
@@ -7,8 +7,7 @@ from pydantic import BaseModel
 from typing import Optional
 from decimal import Decimal
 
-from app.models.user import User
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user_claims, CurrentUserClaims
 
 router = APIRouter(prefix="/mietpreisbremse", tags=["mietpreisbremse"])
 
@@ -88,7 +87,7 @@ async def list_cities():
 @router.post("/check", response_model=MietpreisbremseResult)
 async def check_mietpreisbremse(
     data: MietpreisbremseRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     city_key = data.city.lower().strip()
     if city_key not in CITY_RENTS:
@@ -8,8 +8,7 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import get_current_user_claims, CurrentUserClaims
 
 router = APIRouter(prefix="/mietrecht", tags=["mietrecht"])
 
@@ -65,7 +64,7 @@ class MietwucherResponse(BaseModel):
 
 
 @router.get("/staedte")
-async def get_staedte(current_user: User = Depends(get_current_user)):
+async def get_staedte(current_user: CurrentUserClaims = Depends(get_current_user_claims)):
     """Liste aller verfügbaren Städte."""
     return [{"key": k, "name": v["name"]} for k, v in STADTMIETEN.items()]
 
@@ -73,7 +72,7 @@ async def get_staedte(current_user: User = Depends(get_current_user)):
 @router.post("/mietwucher-check", response_model=MietwucherResponse)
 async def check_mietwucher(
     data: MietwucherRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """
     Prüft ob die Miete gegen § 5 WiStG (Mietwucher: >20% über Vergleichsmiete)
@@ -193,7 +192,7 @@ class MieterhoehungResponse(BaseModel):
 @router.post("/mieterhoehung-check", response_model=MieterhoehungResponse)
 async def check_mieterhoehung(
     data: MieterhoehungRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """
     Prüft ob eine Mieterhöhung zulässig ist (§ 558 BGB):
@@ -320,7 +319,7 @@ class KautionResponse(BaseModel):
 @router.post("/kaution-check", response_model=KautionResponse)
 async def check_kaution(
     data: KautionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """
     Prüft ob der Kautionseinbehalt des Vermieters berechtigt ist
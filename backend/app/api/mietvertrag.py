@@ -5,8 +5,7 @@ Basierend auf BGH-Rechtsprechung und aktueller Mietrechtslage.
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from typing import List, Optional
-from app.core.auth import get_current_user
-from app.models.user import User
+from app.core.auth import get_current_user_claims, CurrentUserClaims
 
 router = APIRouter(prefix="/mietvertrag", tags=["mietvertrag"])
 
@@ -167,7 +166,7 @@ class MietvertragCheckResponse(BaseModel):
 
 
 @router.get("/klauseln")
-async def get_klauseln(current_user: User = Depends(get_current_user)):
+async def get_klauseln(current_user: CurrentUserClaims = Depends(get_current_user_claims)):
     """Gibt alle prüfbaren Klauseltypen zurück."""
     return {
         "klauseln": [
@@ -186,7 +185,7 @@ async def get_klauseln(current_user: User = Depends(get_current_user)):
 @router.post("/check", response_model=MietvertragCheckResponse)
 async def check_mietvertrag(
     data: MietvertragCheckRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUserClaims = Depends(get_current_user_claims),
 ):
     """Prüft die angegebenen Mietvertragsklauseln auf Unwirksamkeit."""
     antworten_map = {a.klausel_id: a for a in data.antworten}
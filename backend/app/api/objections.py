@@ -1,11 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 from app.database import get_db
@@ -15,7 +13,9 @@ from app.models.objection_letter import ObjectionLetter
 from app.models.rental_contract import RentalContract
 from app.schemas.utility_bill import ObjectionLetterCreate, ObjectionLetterRead
 from app.core.auth import get_current_user, get_premium_user
+from app.core import downloads
 from app.services.pdf_service import generate_objection_letter_pdf
+from app.services import pdf_renderer
 
 router = APIRouter(prefix="/objections", tags=["objections"])
 
@@ -59,7 +59,8 @@ async def create_objection_letter(
 
     # Generate PDF
     try:
-        pdf_path = generate_objection_letter_pdf(
+        pdf_path = await pdf_renderer.render(
+            generate_objection_letter_pdf,
             tenant_name=current_user.name,
             tenant_address=tenant_address,
             landlord_name=contract.landlord_name,
@@ -68,6 +69,12 @@ async def create_objection_letter(
             billing_year=bill.billing_year,
             objection_reasons=data.objection_reasons,
         )
+    except pdf_renderer.RenderQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF-Erstellung ist gerade ausgelastet. Bitte gleich erneut versuchen.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error("Failed to generate objection letter PDF: %s", e)
         pdf_path = None
@@ -111,6 +118,7 @@ async def list_objection_letters(
 @router.get("/download/{letter_id}")
 async def download_objection_pdf(
     letter_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -123,14 +131,18 @@ async def download_objection_pdf(
     if not letter or letter.bill.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Letter not found")
 
-    if not letter.pdf_path or not os.path.exists(letter.pdf_path):
+    if not letter.pdf_path:
         raise HTTPException(status_code=404, detail="PDF not found")
 
-    return FileResponse(
-        letter.pdf_path,
-        media_type="application/pdf",
-        filename=f"widerspruch_{letter.bill.billing_year}.pdf",
-    )
+    try:
+        return await downloads.file_response(
+            request,
+            letter.pdf_path,
+            media_type="application/pdf",
+            filename=f"widerspruch_{letter.bill.billing_year}.pdf",
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="PDF not found")
 
 
 def _generate_letter_text(
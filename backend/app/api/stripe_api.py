@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 from app.database import get_db
 from app.models.user import User
 from app.core.auth import get_current_user
+from app.core import user_cache
 from app.config import settings
 
 router = APIRouter(prefix="/stripe", tags=["stripe"])
@@ -96,6 +97,7 @@ async def stripe_webhook(
                         logger.warning("Failed to retrieve Stripe subscription period_end, falling back to 365 days", exc_info=True)
                         from datetime import timedelta
                         user.subscription_expires_at = datetime.now(timezone.utc) + timedelta(days=365)
+                user_cache.invalidate(user.id, db)
                 await db.commit()
 
     elif event["type"] in ["customer.subscription.deleted", "customer.subscription.paused"]:
@@ -107,6 +109,7 @@ async def stripe_webhook(
         if user:
             user.subscription_tier = "free"
             user.subscription_expires_at = None
+            user_cache.invalidate(user.id, db)
             await db.commit()
 
     elif event["type"] == "customer.subscription.updated":
@@ -124,6 +127,7 @@ async def stripe_webhook(
                     user.subscription_expires_at = datetime.fromtimestamp(period_end, tz=timezone.utc)
             else:
                 user.subscription_tier = "free"
+            user_cache.invalidate(user.id, db)
             await db.commit()
 
     elif event["type"] == "invoice.payment_failed":
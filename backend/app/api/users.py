@@ -4,6 +4,7 @@ from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserRead, UserUpdate
 from app.core.auth import get_current_user
+from app.core import user_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -22,6 +23,7 @@ async def update_me(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(current_user, field, value)
+    user_cache.invalidate(current_user.id, db)
     db.add(current_user)
     await db.flush()
     await db.refresh(current_user)
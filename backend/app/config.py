@@ -1,3 +1,5 @@
+import math
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 
@@ -11,6 +13,22 @@ class Settings(BaseSettings):
     REFRESH_SECRET_KEY: str = "refresh-secret-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Verified access tokens kept in memory until they expire
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096
+
+    # bcrypt cost; hashes with another cost are upgraded on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Threads for bcrypt (it releases the GIL, so these hash in parallel)
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # In-process snapshot of authenticated users (see app.core.user_cache). Other
+    # workers only see changes once their entry expires, so keep the TTL short.
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Auth rate limiting: "database" shares counters across workers, "memory" is per process
+    RATE_LIMIT_BACKEND: str = "database"
+    RATE_LIMIT_MAX_KEYS: int = 100000
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
     # SMTP
@@ -20,6 +38,21 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = "noreply@mietcheck.de"
     SMTP_TLS: bool = True
+    # Persistent sessions reused across messages (see app.services.smtp_pool)
+    SMTP_POOL_SIZE: int = 4
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_SECONDS: float = 30.0  # below typical server idle timeouts
+    SMTP_TIMEOUT: float = 30.0
+    # Outbox: mails are queued as email_logs rows in the request transaction and
+    # sent by a background dispatcher, retried with exponential backoff
+    EMAIL_OUTBOX_POLL_SECONDS: float = 10.0  # 0 = no dispatcher in this process
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_DELAY: float = 30.0
+    EMAIL_RETRY_MAX_DELAY: float = 3600.0
+    # A claimed row is retried after this if its worker died; must cover a whole batch
+    # (see _lease_covers_a_batch)
+    EMAIL_SEND_LEASE_SECONDS: int = 900
 
     # App
     FRONTEND_URL: str = "http://localhost"
@@ -29,6 +62,22 @@ class Settings(BaseSettings):
     # PDF storage
     PDF_STORAGE_PATH: str = "/app/pdfs"
 
+    # Uploaded bill documents, content-addressed; unreferenced blobs are swept
+    # every DOCUMENT_GC_INTERVAL_SECONDS (0 = never) once older than the grace period
+    DOCUMENT_STORAGE_PATH: str = "/app/uploads"
+    DOCUMENT_GC_INTERVAL_SECONDS: int = 6 * 3600
+    DOCUMENT_GC_GRACE_SECONDS: int = 3600
+    # Let nginx send stored files (internal /_protected/ locations) instead of the API
+    X_ACCEL_REDIRECT: bool = False
+
+    # PDF rendering: worker processes (0 = thread pool, for development/tests)
+    # and how many renders may be queued or running before requests get a 503
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_QUEUE_LIMIT: int = 8
+
+    # Rendered check reports kept under PDF_STORAGE_PATH/report_cache (LRU by size)
+    REPORT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
     # Stripe
     STRIPE_SECRET_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
@@ -38,11 +87,38 @@ class Settings(BaseSettings):
 
     # OCR (Anthropic API for bill image extraction)
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_API_URL: str = "https://api.anthropic.com"
+    OCR_MAX_CONCURRENCY: int = 4  # outstanding upstream calls per API process
+    OCR_MAX_RETRIES: int = 3  # on 429/5xx and connection errors
+    OCR_RETRY_BASE_DELAY: float = 0.5
+    OCR_RETRY_MAX_DELAY: float = 8.0
+    OCR_HTTP2: bool = True  # used when the h2 package is installed
+    # Parsed extractions of identical re-uploads, per user
+    OCR_CACHE_TTL_HOURS: int = 7 * 24
+    OCR_CACHE_MAX_ENTRIES: int = 50000
+    # Upload shrinking before the vision call
+    OCR_IMAGE_MAX_EDGE: int = 1568  # px; larger images are downscaled before upload
+    OCR_JPEG_QUALITY: int = 85
+    OCR_PDF_MAX_PAGES: int = 5  # cost-table pages of a PDF sent upstream
 
     class Config:
         env_file = ".env"
         case_sensitive = True
 
+    @model_validator(mode="after")
+    def _lease_covers_a_batch(self) -> "Settings":
+        # A claimed batch is recorded once all of it is sent. Worst case, every pooled
+        # session works through its share of the rows, each taking SMTP_TIMEOUT plus
+        # one retry on a fresh connection. A shorter lease would let another
+        # dispatcher claim rows that are still being sent and send them twice.
+        needed = math.ceil(self.EMAIL_OUTBOX_BATCH_SIZE / max(1, self.SMTP_POOL_SIZE)) * 2 * self.SMTP_TIMEOUT
+        if self.EMAIL_SEND_LEASE_SECONDS < needed:
+            raise ValueError(
+                f"EMAIL_SEND_LEASE_SECONDS ({self.EMAIL_SEND_LEASE_SECONDS}) must be at least {needed:.0f}: "
+                "ceil(EMAIL_OUTBOX_BATCH_SIZE / SMTP_POOL_SIZE) * 2 * SMTP_TIMEOUT"
+            )
+        return self
+
 
 settings = Settings()
 
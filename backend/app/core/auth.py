@@ -4,16 +4,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.models.user import User
+from app.schemas.auth import TokenPayload
 from app.core.security import decode_access_token
+from app.core import user_cache
+from app.core.user_cache import CurrentUserClaims
 
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def _token_payload(request: Request, credentials: HTTPAuthorizationCredentials | None) -> TokenPayload:
     token = None
 
     # Try Bearer token first
@@ -37,6 +36,15 @@ async def get_current_user(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
+
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    payload = _token_payload(request, credentials)
 
     result = await db.execute(select(User).where(User.id == payload.sub))
     user = result.scalar_one_or_none()
@@ -50,6 +58,31 @@ async def get_current_user(
     return user
 
 
+async def get_current_user_claims(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUserClaims:
+    """Like get_current_user, but served from the user cache for endpoints that never need the ORM row."""
+    payload = _token_payload(request, credentials)
+
+    claims = user_cache.get(payload.sub)
+    if claims is None:
+        result = await db.execute(select(User).where(User.id == payload.sub))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            claims = CurrentUserClaims.from_user(user)
+            user_cache.put(claims)
+
+    if claims is None or not claims.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+        )
+
+    return claims
+
+
 async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(
@@ -1,10 +1,22 @@
 """
 Core bill checking logic for Nebenkostenabrechnung.
 Implements 5 check types: math, deadline, plausibility, legal, completeness.
+
+The checks are registered as CheckRule entries (see register_check). Each rule
+declares the bill, position and contract fields it reads; run_all_checks and
+run_checks_batch evaluate every registered rule, so new checks do not need to
+touch either entry point. Both read each position once into PositionColumns
+and run every position rule once over the columns; run_checks_batch does so
+for the positions of many bills at a time. The check_* functions below are
+the plain reference implementations and are used by run_all_checks(fused=False).
 """
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import date, timedelta
-from typing import List, Tuple
+from enum import IntEnum
+from itertools import chain, repeat
+from operator import attrgetter
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from app.models.utility_bill import UtilityBill
 from app.models.bill_position import BillPosition
 from app.models.rental_contract import RentalContract
@@ -35,8 +47,191 @@ ILLEGAL_CATEGORIES = {
     "vacancy_costs": "Leerstandskosten dürfen nicht auf Mieter umgelegt werden",
 }
 
+
+
+class Category(IntEnum):
+    """Dense index for position categories. Unknown categories map to OTHER."""
+    OTHER = 0
+    HEATING = 1
+    HOT_WATER = 2
+    WATER_SEWAGE = 3
+    GARBAGE = 4
+    BUILDING_INSURANCE = 5
+    LIABILITY_INSURANCE = 6
+    ELEVATOR = 7
+    GARDEN = 8
+    CLEANING = 9
+    CARETAKER = 10
+    CABLE_TV = 11
+    BUILDING_LIGHTING = 12
+    BANK_FEES = 13
+    MANAGEMENT_FEES = 14
+    REPAIR = 15
+    LEGAL_FEES = 16
+    VACANCY_COSTS = 17
+
+
+_CATEGORY_BY_NAME: Dict[str, Category] = {c.name.lower(): c for c in Category}
+
+
+def category_of(name: str) -> Category:
+    return _CATEGORY_BY_NAME.get(name, Category.OTHER)
+
+
+class _Reference(NamedTuple):
+    low: float
+    high: float
+    error_limit: float  # above this the plausibility check reports an error
+    low_decimal: Decimal
+    high_decimal: Decimal
+
+
+def _compile_tables() -> Tuple[Tuple[Optional[_Reference], ...], Tuple[Optional[str], ...]]:
+    """Turn REFERENCE_VALUES / ILLEGAL_CATEGORIES into tables indexed by Category."""
+    reference: List[Optional[_Reference]] = [None] * len(Category)
+    illegal: List[Optional[str]] = [None] * len(Category)
+    for name, ref in REFERENCE_VALUES.items():
+        reference[_CATEGORY_BY_NAME[name]] = _Reference(
+            low=ref["low"],
+            high=ref["high"],
+            error_limit=ref["high"] * 1.5,
+            low_decimal=Decimal(str(ref["low"])),
+            high_decimal=Decimal(str(ref["high"])),
+        )
+    for name, reason in ILLEGAL_CATEGORIES.items():
+        illegal[_CATEGORY_BY_NAME[name]] = reason
+    return tuple(reference), tuple(illegal)
+
+
+REFERENCE_TABLE, ILLEGAL_TABLE = _compile_tables()
+
 CheckItem = Tuple[str, str, str, str, str]  # (check_type, severity, title, description, recommendation)
 
+MATH_TOLERANCE = Decimal("0.05")  # Allow 5 cent rounding tolerance per position
+SUM_TOLERANCE = Decimal("1.00")
+_CENT = Decimal("0.01")
+_HUNDRED = Decimal("100")
+
+MATH_OK: CheckItem = (
+    "math",
+    "ok",
+    "Rechnerische Prüfung bestanden",
+    "Alle Berechnungen sind mathematisch korrekt.",
+    None,
+)
+PLAUSIBILITY_OK: CheckItem = (
+    "plausibility",
+    "ok",
+    "Kosten im Normbereich",
+    "Alle geprüften Positionen liegen im Bereich des DMB Betriebskostenspiegels 2023.",
+    None,
+)
+LEGAL_OK: CheckItem = (
+    "legal",
+    "ok",
+    "Keine unzulässigen Positionen",
+    "Alle abgerechneten Positionen sind dem Grunde nach umlagefähig.",
+    None,
+)
+COMPLETENESS_OK: CheckItem = (
+    "completeness",
+    "ok",
+    "Vollständigkeit geprüft",
+    "Die Abrechnung enthält alle erwarteten Positionen.",
+    None,
+)
+
+
+# ─── Result builders (shared by the per-bill and the batch path) ──────────────
+
+def _math_error_item(name, total_amount, share_percent, expected, actual, diff) -> CheckItem:
+    return (
+        "math",
+        "error",
+        f"Rechenfehler: {name}",
+        f"Der Anteil von {share_percent}% von {total_amount}€ ergibt {expected}€, "
+        f"aber abgerechnet wurden {actual}€ (Differenz: {diff}€).",
+        "Prüfen Sie diese Position genau und fordern Sie eine Korrektur.",
+    )
+
+
+def _sum_warning_item(sum_tenant_amounts, total_costs, diff) -> CheckItem:
+    return (
+        "math",
+        "warning",
+        "Summendifferenz",
+        f"Die Summe der Einzelpositionen ({sum_tenant_amounts:.2f}€) weicht vom "
+        f"Gesamtbetrag ({total_costs:.2f}€) um {diff:.2f}€ ab.",
+        "Bitten Sie den Vermieter um eine aufgeschlüsselte Abrechnung.",
+    )
+
+
+def _plausibility_error_item(name: str, cost_per_sqm: float, low: float, high: float) -> CheckItem:
+    return (
+        "plausibility",
+        "error",
+        f"Ungewöhnlich hohe Kosten: {name}",
+        f"Der Anteil beträgt {cost_per_sqm:.2f} €/m²/Jahr. "
+        f"Der Betriebskostenspiegel 2023 gibt {low:.2f}–{high:.2f} €/m²/Jahr an. "
+        f"Ihr Wert liegt {((cost_per_sqm/high)-1)*100:.0f}% über dem Höchstwert.",
+        "Fordern Sie eine detaillierte Aufschlüsselung dieser Position vom Vermieter.",
+    )
+
+
+def _plausibility_warning_item(name: str, cost_per_sqm: float, low: float, high: float) -> CheckItem:
+    return (
+        "plausibility",
+        "warning",
+        f"Hohe Kosten: {name}",
+        f"Der Anteil beträgt {cost_per_sqm:.2f} €/m²/Jahr. "
+        f"Der Richtwert liegt bei {low:.2f}–{high:.2f} €/m²/Jahr.",
+        "Vergleichen Sie mit ähnlichen Objekten in Ihrer Stadt.",
+    )
+
+
+def _legal_error_item(name: str, reason: str) -> CheckItem:
+    return (
+        "legal",
+        "error",
+        f"Unzulässige Position: {name}",
+        reason,
+        "Widersprechen Sie dieser Position schriftlich. Sie müssen diesen Betrag nicht zahlen.",
+    )
+
+
+def _completeness_items(
+    heating_type: str,
+    has_heating: bool,
+    has_water_sewage: bool,
+    position_count: int,
+) -> List[CheckItem]:
+    results = []
+
+    # Heating should be present if central heating
+    if heating_type == "central" and not has_heating:
+        results.append((
+            "completeness",
+            "warning",
+            "Heizkosten fehlen",
+            "Laut Mietverhältnis haben Sie eine Zentralheizung, aber die Abrechnung enthält keine Heizkosten.",
+            "Fragen Sie den Vermieter, warum Heizkosten nicht separat abgerechnet werden.",
+        ))
+
+    # Water/sewage almost always required
+    if not has_water_sewage and position_count > 0:
+        results.append((
+            "completeness",
+            "warning",
+            "Wasser/Abwasser nicht separat ausgewiesen",
+            "Wasser- und Abwasserkosten werden typischerweise separat ausgewiesen.",
+            None,
+        ))
+
+    if not results:
+        results.append(COMPLETENESS_OK)
+
+    return results
+
 
 def check_math(
     bill: UtilityBill,
@@ -47,19 +242,12 @@ def check_math(
 
     for pos in positions:
         if pos.tenant_share_percent is not None and pos.total_amount is not None and pos.tenant_amount is not None:
-            expected = (pos.total_amount * pos.tenant_share_percent / Decimal("100")).quantize(Decimal("0.01"))
-            actual = pos.tenant_amount.quantize(Decimal("0.01"))
+            expected = (pos.total_amount * pos.tenant_share_percent / _HUNDRED).quantize(_CENT)
+            actual = pos.tenant_amount.quantize(_CENT)
             diff = abs(expected - actual)
 
-            if diff > Decimal("0.05"):  # Allow 5 cent rounding tolerance
-                results.append((
-                    "math",
-                    "error",
-                    f"Rechenfehler: {pos.name}",
-                    f"Der Anteil von {pos.tenant_share_percent}% von {pos.total_amount}€ ergibt {expected}€, "
-                    f"aber abgerechnet wurden {actual}€ (Differenz: {diff}€).",
-                    "Prüfen Sie diese Position genau und fordern Sie eine Korrektur.",
-                ))
+            if diff > MATH_TOLERANCE:
+                results.append(_math_error_item(pos.name, pos.total_amount, pos.tenant_share_percent, expected, actual, diff))
 
     # Check sum of positions vs total
     if bill.total_costs is not None and positions:
@@ -67,24 +255,11 @@ def check_math(
             (pos.tenant_amount or Decimal("0")) for pos in positions
         )
         diff = abs(sum_tenant_amounts - bill.total_costs)
-        if diff > Decimal("1.00"):
-            results.append((
-                "math",
-                "warning",
-                "Summendifferenz",
-                f"Die Summe der Einzelpositionen ({sum_tenant_amounts:.2f}€) weicht vom "
-                f"Gesamtbetrag ({bill.total_costs:.2f}€) um {diff:.2f}€ ab.",
-                "Bitten Sie den Vermieter um eine aufgeschlüsselte Abrechnung.",
-            ))
+        if diff > SUM_TOLERANCE:
+            results.append(_sum_warning_item(sum_tenant_amounts, bill.total_costs, diff))
 
     if not results:
-        results.append((
-            "math",
-            "ok",
-            "Rechnerische Prüfung bestanden",
-            "Alle Berechnungen sind mathematisch korrekt.",
-            None,
-        ))
+        results.append(MATH_OK)
 
     return results
 
@@ -166,36 +341,15 @@ def check_plausibility(
 
         if cost_per_sqm > ref["high"] * 1.5:
             pos.is_plausible = False
-            results.append((
-                "plausibility",
-                "error",
-                f"Ungewöhnlich hohe Kosten: {pos.name}",
-                f"Der Anteil beträgt {cost_per_sqm:.2f} €/m²/Jahr. "
-                f"Der Betriebskostenspiegel 2023 gibt {ref['low']:.2f}–{ref['high']:.2f} €/m²/Jahr an. "
-                f"Ihr Wert liegt {((cost_per_sqm/ref['high'])-1)*100:.0f}% über dem Höchstwert.",
-                "Fordern Sie eine detaillierte Aufschlüsselung dieser Position vom Vermieter.",
-            ))
+            results.append(_plausibility_error_item(pos.name, cost_per_sqm, ref["low"], ref["high"]))
         elif cost_per_sqm > ref["high"]:
             pos.is_plausible = False
-            results.append((
-                "plausibility",
-                "warning",
-                f"Hohe Kosten: {pos.name}",
-                f"Der Anteil beträgt {cost_per_sqm:.2f} €/m²/Jahr. "
-                f"Der Richtwert liegt bei {ref['low']:.2f}–{ref['high']:.2f} €/m²/Jahr.",
-                "Vergleichen Sie mit ähnlichen Objekten in Ihrer Stadt.",
-            ))
+            results.append(_plausibility_warning_item(pos.name, cost_per_sqm, ref["low"], ref["high"]))
         else:
             pos.is_plausible = True
 
     if not any(r[1] in ("error", "warning") for r in results):
-        results.append((
-            "plausibility",
-            "ok",
-            "Kosten im Normbereich",
-            "Alle geprüften Positionen liegen im Bereich des DMB Betriebskostenspiegels 2023.",
-            None,
-        ))
+        results.append(PLAUSIBILITY_OK)
 
     return results
 
@@ -207,22 +361,10 @@ def check_legal(positions: List[BillPosition]) -> List[CheckItem]:
     for pos in positions:
         if pos.category in ILLEGAL_CATEGORIES:
             pos.is_allowed = False
-            results.append((
-                "legal",
-                "error",
-                f"Unzulässige Position: {pos.name}",
-                ILLEGAL_CATEGORIES[pos.category],
-                "Widersprechen Sie dieser Position schriftlich. Sie müssen diesen Betrag nicht zahlen.",
-            ))
+            results.append(_legal_error_item(pos.name, ILLEGAL_CATEGORIES[pos.category]))
 
     if not results:
-        results.append((
-            "legal",
-            "ok",
-            "Keine unzulässigen Positionen",
-            "Alle abgerechneten Positionen sind dem Grunde nach umlagefähig.",
-            None,
-        ))
+        results.append(LEGAL_OK)
 
     return results
 
@@ -233,39 +375,10 @@ def check_completeness(
     bill: UtilityBill,
 ) -> List[CheckItem]:
     """Check for missing required positions."""
-    results = []
     categories = {pos.category for pos in positions}
-
-    # Heating should be present if central heating
-    if contract.heating_type == "central" and "heating" not in categories:
-        results.append((
-            "completeness",
-            "warning",
-            "Heizkosten fehlen",
-            "Laut Mietverhältnis haben Sie eine Zentralheizung, aber die Abrechnung enthält keine Heizkosten.",
-            "Fragen Sie den Vermieter, warum Heizkosten nicht separat abgerechnet werden.",
-        ))
-
-    # Water/sewage almost always required
-    if "water_sewage" not in categories and len(positions) > 0:
-        results.append((
-            "completeness",
-            "warning",
-            "Wasser/Abwasser nicht separat ausgewiesen",
-            "Wasser- und Abwasserkosten werden typischerweise separat ausgewiesen.",
-            None,
-        ))
-
-    if not results:
-        results.append((
-            "completeness",
-            "ok",
-            "Vollständigkeit geprüft",
-            "Die Abrechnung enthält alle erwarteten Positionen.",
-            None,
-        ))
-
-    return results
+    return _completeness_items(
+        contract.heating_type, "heating" in categories, "water_sewage" in categories, len(positions),
+    )
 
 
 def calculate_score(all_results: List[CheckItem]) -> int:
@@ -275,7 +388,10 @@ def calculate_score(all_results: List[CheckItem]) -> int:
 
     errors = sum(1 for r in all_results if r[1] == "error")
     warnings = sum(1 for r in all_results if r[1] == "warning")
+    return score_from_counts(errors, warnings)
 
+
+def score_from_counts(errors: int, warnings: int) -> int:
     # Start at 100, deduct for issues
     score = 100
     score -= errors * 20
@@ -283,19 +399,481 @@ def calculate_score(all_results: List[CheckItem]) -> int:
     return max(0, min(100, score))
 
 
+# ─── Rule registry ────────────────────────────────────────────────────────────
+
+PositionHook = Callable[[BillPosition, Category, "BillScan"], Optional[CheckItem]]
+BillHook = Callable[["BillScan"], List[CheckItem]]
+# (columns, rows to evaluate, scans indexed by columns.owner) -> (row, item) per finding
+ColumnHook = Callable[["PositionColumns", Iterable[int], Sequence["BillScan"]], Iterable[Tuple[int, CheckItem]]]
+
+
+@dataclass(frozen=True)
+class CheckRule:
+    """
+    A registered check.
+
+    reads     -- qualified fields the check depends on ("bill.received_date",
+                 "position.tenant_amount", "contract.heating_type", ...).
+    requires  -- position fields that must be set; the position hook is skipped
+                 for positions where any of them is None.
+    categories -- restrict the position hook to these categories (None = all).
+    position_hook -- called once per matching position, returns an item or None.
+    column_hook   -- alternative to position_hook: called once with the positions
+                 of every bill as PositionColumns and yields (row, item) for each
+                 finding. It sees every row and applies its own category and
+                 None filters, so a batch costs one loop per rule instead of one
+                 call per position.
+    bill_hook     -- called once per bill after all positions were visited.
+    ok_item   -- emitted when the check produced no items at all.
+
+    Rules reading contract fields are skipped when no contract is available.
+    """
+    check_type: str
+    reads: FrozenSet[str]
+    requires: Tuple[str, ...] = ()
+    categories: Optional[FrozenSet[Category]] = None
+    position_hook: Optional[PositionHook] = None
+    column_hook: Optional[ColumnHook] = None
+    bill_hook: Optional[BillHook] = None
+    ok_item: Optional[CheckItem] = None
+
+
+class _CompiledRule(NamedTuple):
+    index: int
+    rule: CheckRule
+    needs_contract: bool
+    reads_positions: bool
+    required: Tuple[str, ...]  # position attributes that must not be None
+
+
+class _Selection(NamedTuple):
+    active: Optional[FrozenSet[int]]  # rule indexes to evaluate, None = all
+    reads_positions: bool  # whether any of them needs the position columns
+
+
+_CHECK_RULES: List[CheckRule] = []
+_COMPILED: Tuple[_CompiledRule, ...] = ()
+_SELECTIONS: Dict[Optional[FrozenSet[str]], _Selection] = {}
+
+
+def _compile_rules() -> None:
+    global _COMPILED
+    _COMPILED = tuple(
+        _CompiledRule(
+            index=index,
+            rule=rule,
+            needs_contract=any(field.startswith("contract.") for field in rule.reads),
+            reads_positions=(
+                rule.position_hook is not None
+                or rule.column_hook is not None
+                or any(field.startswith("position.") for field in rule.reads)
+            ),
+            required=tuple(field.split(".", 1)[1] for field in rule.requires),
+        )
+        for index, rule in enumerate(_CHECK_RULES)
+    )
+    _SELECTIONS.clear()
+
+
+def _selection(only: Optional[Iterable[str]]) -> _Selection:
+    """The rules run_all_checks(only=...) evaluates; cached, as edits repeat the same few sets."""
+    key = frozenset(only) if only is not None else None
+    selection = _SELECTIONS.get(key)
+    if selection is None:
+        chosen = [c for c in _COMPILED if key is None or c.rule.check_type in key]
+        selection = _Selection(
+            active=None if key is None else frozenset(c.index for c in chosen),
+            reads_positions=any(c.reads_positions for c in chosen),
+        )
+        _SELECTIONS[key] = selection
+    return selection
+
+
+def register_check(rule: CheckRule) -> CheckRule:
+    """Add a check; its results are appended after the checks registered before it."""
+    if any(r.check_type == rule.check_type for r in _CHECK_RULES):
+        raise ValueError(f"Check '{rule.check_type}' is already registered")
+    for field in rule.requires:
+        if not field.startswith("position."):
+            raise ValueError(f"Check '{rule.check_type}': requires only supports position fields, got '{field}'")
+    if rule.position_hook is not None and rule.column_hook is not None:
+        raise ValueError(f"Check '{rule.check_type}': give either a position_hook or a column_hook")
+    _CHECK_RULES.append(rule)
+    _compile_rules()
+    return rule
+
+
+def unregister_check(check_type: str) -> None:
+    _CHECK_RULES[:] = [r for r in _CHECK_RULES if r.check_type != check_type]
+    _compile_rules()
+
+
+def registered_checks() -> Tuple[CheckRule, ...]:
+    return tuple(_CHECK_RULES)
+
+
+def affected_checks(changed_fields: Iterable[str]) -> Tuple[str, ...]:
+    """
+    check_types of the registered rules reading any of the changed fields, in
+    registration order. "position.*" (or "bill.*", "contract.*") matches every
+    field of that entity, e.g. when positions were added or removed.
+    """
+    changed = set(changed_fields)
+    prefixes = tuple(field[:-1] for field in changed if field.endswith(".*"))
+    return tuple(
+        rule.check_type
+        for rule in _CHECK_RULES
+        if not rule.reads.isdisjoint(changed) or any(field.startswith(prefixes) for field in rule.reads)
+    )
+
+
+def checks_read_contract(check_types: Iterable[str]) -> bool:
+    wanted = set(check_types)
+    return any(c.needs_contract for c in _COMPILED if c.rule.check_type in wanted)
+
+
+class BillScan:
+    """
+    Per-bill state while the registered rules are evaluated.
+
+    Position rules add their findings with add_item(), which also keeps the
+    severity counts for the score. The aggregates bill hooks read
+    (tenant_sum, categories, position_count) are set from the bill's
+    columns before the bill hooks run in finish().
+
+    With only set, just the rules with these check_types are evaluated.
+    """
+
+    __slots__ = (
+        "bill", "contract", "sqm", "active", "buckets",
+        "tenant_sum", "categories", "position_count", "errors", "warnings",
+    )
+
+    def __init__(
+        self,
+        bill: UtilityBill,
+        contract: Optional[RentalContract],
+        only: Optional[Iterable[str]] = None,
+    ):
+        self.bill = bill
+        self.contract = contract
+        self.sqm = float(contract.apartment_size_sqm) if contract is not None else 0.0
+        self.active = _selection(only).active
+        self.buckets: List[List[CheckItem]] = [[] for _ in _COMPILED]
+        self.tenant_sum = Decimal("0")
+        self.categories: set = set()
+        self.position_count = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def add_item(self, index: int, item: CheckItem) -> None:
+        self.buckets[index].append(item)
+        severity = item[1]
+        if severity == "error":
+            self.errors += 1
+        elif severity == "warning":
+            self.warnings += 1
+
+    def finish(self) -> Tuple[List[CheckItem], int]:
+        results: List[CheckItem] = []
+        has_contract = self.contract is not None
+        for index, rule, needs_contract, _reads_positions, _required in _COMPILED:
+            if needs_contract and not has_contract:
+                continue
+            if self.active is not None and index not in self.active:
+                continue
+            if rule.bill_hook is not None:
+                for item in rule.bill_hook(self):
+                    self.add_item(index, item)
+            items = self.buckets[index]
+            if items:
+                results.extend(items)
+            elif rule.ok_item is not None:
+                results.append(rule.ok_item)
+        return results, score_from_counts(self.errors, self.warnings)
+
+
+_POSITION_FIELDS = attrgetter("category", "name", "total_amount", "tenant_share_percent", "tenant_amount")
+_ZERO = Decimal("0")
+
+
+class PositionColumns:
+    """
+    The positions of one or more bills as parallel columns.
+
+    Row i is positions[i] of the bill scanned by scans[owner[i]]; the rows of a
+    bill are contiguous and in position order. Columns are tuples, read from
+    the positions once when the columns are built.
+    """
+
+    __slots__ = ("positions", "owner", "category", "name", "total_amount", "tenant_share_percent", "tenant_amount")
+
+    def __init__(self, positions: Sequence[BillPosition], owner: Sequence[int]):
+        self.positions = positions
+        self.owner = owner
+        if positions:
+            names, self.name, self.total_amount, self.tenant_share_percent, self.tenant_amount = zip(
+                *map(_POSITION_FIELDS, positions)
+            )
+        else:
+            names = self.name = self.total_amount = self.tenant_share_percent = self.tenant_amount = ()
+        self.category = tuple(map(_CATEGORY_BY_NAME.get, names, repeat(Category.OTHER)))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def _each_position(compiled: _CompiledRule, columns: PositionColumns, rows: Iterable[int], scans: Sequence["BillScan"]) -> Iterator[Tuple[int, CheckItem]]:
+    """Column evaluation of a rule that only has a position_hook."""
+    hook, required, categories = compiled.rule.position_hook, compiled.required, compiled.rule.categories
+    for row in rows:
+        category = columns.category[row]
+        if categories is not None and category not in categories:
+            continue
+        pos = columns.positions[row]
+        if any(getattr(pos, attr) is None for attr in required):
+            continue
+        item = hook(pos, category, scans[columns.owner[row]])
+        if item is not None:
+            yield row, item
+
+
+def _evaluate_columns(
+    scans: Sequence["BillScan"],
+    columns: PositionColumns,
+    bounds: Sequence[Tuple[int, int]],
+) -> None:
+    """
+    Run the position rules over the columns, each rule once for all bills, and
+    collect the aggregates the bill hooks read. bounds[i] is the row range of
+    scans[i]; scans then only need finish().
+    """
+    tenant_amount, category = columns.tenant_amount, columns.category
+    for scan, (start, end) in zip(scans, bounds):
+        scan.position_count = end - start
+        scan.categories = set(category[start:end])
+        scan.tenant_sum = sum(filter(None, tenant_amount[start:end]), _ZERO)
+
+    owner = columns.owner
+    for compiled in _COMPILED:
+        rule = compiled.rule
+        if rule.column_hook is None and rule.position_hook is None:
+            continue
+        index = compiled.index
+        eligible = [
+            (scan.active is None or index in scan.active)
+            and (scan.contract is not None or not compiled.needs_contract)
+            for scan in scans
+        ]
+        if not any(eligible):
+            continue
+        if all(eligible):
+            rows: Iterable[int] = range(len(columns))
+        else:
+            rows = chain.from_iterable(range(*b) for b, ok in zip(bounds, eligible) if ok)
+        if rule.column_hook is not None:
+            findings = rule.column_hook(columns, rows, scans)
+        else:
+            findings = _each_position(compiled, columns, rows, scans)
+        for row, item in findings:
+            scans[owner[row]].add_item(index, item)
+
+
+# ─── Built-in checks ──────────────────────────────────────────────────────────
+
+def _math_sum(scan: BillScan) -> List[CheckItem]:
+    total_costs = scan.bill.total_costs
+    if total_costs is None or not scan.position_count:
+        return []
+    diff = abs(scan.tenant_sum - total_costs)
+    if diff > SUM_TOLERANCE:
+        return [_sum_warning_item(scan.tenant_sum, total_costs, diff)]
+    return []
+
+
+def _deadline(scan: BillScan) -> List[CheckItem]:
+    return check_deadline(scan.bill)
+
+
+def _completeness(scan: BillScan) -> List[CheckItem]:
+    return _completeness_items(
+        scan.contract.heating_type,
+        Category.HEATING in scan.categories,
+        Category.WATER_SEWAGE in scan.categories,
+        scan.position_count,
+    )
+
+
+def _math_columns(columns: PositionColumns, rows: Iterable[int], scans: Sequence[BillScan]) -> Iterator[Tuple[int, CheckItem]]:
+    name, total_amount, share_percent, tenant_amount = (
+        columns.name, columns.total_amount, columns.tenant_share_percent, columns.tenant_amount,
+    )
+    for row in rows:
+        total, share, amount = total_amount[row], share_percent[row], tenant_amount[row]
+        if total is None or share is None or amount is None:
+            continue
+        expected = (total * share / _HUNDRED).quantize(_CENT)
+        actual = amount.quantize(_CENT)
+        diff = abs(expected - actual)
+        if diff > MATH_TOLERANCE:
+            yield row, _math_error_item(name[row], total, share, expected, actual, diff)
+
+
+def _plausibility_columns(columns: PositionColumns, rows: Iterable[int], scans: Sequence[BillScan]) -> Iterator[Tuple[int, CheckItem]]:
+    # Annotations are only written when they change: on stored positions an
+    # unchanged write still costs an attribute event, and most are unchanged
+    positions, owner, category, name, tenant_amount = (
+        columns.positions, columns.owner, columns.category, columns.name, columns.tenant_amount,
+    )
+    for row in rows:
+        ref = REFERENCE_TABLE[category[row]]
+        amount = tenant_amount[row]
+        if ref is None or amount is None:
+            continue
+        sqm = scans[owner[row]].sqm
+        if sqm <= 0:
+            continue
+        cost_per_sqm = float(amount) / sqm
+        pos = positions[row]
+        if pos.reference_value_low != ref.low_decimal:
+            pos.reference_value_low = ref.low_decimal
+        if pos.reference_value_high != ref.high_decimal:
+            pos.reference_value_high = ref.high_decimal
+        plausible = cost_per_sqm <= ref.high
+        if pos.is_plausible is not plausible:
+            pos.is_plausible = plausible
+        if cost_per_sqm > ref.error_limit:
+            yield row, _plausibility_error_item(name[row], cost_per_sqm, ref.low, ref.high)
+        elif not plausible:
+            yield row, _plausibility_warning_item(name[row], cost_per_sqm, ref.low, ref.high)
+
+
+def _legal_columns(columns: PositionColumns, rows: Iterable[int], scans: Sequence[BillScan]) -> Iterator[Tuple[int, CheckItem]]:
+    positions, category, name = columns.positions, columns.category, columns.name
+    for row in rows:
+        reason = ILLEGAL_TABLE[category[row]]
+        if reason is not None:
+            if positions[row].is_allowed is not False:
+                positions[row].is_allowed = False
+            yield row, _legal_error_item(name[row], reason)
+
+
+register_check(CheckRule(
+    check_type="math",
+    reads=frozenset({
+        "position.name", "position.total_amount", "position.tenant_share_percent",
+        "position.tenant_amount", "bill.total_costs",
+    }),
+    column_hook=_math_columns,
+    bill_hook=_math_sum,
+    ok_item=MATH_OK,
+))
+register_check(CheckRule(
+    check_type="deadline",
+    reads=frozenset({"bill.billing_period_end", "bill.received_date"}),
+    bill_hook=_deadline,
+))
+register_check(CheckRule(
+    check_type="plausibility",
+    reads=frozenset({
+        "position.name", "position.category", "position.tenant_amount", "contract.apartment_size_sqm",
+    }),
+    column_hook=_plausibility_columns,
+    ok_item=PLAUSIBILITY_OK,
+))
+register_check(CheckRule(
+    check_type="legal",
+    reads=frozenset({"position.name", "position.category"}),
+    column_hook=_legal_columns,
+    ok_item=LEGAL_OK,
+))
+register_check(CheckRule(
+    check_type="completeness",
+    reads=frozenset({"position.category", "contract.heating_type"}),
+    bill_hook=_completeness,
+    ok_item=COMPLETENESS_OK,
+))
+
+
+# ─── Entry points ─────────────────────────────────────────────────────────────
+
 def run_all_checks(
     bill: UtilityBill,
     positions: List[BillPosition],
-    contract: RentalContract,
+    contract: Optional[RentalContract],
+    fused: bool = True,
+    only: Optional[Iterable[str]] = None,
 ) -> Tuple[List[CheckItem], int]:
-    """Run all checks and return results with score."""
-    all_results: List[CheckItem] = []
-
-    all_results.extend(check_math(bill, positions))
-    all_results.extend(check_deadline(bill))
-    all_results.extend(check_plausibility(positions, contract))
-    all_results.extend(check_legal(positions))
-    all_results.extend(check_completeness(positions, contract, bill))
-
-    score = calculate_score(all_results)
-    return all_results, score
+    """
+    Run all checks and return results with score.
+
+    By default every registered rule is evaluated over the bill's
+    PositionColumns, which read each position once. With fused=False the reference check_*
+    functions are chained as separate passes; both modes return identical
+    results for the built-in checks.
+
+    only restricts the run to the given check_types (see affected_checks);
+    the returned score then covers those checks alone.
+    """
+    if not fused:
+        if only is not None:
+            raise ValueError("only is not supported with fused=False")
+        all_results: List[CheckItem] = []
+        all_results.extend(check_math(bill, positions))
+        all_results.extend(check_deadline(bill))
+        all_results.extend(check_plausibility(positions, contract))
+        all_results.extend(check_legal(positions))
+        all_results.extend(check_completeness(positions, contract, bill))
+        return all_results, calculate_score(all_results)
+
+    scan = BillScan(bill, contract, only)
+    # A deadline-only run (received_date edited) does not touch the positions
+    if _selection(only).reads_positions:
+        _evaluate_columns((scan,), PositionColumns(positions, [0] * len(positions)), ((0, len(positions)),))
+    return scan.finish()
+
+
+BillCheckInput = Tuple[UtilityBill, List[BillPosition], Optional[RentalContract]]
+
+# Positions per column block of run_checks_batch. Blocks stay small enough to
+# be freed by reference counting instead of piling up for the cyclic GC.
+BATCH_BLOCK_ROWS = 1024
+
+
+def run_checks_batch(
+    bills: Iterable[BillCheckInput],
+) -> List[Tuple[List[CheckItem], int]]:
+    """
+    Run all checks for many bills at once.
+
+    The positions of all bills are read into one set of PositionColumns and
+    every position rule runs once over all of them; only the bill hooks and
+    the result assembly remain per bill. Results, position annotations and
+    scores are identical to calling run_all_checks() for every bill; the
+    output list is in input order.
+    """
+    results: List[Tuple[List[CheckItem], int]] = []
+    scans: List[BillScan] = []
+    positions: List[BillPosition] = []
+    owner: List[int] = []
+    bounds: List[Tuple[int, int]] = []
+
+    def flush() -> None:
+        _evaluate_columns(scans, PositionColumns(positions, owner), bounds)
+        results.extend(scan.finish() for scan in scans)
+        scans.clear()
+        positions.clear()
+        owner.clear()
+        bounds.clear()
+
+    for bill, bill_positions, contract in bills:
+        start = len(positions)
+        positions.extend(bill_positions)
+        owner.extend(repeat(len(scans), len(bill_positions)))
+        bounds.append((start, len(positions)))
+        scans.append(BillScan(bill, contract))
+        if len(positions) >= BATCH_BLOCK_ROWS:
+            flush()
+    if scans:
+        flush()
+    return results
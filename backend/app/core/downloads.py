@@ -0,0 +1,186 @@
+"""
+File downloads with conditional GET and byte ranges.
+
+file_response() answers If-None-Match / If-Modified-Since with 304 and serves
+a single `Range` (honouring `If-Range`) as 206, so interrupted mobile
+downloads resume instead of restarting. The API itself streams the file in
+CHUNK_SIZE reads.
+
+Zero-copy transfer is nginx's job: with X_ACCEL_REDIRECT set, files below
+DOCUMENT_STORAGE_PATH and PDF_STORAGE_PATH are handed to nginx (see
+nginx/default.conf), the response carries only headers and nginx sends the
+file with sendfile, ranges included, keeping the ETag set here.
+"""
+import asyncio
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
+import aiofiles
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+# Filesystem root -> internal nginx location serving it
+ACCEL_LOCATIONS = (
+    ("DOCUMENT_STORAGE_PATH", "/_protected/documents/"),
+    ("PDF_STORAGE_PATH", "/_protected/pdfs/"),
+)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (first, last) byte positions of a `Range: bytes=...` header, or None to send
+    the whole file. Multiple ranges and malformed headers are ignored, which
+    RFC 9110 allows; a range starting past the end raises RangeNotSatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match uses."""
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _range_applies(request: Request, etag: str, last_modified: str) -> bool:
+    """If-Range: resume only while the representation is the one the client has."""
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return not etag.startswith("W/") and if_range == etag
+    return if_range == last_modified
+
+
+def _accel_uri(path: str) -> Optional[str]:
+    for setting, location in ACCEL_LOCATIONS:
+        relative = os.path.relpath(path, getattr(settings, setting))
+        if not relative.startswith(os.pardir):
+            return location + quote(relative)
+    return None
+
+
+def content_disposition(filename: str) -> str:
+    return f'attachment; filename="{filename}"'
+
+
+class RangedFileResponse(Response):
+    """`count` bytes of a file from `offset`, read in CHUNK_SIZE pieces."""
+
+    def __init__(self, path: str, size: int, status_code: int, headers: dict, offset: int = 0, count: Optional[int] = None):
+        self.path = path
+        self.size = size
+        self.offset = offset
+        self.count = size - offset if count is None else count
+        self.status_code = status_code
+        self.media_type = None
+        self.background = None
+        headers["Content-Length"] = str(self.count)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") != "HEAD" and self.count > 0:
+            async with aiofiles.open(self.path, "rb") as f:
+                await f.seek(self.offset)
+                remaining = self.count
+                while remaining > 0:
+                    chunk = await f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def file_response(
+    request: Request,
+    path: str,
+    *,
+    media_type: str,
+    filename: str,
+    etag: Optional[str] = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    Serve `path` as a download. `etag` is a content hash and becomes a strong
+    ETag; without one a weak ETag is derived from size and mtime.
+    Raises FileNotFoundError when the file is gone.
+    """
+    stat_result = await asyncio.to_thread(os.stat, path)
+    size = stat_result.st_size
+    etag = f'"{etag}"' if etag else f'W/"{int(stat_result.st_mtime):x}-{size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Type"] = media_type
+    headers["Content-Disposition"] = content_disposition(filename)
+
+    if settings.X_ACCEL_REDIRECT:
+        uri = _accel_uri(path)
+        if uri is not None:
+            # nginx answers Range and conditional requests for the file itself
+            headers["X-Accel-Redirect"] = uri
+            return Response(status_code=200, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header and _range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            first, last = byte_range
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+            return RangedFileResponse(path, size, 206, headers, offset=first, count=last - first + 1)
+
+    return RangedFileResponse(path, size, 200, headers)
@@ -0,0 +1,150 @@
+"""
+Rate limiting for abuse-prone endpoints (login, register).
+
+Every key holds a sliding-window counter: the hits of the current fixed
+window plus those of the previous one, weighted by how much of the previous
+window still overlaps the sliding window. That is O(1) time and memory per
+key, whatever the request rate.
+
+Backends:
+- MemoryBackend: per process, at most RATE_LIMIT_MAX_KEYS keys (LRU eviction).
+  Used in tests and as the fallback.
+- DatabaseBackend: one atomic upsert per hit on rate_limit_counters, so all
+  API workers share the counters. Expired rows are purged periodically.
+
+RATE_LIMIT_BACKEND picks the backend. If the database is unreachable the
+limiter keeps working per process on the memory fallback.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, window: int, now: float) -> tuple[int, int]:
+        """Count one hit; return (hits in the current window, hits in the previous one)."""
+        ...
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> [window index, count, previous window count]
+        self._counters: "OrderedDict[str, list[int]]" = OrderedDict()
+
+    async def hit(self, key: str, window: int, now: float) -> tuple[int, int]:
+        current = int(now // window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [current, 0, 0]
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+        if counter[0] != current:
+            counter[2] = counter[1] if counter[0] == current - 1 else 0
+            counter[0], counter[1] = current, 0
+        counter[1] += 1
+        return counter[1], counter[2]
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class DatabaseBackend:
+    # Plain SQL: INSERT .. ON CONFLICT .. RETURNING works on PostgreSQL and SQLite alike.
+    # All right-hand sides of SET see the old row.
+    _HIT = text("""
+        INSERT INTO rate_limit_counters (key, window_index, count, prev_count, expires_at)
+        VALUES (:key, :window, 1, 0, :expires_at)
+        ON CONFLICT (key) DO UPDATE SET
+            prev_count = CASE
+                WHEN rate_limit_counters.window_index = :window THEN rate_limit_counters.prev_count
+                WHEN rate_limit_counters.window_index = :window - 1 THEN rate_limit_counters.count
+                ELSE 0 END,
+            count = CASE
+                WHEN rate_limit_counters.window_index = :window THEN rate_limit_counters.count + 1
+                ELSE 1 END,
+            window_index = :window,
+            expires_at = :expires_at
+        RETURNING count, prev_count
+    """)
+    _PURGE = text("DELETE FROM rate_limit_counters WHERE expires_at < :now")
+    PURGE_EVERY = 1000
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._hits = 0
+
+    async def hit(self, key: str, window: int, now: float) -> tuple[int, int]:
+        current = int(now // window)
+        # A counter matters for the current and the next window
+        expires_at = (current + 2) * window
+        async with self.engine.begin() as conn:
+            row = (await conn.execute(
+                self._HIT, {"key": key, "window": current, "expires_at": expires_at}
+            )).one()
+            self._hits += 1
+            if self._hits % self.PURGE_EVERY == 0:
+                await conn.execute(self._PURGE, {"now": int(now)})
+        return row.count, row.prev_count
+
+
+def retry_after(count: int, prev_count: int, limit: int, window: int, now: float) -> Optional[int]:
+    """Seconds until a new hit would be allowed again, or None if this hit is allowed."""
+    elapsed = now % window
+    if prev_count * (1 - elapsed / window) + count <= limit:
+        return None
+    if count < limit:
+        # Allowed again once enough of the previous window has slid out
+        allowed_at = (1 - (limit - count - 1) / prev_count) * window
+    else:
+        # Not before the next window, where this window's hits are the weighted ones
+        allowed_at = window + (1 - (limit - 1) / count) * window
+    return max(1, math.ceil(allowed_at - elapsed))
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, fallback: Optional[RateLimitBackend] = None):
+        self.backend = backend
+        self.fallback = fallback
+
+    async def hit(self, key: str, limit: int, window: int) -> Optional[int]:
+        """Count a hit for key; return seconds to wait if it exceeds limit per window, else None."""
+        now = time.time()
+        try:
+            count, prev_count = await self.backend.hit(key, window, now)
+        except Exception:
+            if self.fallback is None:
+                raise
+            logger.warning("Rate limit backend failed, using per-process fallback", exc_info=True)
+            count, prev_count = await self.fallback.hit(key, window, now)
+        return retry_after(count, prev_count, limit, window, now)
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        memory = MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+        if settings.RATE_LIMIT_BACKEND == "database":
+            from app.database import engine
+            _limiter = RateLimiter(DatabaseBackend(engine), fallback=memory)
+        else:
+            _limiter = RateLimiter(memory)
+    return _limiter
+
+
+def set_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Replace the limiter; None rebuilds it from settings on next use."""
+    global _limiter
+    _limiter = limiter
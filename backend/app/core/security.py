@@ -1,19 +1,70 @@
+import asyncio
 import bcrypt
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from app.config import settings
 from app.schemas.auth import TokenPayload
 
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+# Verified access tokens: sha256(token) -> (payload, exp)
+_token_cache: "OrderedDict[bytes, tuple[TokenPayload, int]]" = OrderedDict()
+_token_cache_hits = 0
+_token_cache_misses = 0
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS."""
+    # Modular crypt format: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt thread pool, keeping the event loop free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt thread pool, keeping the event loop free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_hasher() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
 def create_access_token(user_id: int, role: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
@@ -38,16 +89,61 @@ def create_refresh_token(user_id: int, role: str) -> str:
     return jwt.encode(payload, settings.REFRESH_SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def decode_access_token(token: str) -> Optional[TokenPayload]:
+def _verify_access_token(token: str) -> Optional[tuple[TokenPayload, Optional[int]]]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if payload.get("type") != "access":
             return None
-        return TokenPayload(sub=int(payload["sub"]), role=payload["role"], type="access")
+        return TokenPayload(sub=int(payload["sub"]), role=payload["role"], type="access"), payload.get("exp")
     except JWTError:
         return None
 
 
+def decode_access_token(token: str) -> Optional[TokenPayload]:
+    """
+    Verify an access token, caching the result until the token's exp.
+
+    Only successfully verified tokens are cached (keyed by their SHA-256), so
+    garbage tokens cannot flood the cache. Expiry is checked on every hit with
+    the same whole-second comparison jose uses.
+    """
+    global _token_cache_hits, _token_cache_misses
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    entry = _token_cache.get(key)
+    if entry is not None:
+        payload, exp = entry
+        if int(time.time()) > exp:
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        _token_cache_hits += 1
+        return payload
+
+    _token_cache_misses += 1
+    verified = _verify_access_token(token)
+    if verified is None:
+        return None
+    payload, exp = verified
+    if exp is not None:
+        _token_cache[key] = (payload, exp)
+        while len(_token_cache) > settings.TOKEN_CACHE_MAX_ENTRIES:
+            _token_cache.popitem(last=False)
+    return payload
+
+
+def token_cache_stats() -> dict:
+    return {
+        "hits": _token_cache_hits,
+        "misses": _token_cache_misses,
+        "size": len(_token_cache),
+        "max_entries": settings.TOKEN_CACHE_MAX_ENTRIES,
+    }
+
+
+def clear_token_cache() -> None:
+    _token_cache.clear()
+
+
 def decode_refresh_token(token: str) -> Optional[TokenPayload]:
     try:
         payload = jwt.decode(token, settings.REFRESH_SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -0,0 +1,102 @@
+"""
+Short-lived in-process cache of authenticated users.
+
+Entries are CurrentUserClaims snapshots keyed by user id, served by the
+get_current_user_claims dependency without a users SELECT. Code that changes a
+user calls invalidate(user_id, db): the entry is dropped at once and again
+after the session commits, so a request racing the commit cannot re-cache the
+old row. Changes made by other workers become visible after
+USER_CACHE_TTL_SECONDS at the latest.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+
+_PENDING_KEY = "user_cache_invalidate"
+
+_entries: "OrderedDict[int, tuple[float, CurrentUserClaims]]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class CurrentUserClaims:
+    """Read-only view of the authenticated user for endpoints that never need the ORM row."""
+    id: int
+    email: str
+    name: str
+    role: str
+    is_active: bool
+    is_verified: bool
+    subscription_tier: str
+    subscription_expires_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "CurrentUserClaims":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            subscription_tier=user.subscription_tier,
+            subscription_expires_at=user.subscription_expires_at,
+        )
+
+    @property
+    def is_premium(self) -> bool:
+        if self.subscription_tier == "premium":
+            if self.subscription_expires_at is None:
+                return True
+            return self.subscription_expires_at > datetime.now(timezone.utc)
+        return False
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+
+def get(user_id: int) -> Optional[CurrentUserClaims]:
+    entry = _entries.get(user_id)
+    if entry is None:
+        return None
+    expires, claims = entry
+    if expires <= time.monotonic():
+        _entries.pop(user_id, None)
+        return None
+    _entries.move_to_end(user_id)
+    return claims
+
+
+def put(claims: CurrentUserClaims) -> None:
+    _entries[claims.id] = (time.monotonic() + settings.USER_CACHE_TTL_SECONDS, claims)
+    _entries.move_to_end(claims.id)
+    while len(_entries) > settings.USER_CACHE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+def invalidate(user_id: int, db: Optional[AsyncSession] = None) -> None:
+    """Drop the user's entry now and, if db is given, again once db commits."""
+    _entries.pop(user_id, None)
+    if db is not None:
+        db.sync_session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+def clear() -> None:
+    _entries.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        _entries.pop(user_id, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
 from app.config import settings
+from app.core.security import shutdown_password_hasher
+from app.services import pdf_renderer, ocr_client, document_store, email_outbox, smtp_pool
 from app.api import auth, users, contracts, bills, objections, feedback, admin, gdpr
 from app.api import stripe_api, mietpreisbremse, betriebskosten_assistent, mietrecht_checks, mietvertrag, betriebskostenspiegel
 
@@ -10,8 +12,17 @@ from app.api import stripe_api, mietpreisbremse, betriebskosten_assistent, mietr
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await ocr_client.startup()
+    await document_store.startup()
+    await email_outbox.startup()
     yield
     # Shutdown
+    await email_outbox.shutdown()
+    await smtp_pool.shutdown()
+    await document_store.shutdown()
+    await ocr_client.shutdown()
+    pdf_renderer.shutdown()
+    shutdown_password_hasher()
 
 
 app = FastAPI(
@@ -31,6 +42,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # GET /bills pagination
 )
 
 # Trusted Hosts (prevents Host-Header-Injection)
@@ -6,6 +6,8 @@ from app.models.check_result import CheckResult
 from app.models.objection_letter import ObjectionLetter
 from app.models.feedback import Feedback
 from app.models.email_log import EmailLog
+from app.models.rate_limit_counter import RateLimitCounter
+from app.models.ocr_result import OcrResult
 
 __all__ = [
     "User",
@@ -16,4 +18,6 @@ __all__ = [
     "ObjectionLetter",
     "Feedback",
     "EmailLog",
+    "RateLimitCounter",
+    "OcrResult",
 ]
@@ -11,7 +11,7 @@ class BillPosition(Base):
     __tablename__ = "bill_positions"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False)
+    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Position details
     category: Mapped[str] = mapped_column(String(50), nullable=False)
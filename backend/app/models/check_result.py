@@ -10,7 +10,7 @@ class CheckResult(Base):
     __tablename__ = "check_results"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False)
+    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False, index=True)
 
     check_type: Mapped[str] = mapped_column(String(30), nullable=False)
     severity: Mapped[str] = mapped_column(String(10), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, Integer, Text
+from sqlalchemy import String, DateTime, Integer, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -7,13 +7,25 @@ from app.database import Base
 
 
 class EmailLog(Base):
+    """Outgoing mail; rows are the outbox drained by app.services.email_outbox."""
+
     __tablename__ = "email_logs"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     to_email: Mapped[str] = mapped_column(String(255), nullable=False)
     subject: Mapped[str] = mapped_column(String(500), nullable=False)
-    body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # HTML
+    text_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # pending -> sending -> sent | failed (attempts exhausted) | skipped (no SMTP configured)
     status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
     error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Due time for pending rows; lease expiry for rows being sent
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# Due rows of the outbox
+Index("ix_email_logs_outbox_due", EmailLog.next_attempt_at, postgresql_where=EmailLog.status.in_(("pending", "sending")))
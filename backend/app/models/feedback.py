@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -23,3 +23,6 @@ class Feedback(Base):
 
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="feedback_items")
+
+
+Index("ix_feedback_user_id_created_at", Feedback.user_id, Feedback.created_at.desc())
@@ -11,7 +11,7 @@ class ObjectionLetter(Base):
     __tablename__ = "objection_letters"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False)
+    bill_id: Mapped[int] = mapped_column(Integer, ForeignKey("utility_bills.id", ondelete="CASCADE"), nullable=False, index=True)
 
     content: Mapped[str] = mapped_column(Text, nullable=False)
     objection_reasons: Mapped[Optional[List]] = mapped_column(JSONB, nullable=True)
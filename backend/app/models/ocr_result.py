@@ -0,0 +1,17 @@
+from sqlalchemy import String, DateTime, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.database import Base
+
+
+class OcrResult(Base):
+    """Parsed OCR extraction of an uploaded document (see app.services.ocr_cache)."""
+    __tablename__ = "ocr_results"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    document_sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Model and prompt the result came from; a different extractor is a miss
+    extractor: Mapped[str] = mapped_column(String(100), primary_key=True)
+    result: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import String, BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class RateLimitCounter(Base):
+    """Sliding-window counter shared by all API workers (see app.core.rate_limit)."""
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    window_index: Mapped[int] = mapped_column(BigInteger, nullable=False)  # index of the current window
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    prev_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)  # unix time
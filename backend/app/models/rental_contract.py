@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, Integer, Numeric, Date, ForeignKey
+from sqlalchemy import String, Boolean, DateTime, Integer, Numeric, Date, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime, date
@@ -40,3 +40,6 @@ class RentalContract(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="contracts")
     bills: Mapped[List["UtilityBill"]] = relationship("UtilityBill", back_populates="contract", cascade="all, delete-orphan")
+
+
+Index("ix_rental_contracts_user_id_created_at", RentalContract.user_id, RentalContract.created_at.desc())
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, Integer
+from sqlalchemy import String, Boolean, DateTime, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -53,3 +53,9 @@ class User(Base):
     @property
     def is_admin(self) -> bool:
         return self.role == "admin"
+
+
+# Lookups by token / Stripe customer only ever match set values
+Index("ix_users_verification_token", User.verification_token, postgresql_where=User.verification_token.isnot(None))
+Index("ix_users_reset_token", User.reset_token, postgresql_where=User.reset_token.isnot(None))
+Index("ix_users_stripe_customer_id", User.stripe_customer_id, postgresql_where=User.stripe_customer_id.isnot(None))
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, Integer, Numeric, Date, ForeignKey, Text
+from sqlalchemy import String, DateTime, Integer, Numeric, Date, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime, date
@@ -9,10 +9,13 @@ from app.database import Base
 
 class UtilityBill(Base):
     __tablename__ = "utility_bills"
+    # Fetch server-generated timestamps with RETURNING on UPDATE as well, so
+    # written bills can be serialized without a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    contract_id: Mapped[int] = mapped_column(Integer, ForeignKey("rental_contracts.id", ondelete="CASCADE"), nullable=False)
+    contract_id: Mapped[int] = mapped_column(Integer, ForeignKey("rental_contracts.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Billing period
     billing_year: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -41,5 +44,13 @@ class UtilityBill(Base):
     user: Mapped["User"] = relationship("User", back_populates="bills")
     contract: Mapped["RentalContract"] = relationship("RentalContract", back_populates="bills")
     positions: Mapped[List["BillPosition"]] = relationship("BillPosition", back_populates="bill", cascade="all, delete-orphan")
-    check_results: Mapped[List["CheckResult"]] = relationship("CheckResult", back_populates="bill", cascade="all, delete-orphan")
+    # Ids follow the check registry order (see bill_recheck.apply_check_results)
+    check_results: Mapped[List["CheckResult"]] = relationship("CheckResult", back_populates="bill", cascade="all, delete-orphan", order_by="CheckResult.id")
     objection_letters: Mapped[List["ObjectionLetter"]] = relationship("ObjectionLetter", back_populates="bill", cascade="all, delete-orphan")
+
+
+# Listing / keyset pagination (also serves user_id lookups) and the free-tier count
+Index("ix_utility_bills_user_id_created_at", UtilityBill.user_id, UtilityBill.created_at.desc(), UtilityBill.id.desc())
+Index("ix_utility_bills_user_id_billing_year", UtilityBill.user_id, UtilityBill.billing_year)
+# Reference counts of stored documents (document_store.sweep)
+Index("ix_utility_bills_document_path", UtilityBill.document_path, postgresql_where=UtilityBill.document_path.isnot(None))
@@ -3,6 +3,7 @@ from app.schemas.rental_contract import RentalContractCreate, RentalContractRead
 from app.schemas.utility_bill import (
     UtilityBillCreate,
     UtilityBillRead,
+    UtilityBillListItem,
     UtilityBillUpdate,
     BillPositionCreate,
     BillPositionRead,
@@ -16,7 +17,7 @@ from app.schemas.auth import Token, TokenPayload, LoginRequest, RefreshRequest
 __all__ = [
     "UserCreate", "UserRead", "UserUpdate", "UserAdminUpdate",
     "RentalContractCreate", "RentalContractRead", "RentalContractUpdate",
-    "UtilityBillCreate", "UtilityBillRead", "UtilityBillUpdate",
+    "UtilityBillCreate", "UtilityBillRead", "UtilityBillListItem", "UtilityBillUpdate",
     "BillPositionCreate", "BillPositionRead",
     "CheckResultRead",
     "ObjectionLetterCreate", "ObjectionLetterRead",
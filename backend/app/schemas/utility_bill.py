@@ -109,3 +109,28 @@ class UtilityBillRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UtilityBillListItem(BaseModel):
+    """
+    Entry of GET /bills: the fields= projection of UtilityBillRead (all
+    fields by default) plus the related rows requested with include=.
+    """
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    contract_id: Optional[int] = None
+    billing_year: Optional[int] = None
+    billing_period_start: Optional[date] = None
+    billing_period_end: Optional[date] = None
+    received_date: Optional[date] = None
+    total_costs: Optional[Decimal] = None
+    total_advance_paid: Optional[Decimal] = None
+    result_amount: Optional[Decimal] = None
+    status: Optional[str] = None
+    check_score: Optional[int] = None
+    notes: Optional[str] = None
+    document_path: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    positions: Optional[List[BillPositionRead]] = None
+    check_results: Optional[List[CheckResultRead]] = None
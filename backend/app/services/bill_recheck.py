@@ -0,0 +1,119 @@
+"""
+Bulk re-check of stored bills.
+
+When REFERENCE_VALUES, ILLEGAL_CATEGORIES or the registered rules change,
+every checked bill has to be evaluated again. recheck_page() handles the next
+page of bills in id order: it runs run_checks_batch() over them, writes back
+only the check results, scores and position annotations that changed, commits
+and drops the cached reports of changed bills. Callers continue from the
+returned next_after_id until it is None; a page that is repeated (after a
+timeout, say) finds nothing left to change.
+"""
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.bill_checker import CheckItem, registered_checks, run_checks_batch, score_from_counts
+from app.models.check_result import CheckResult
+from app.models.utility_bill import UtilityBill
+from app.services import report_cache
+
+logger = logging.getLogger(__name__)
+
+RECHECK_BATCH_SIZE = 500  # bills per page: one run_checks_batch call and commit
+RECHECK_MAX_BATCH_SIZE = 2000
+
+
+def _content(cr: CheckResult) -> CheckItem:
+    return (cr.check_type, cr.severity, cr.title, cr.description, cr.recommendation)
+
+
+def apply_check_results(
+    bill: UtilityBill,
+    check_items: list[CheckItem],
+    check_types: Optional[tuple[str, ...]] = None,
+) -> bool:
+    """
+    Bring bill.check_results in line with freshly computed items of the given
+    checks (all when None). Returns whether any row changed.
+
+    Rows of checks that were not re-run keep their content. The wanted results,
+    in registry order, are laid over the existing rows in id order, so ids keep
+    following the registry order; only rows whose content differs are written,
+    surplus rows are dropped through the delete-orphan cascade and missing ones
+    appended. The score is recomputed from the severity counts of the resulting
+    rows. Expects bill.check_results to be loaded.
+    """
+    order = {rule.check_type: index for index, rule in enumerate(registered_checks())}
+    rows = sorted(bill.check_results, key=lambda cr: (cr.id is None, cr.id or 0))
+    kept = [] if check_types is None else [_content(cr) for cr in rows if cr.check_type not in check_types]
+    wanted = sorted(kept + list(check_items), key=lambda item: order.get(item[0], len(order)))
+
+    changed = False
+    for cr, item in zip(rows, wanted):
+        if _content(cr) != item:
+            cr.check_type, cr.severity, cr.title, cr.description, cr.recommendation = item
+            changed = True
+    for cr in rows[len(wanted):]:
+        bill.check_results.remove(cr)
+        changed = True
+    for check_type, severity, title, description, recommendation in wanted[len(rows):]:
+        bill.check_results.append(CheckResult(
+            bill_id=bill.id,
+            check_type=check_type,
+            severity=severity,
+            title=title,
+            description=description,
+            recommendation=recommendation,
+        ))
+        changed = True
+
+    errors = sum(1 for cr in bill.check_results if cr.severity == "error")
+    warnings = sum(1 for cr in bill.check_results if cr.severity == "warning")
+    score = score_from_counts(errors, warnings)
+    if bill.check_score != score:
+        bill.check_score = score
+    return changed
+
+
+async def recheck_page(db: AsyncSession, after_id: int = 0, limit: int = RECHECK_BATCH_SIZE) -> dict:
+    """
+    Re-run every check on the next `limit` checked bills with id > after_id.
+    Returns counts of bills checked and changed, and the after_id of the next
+    page (None after the last one).
+    """
+    bills = (await db.execute(
+        select(UtilityBill)
+        .where(UtilityBill.status == "checked", UtilityBill.id > after_id)
+        .order_by(UtilityBill.id)
+        .limit(limit)
+        .options(
+            selectinload(UtilityBill.positions),
+            selectinload(UtilityBill.check_results),
+            selectinload(UtilityBill.contract),
+        )
+    )).scalars().all()
+
+    results = run_checks_batch((bill, bill.positions, bill.contract) for bill in bills)
+    changed_ids = []
+    for bill, (check_items, _score) in zip(bills, results):
+        rows_changed = apply_check_results(bill, check_items)
+        if rows_changed or any(inspect(pos).modified for pos in bill.positions):
+            changed_ids.append(bill.id)
+    await db.commit()
+    if changed_ids:
+        await asyncio.to_thread(_invalidate_reports, changed_ids)
+
+    logger.info("Re-checked %d bills after id %d, %d changed", len(bills), after_id, len(changed_ids))
+    return {
+        "checked": len(bills),
+        "changed": len(changed_ids),
+        "next_after_id": bills[-1].id if len(bills) == limit else None,
+    }
+
+
+def _invalidate_reports(bill_ids: list[int]) -> None:
+    for bill_id in bill_ids:
+        report_cache.invalidate(bill_id)
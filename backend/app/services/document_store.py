@@ -0,0 +1,247 @@
+"""
+Content-addressed storage for uploaded bill documents.
+
+A document is stored once, under the SHA-256 of its bytes plus an extension
+for its media type. UtilityBill.document_path holds that key, so uploading
+the same scan again (or for another bill) reuses the stored blob, and the
+number of bills pointing at a key is its reference count. Replacing or
+removing a document only drops the reference; sweep() deletes blobs that no
+bill references any more, from a background task.
+
+Backends implement DocumentStore. LocalDocumentStore keeps blobs below
+DOCUMENT_STORAGE_PATH in a two-level fan-out (ab/cd/abcd….pdf) so no
+directory grows beyond a few thousand entries.
+"""
+import asyncio
+import logging
+import mimetypes
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+import aiofiles
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.utility_bill import UtilityBill
+
+logger = logging.getLogger(__name__)
+
+MEDIA_EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+_KEY = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+READ_CHUNK_SIZE = 64 * 1024
+SWEEP_BATCH_SIZE = 1000  # keys per reference query
+
+
+def blob_key(sha256: str, media_type: str) -> str:
+    return f"{sha256}{MEDIA_EXTENSIONS.get(media_type, '.bin')}"
+
+
+def is_blob_key(document_path: str) -> bool:
+    """False for rows written before the store, which hold a plain file path."""
+    return bool(_KEY.match(document_path))
+
+
+def media_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class DocumentStore(ABC):
+    """Blob storage keyed by blob_key(); an object store can implement the same methods."""
+
+    # Where uploads are received before put(); on the same filesystem for local stores
+    staging_dir: str
+
+    @abstractmethod
+    async def put(self, source_path: str, key: str) -> None:
+        """
+        Take over the file at source_path as `key`. If the blob already exists the
+        source is dropped and the blob's modification time refreshed, which keeps a
+        concurrent sweep() from collecting it before the new reference is committed.
+        """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def read(self, key: str) -> AsyncIterator[bytes]:
+        """The blob in chunks."""
+
+    @abstractmethod
+    async def delete(self, key: str, older_than: Optional[float] = None) -> bool:
+        """Remove the blob, only if last modified before `older_than` (epoch seconds) when given."""
+
+    @abstractmethod
+    async def list(self) -> list[tuple[str, float]]:
+        """(key, last modified as epoch seconds) of every blob."""
+
+    async def purge_staging(self, older_than: float) -> int:
+        """Remove leftovers of interrupted uploads and deletes from staging_dir; returns how many."""
+        return 0
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of the blob, for stores that have one."""
+        return None
+
+
+class LocalDocumentStore(DocumentStore):
+    def __init__(self, root: str):
+        self.root = root
+        self.staging_dir = os.path.join(root, ".incoming")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        if not is_blob_key(key):
+            raise ValueError(f"invalid document key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _put(self, source_path: str, key: str) -> None:
+        path = self.local_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # New, or taken away by a sweep since: store this copy
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(source_path, path)
+            return
+        os.remove(source_path)
+
+    async def put(self, source_path: str, key: str) -> None:
+        await asyncio.to_thread(self._put, source_path, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.local_path(key))
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.local_path(key), "rb") as f:
+            while chunk := await f.read(READ_CHUNK_SIZE):
+                yield chunk
+
+    def _delete(self, key: str, older_than: Optional[float]) -> bool:
+        """
+        The blob is first renamed out of place, so a concurrent _put() either
+        refreshed it before (and the mtime is checked again on the renamed
+        file, which is then put back) or no longer finds it and stores its own
+        copy; only a blob nobody refreshed is unlinked.
+        """
+        path = self.local_path(key)
+        doomed = os.path.join(self.staging_dir, f"{key}.del")
+        try:
+            if older_than is not None and os.stat(path).st_mtime >= older_than:
+                return False
+            os.rename(path, doomed)
+        except FileNotFoundError:
+            return False
+        if older_than is not None and os.stat(doomed).st_mtime >= older_than:
+            # Same content as any copy a _put() stored meanwhile
+            os.replace(doomed, path)
+            return False
+        os.remove(doomed)
+        return True
+
+    async def delete(self, key: str, older_than: Optional[float] = None) -> bool:
+        return await asyncio.to_thread(self._delete, key, older_than)
+
+    def _list(self) -> list[tuple[str, float]]:
+        blobs = []
+        for directory, subdirs, files in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if not d.startswith(".")]
+            for name in files:
+                if is_blob_key(name):
+                    blobs.append((name, os.stat(os.path.join(directory, name)).st_mtime))
+        return blobs
+
+    async def list(self) -> list[tuple[str, float]]:
+        return await asyncio.to_thread(self._list)
+
+    def _purge_staging(self, older_than: float) -> int:
+        removed = 0
+        for entry in os.scandir(self.staging_dir):
+            if entry.name.endswith((".part", ".del")) and entry.stat().st_mtime < older_than:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        return removed
+
+    async def purge_staging(self, older_than: float) -> int:
+        return await asyncio.to_thread(self._purge_staging, older_than)
+
+
+_store: Optional[DocumentStore] = None
+_sweeper: Optional[asyncio.Task] = None
+
+
+def get_store() -> DocumentStore:
+    global _store
+    if _store is None:
+        _store = LocalDocumentStore(settings.DOCUMENT_STORAGE_PATH)
+    return _store
+
+
+def set_store(store: Optional[DocumentStore]) -> None:
+    """Swap the backend (tests use an in-memory stand-in)."""
+    global _store
+    _store = store
+
+
+async def sweep(db: AsyncSession, store: Optional[DocumentStore] = None) -> int:
+    """
+    Delete blobs that no bill references and that were not written or re-uploaded
+    within DOCUMENT_GC_GRACE_SECONDS (uploads whose transaction is still open),
+    and staging leftovers of the same age. Returns the number of blobs removed.
+    """
+    store = store or get_store()
+    cutoff = time.time() - settings.DOCUMENT_GC_GRACE_SECONDS
+    purged = await store.purge_staging(cutoff)
+    if purged:
+        logger.info("Document sweep removed %d stale staging files", purged)
+    candidates = [key for key, modified in await store.list() if modified < cutoff]
+    removed = 0
+    for start in range(0, len(candidates), SWEEP_BATCH_SIZE):
+        batch = candidates[start:start + SWEEP_BATCH_SIZE]
+        referenced = set((await db.execute(
+            select(UtilityBill.document_path).where(UtilityBill.document_path.in_(batch)).distinct()
+        )).scalars())
+        for key in batch:
+            if key not in referenced and await store.delete(key, older_than=cutoff):
+                removed += 1
+    return removed
+
+
+async def _sweep_forever() -> None:
+    while True:
+        await asyncio.sleep(settings.DOCUMENT_GC_INTERVAL_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                removed = await sweep(db)
+            if removed:
+                logger.info("Document sweep removed %d unreferenced blobs", removed)
+        except Exception:
+            logger.exception("Document sweep failed")
+
+
+async def startup() -> None:
+    global _sweeper
+    get_store()
+    if settings.DOCUMENT_GC_INTERVAL_SECONDS > 0:
+        _sweeper = asyncio.create_task(_sweep_forever())
+
+
+async def shutdown() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
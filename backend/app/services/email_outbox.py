@@ -0,0 +1,196 @@
+"""
+Transactional outbox for outgoing mail.
+
+enqueue() adds an EmailLog row to the caller's session, so a mail is queued
+exactly when the request's transaction commits and never for a request that
+rolled back. A background dispatcher per API process drains due rows:
+
+- claim: up to EMAIL_OUTBOX_BATCH_SIZE due rows are locked (SKIP LOCKED, so
+  workers never claim the same row), marked `sending` with a lease of
+  EMAIL_SEND_LEASE_SECONDS and committed; a worker dying mid-send leaves
+  the row to be picked up again once the lease runs out. The lease covers
+  the slowest possible batch (checked when the settings load), so rows are
+  never claimed again while still being sent, and a row whose last allowed
+  attempt was abandoned is marked `failed` instead
+- send: the batch goes out concurrently over the pooled SMTP sessions of
+  app.services.smtp_pool; failures are rescheduled per row with
+  exponential backoff until EMAIL_MAX_ATTEMPTS, then marked `failed`
+
+Commits that queued mail wake the dispatcher right away; otherwise it polls
+every EMAIL_OUTBOX_POLL_SECONDS.
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.email_log import EmailLog
+from app.services import email_service
+
+logger = logging.getLogger(__name__)
+
+_WAKE_KEY = "email_outbox_wake"
+
+_wakeup: Optional[asyncio.Event] = None
+_dispatcher: Optional[asyncio.Task] = None
+
+
+def enqueue(
+    db: AsyncSession,
+    to_email: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str] = None,
+) -> EmailLog:
+    """Queue a mail in db's transaction; it is sent after the commit."""
+    entry = EmailLog(
+        to_email=to_email,
+        subject=subject,
+        body=html_body,
+        text_body=text_body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(entry)
+    db.sync_session.info[_WAKE_KEY] = True
+    return entry
+
+
+def enqueue_bulk(
+    db: AsyncSession,
+    to_emails: list[str],
+    subject: str,
+    html_body: str,
+    text_body: Optional[str] = None,
+) -> list[EmailLog]:
+    """Queue the same mail to many recipients, one row (and retry state) each."""
+    return [enqueue(db, to_email, subject, html_body, text_body) for to_email in to_emails]
+
+
+def wake() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    if session.info.pop(_WAKE_KEY, False):
+        wake()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_wake(session: Session, previous_transaction) -> None:
+    session.info.pop(_WAKE_KEY, None)
+
+
+def _backoff(attempts: int) -> float:
+    """Exponential with jitter in the upper half, so retries of a burst spread out."""
+    delay = min(settings.EMAIL_RETRY_MAX_DELAY, settings.EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def _claim(db: AsyncSession) -> list[EmailLog]:
+    now = datetime.now(timezone.utc)
+    rows = (await db.execute(
+        select(EmailLog)
+        .where(EmailLog.status.in_(("pending", "sending")), EmailLog.next_attempt_at <= now)
+        .order_by(EmailLog.next_attempt_at)
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )).scalars().all()
+    claimed = []
+    for row in rows:
+        if row.status == "sending" and row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            # Its workers keep dying before recording a result; do not try again
+            logger.error("Giving up on email %d to %s after %d abandoned attempts", row.id, row.to_email, row.attempts)
+            row.status = "failed"
+            row.error = row.error or "send abandoned"
+            continue
+        row.status = "sending"
+        row.attempts += 1
+        row.next_attempt_at = now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS)
+        claimed.append(row)
+    await db.commit()
+    return claimed
+
+
+def _record(row: EmailLog, error: Optional[Exception]) -> None:
+    if error is None:
+        row.status = "sent"
+        row.error = None
+        row.sent_at = datetime.now(timezone.utc)
+        logger.info("Email sent to %s: %s", row.to_email, row.subject)
+        return
+    row.error = str(error)[:1000]
+    if row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        logger.error("Giving up on email %d to %s after %d attempts: %s", row.id, row.to_email, row.attempts, error)
+        row.status = "failed"
+    else:
+        logger.warning("Email %d to %s failed (attempt %d), retrying: %s", row.id, row.to_email, row.attempts, error)
+        row.status = "pending"
+        row.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=_backoff(row.attempts))
+
+
+async def _send(rows: list[EmailLog]) -> None:
+    """Send the batch concurrently over the pooled SMTP sessions."""
+    messages = [
+        email_service.build_message(row.to_email, row.subject, row.body or "", row.text_body)
+        for row in rows
+    ]
+    try:
+        errors = await email_service.deliver_many(messages)
+    except email_service.SmtpNotConfigured:
+        logger.warning("SMTP not configured, skipping %d emails", len(rows))
+        for row in rows:
+            row.status = "skipped"
+        return
+    for row, error in zip(rows, errors):
+        _record(row, error)
+
+
+async def dispatch_once(db: AsyncSession) -> int:
+    """Claim one batch of due mail and send it. Returns the number of rows claimed."""
+    rows = await _claim(db)
+    if rows:
+        await _send(rows)
+        await db.commit()
+    return len(rows)
+
+
+async def _dispatch_forever() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        try:
+            async with AsyncSessionLocal() as db:
+                while await dispatch_once(db) == settings.EMAIL_OUTBOX_BATCH_SIZE:
+                    pass
+        except Exception:
+            logger.exception("Email dispatch failed")
+
+
+async def startup() -> None:
+    global _wakeup, _dispatcher
+    if settings.EMAIL_OUTBOX_POLL_SECONDS > 0:
+        _wakeup = asyncio.Event()
+        _dispatcher = asyncio.create_task(_dispatch_forever())
+
+
+async def shutdown() -> None:
+    global _wakeup, _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.cancel()
+        try:
+            await _dispatcher
+        except asyncio.CancelledError:
+            pass
+    _wakeup = _dispatcher = None
@@ -1,11 +1,11 @@
 """Email service using aiosmtplib."""
-import aiosmtplib
 import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Optional
 from datetime import datetime, timezone
 from app.config import settings
+from app.services import smtp_pool
 
 logger = logging.getLogger(__name__)
 
@@ -95,37 +95,59 @@ def _divider() -> str:
 
 
 # ─────────────────────────────────────────────
+class SmtpNotConfigured(Exception):
+    pass
+
+
+def build_message(
+    to_email: str,
+    subject: str,
+    html_body: str,
+    text_body: Optional[str] = None,
+) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = settings.SMTP_FROM
+    msg["To"] = to_email
+
+    if text_body:
+        msg.attach(MIMEText(text_body, "plain", "utf-8"))
+    msg.attach(MIMEText(html_body, "html", "utf-8"))
+    return msg
+
+
+async def deliver(msg: MIMEMultipart) -> None:
+    """Hand one message to the SMTP server over a pooled session; raises on failure."""
+    if not settings.SMTP_HOST:
+        raise SmtpNotConfigured("SMTP_HOST is not set")
+    await smtp_pool.get_pool().send(msg)
+
+
+async def deliver_many(messages: list[MIMEMultipart]) -> list[Optional[Exception]]:
+    """Bulk send over the pooled sessions; returns the error per message, or None."""
+    if not settings.SMTP_HOST:
+        raise SmtpNotConfigured("SMTP_HOST is not set")
+    return await smtp_pool.get_pool().send_many(messages)
+
+
 async def send_email(
     to_email: str,
     subject: str,
     html_body: str,
     text_body: Optional[str] = None,
 ) -> bool:
-    """Send an email via SMTP. Returns True on success."""
+    """
+    Send an email via SMTP right away. Returns True on success.
+
+    Request handlers queue mail with email_outbox.enqueue() instead, so they
+    do not wait for the SMTP server.
+    """
     if not settings.SMTP_HOST:
         logger.warning("SMTP not configured, skipping email to %s", to_email)
         return False
 
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = settings.SMTP_FROM
-        msg["To"] = to_email
-
-        if text_body:
-            msg.attach(MIMEText(text_body, "plain", "utf-8"))
-        msg.attach(MIMEText(html_body, "html", "utf-8"))
-
-        smtp_kwargs = {
-            "hostname": settings.SMTP_HOST,
-            "port": settings.SMTP_PORT,
-            "username": settings.SMTP_USER,
-            "password": settings.SMTP_PASSWORD,
-        }
-        if settings.SMTP_TLS:
-            smtp_kwargs["start_tls"] = True
-
-        await aiosmtplib.send(msg, **smtp_kwargs)
+        await deliver(build_message(to_email, subject, html_body, text_body))
         logger.info("Email sent to %s: %s", to_email, subject)
         return True
 
@@ -275,13 +297,13 @@ def build_password_reset_email(name: str, reset_url: str) -> tuple[str, str]:
 # ─────────────────────────────────────────────
 # Template: Feedback-Antwort
 # ─────────────────────────────────────────────
-async def send_feedback_response_email(
-    user_email: str,
+def build_feedback_response_email(
     user_name: str,
     feedback_title: str,
     admin_response: str,
     status: str = "in_review",
-) -> bool:
+) -> tuple[str, str]:
+    """Returns (subject, html)."""
     status_cfg = {
         "approved":  {"label": "Angenommen",     "color": "#16a34a", "bg": "#f0fdf4", "border": "#bbf7d0", "icon": "✅"},
         "rejected":  {"label": "Abgelehnt",      "color": "#dc2626", "bg": "#fef2f2", "border": "#fecaca", "icon": "❌"},
@@ -333,6 +355,17 @@ async def send_feedback_response_email(
 
     html = _email_wrapper(content)
     subject = f"Antwort auf Ihr Feedback: {feedback_title}"
+    return subject, html
+
+
+async def send_feedback_response_email(
+    user_email: str,
+    user_name: str,
+    feedback_title: str,
+    admin_response: str,
+    status: str = "in_review",
+) -> bool:
+    subject, html = build_feedback_response_email(user_name, feedback_title, admin_response, status)
     return await send_email(user_email, subject, html)
 
 
@@ -0,0 +1,75 @@
+"""
+Cache of parsed OCR extractions, keyed by the SHA-256 of the uploaded bytes
+(ReceivedUpload.sha256, computed while the upload is received).
+
+Re-uploading the same scan (after a failed form submit, from another device)
+returns the stored extraction instead of another vision-model call. Entries
+are per user, expire after OCR_CACHE_TTL_HOURS and the table is trimmed to
+the newest OCR_CACHE_MAX_ENTRIES rows whenever a result is stored.
+
+Two uploads of the same scan may both miss and call the model; store() is an
+upsert, so the second one overwrites the first instead of failing on the
+primary key.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.ocr_result import OcrResult
+
+
+def _cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=settings.OCR_CACHE_TTL_HOURS)
+
+
+async def lookup(db: AsyncSession, user_id: int, digest: str, extractor: str) -> Optional[dict]:
+    result = await db.execute(
+        select(OcrResult.result).where(
+            OcrResult.user_id == user_id,
+            OcrResult.document_sha256 == digest,
+            OcrResult.extractor == extractor,
+            OcrResult.created_at > _cutoff(),
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+# INSERT .. ON CONFLICT exists on both, but each dialect has its own construct
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def store(db: AsyncSession, user_id: int, digest: str, extractor: str, extracted: dict) -> None:
+    created_at = datetime.now(timezone.utc)
+    upsert = _UPSERTS[db.get_bind().dialect.name](OcrResult).values(
+        user_id=user_id,
+        document_sha256=digest,
+        extractor=extractor,
+        result=extracted,
+        created_at=created_at,
+    )
+    await db.execute(upsert.on_conflict_do_update(
+        index_elements=[OcrResult.user_id, OcrResult.document_sha256, OcrResult.extractor],
+        set_={"result": upsert.excluded.result, "created_at": upsert.excluded.created_at},
+    ))
+    await _evict(db)
+
+
+async def _evict(db: AsyncSession) -> None:
+    await db.execute(
+        delete(OcrResult).where(OcrResult.created_at <= _cutoff()),
+        execution_options={"synchronize_session": False},
+    )
+    # created_at of the oldest row that may stay
+    oldest_kept = (await db.execute(
+        select(OcrResult.created_at)
+        .order_by(OcrResult.created_at.desc())
+        .offset(settings.OCR_CACHE_MAX_ENTRIES - 1)
+        .limit(1)
+    )).scalar_one_or_none()
+    if oldest_kept is not None:
+        await db.execute(
+            delete(OcrResult).where(OcrResult.created_at < oldest_kept),
+            execution_options={"synchronize_session": False},
+        )
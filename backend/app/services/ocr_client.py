@@ -0,0 +1,105 @@
+"""
+App-lifetime HTTP client for the OCR (vision model) upstream.
+
+One pooled httpx.AsyncClient with keep-alive (and HTTP/2 when h2 is
+installed) is opened in the app lifespan, so OCR uploads reuse connections
+instead of paying a TCP/TLS handshake each. A semaphore caps outstanding
+upstream calls per process at OCR_MAX_CONCURRENCY; 429/5xx answers and
+connection errors are retried with jittered exponential backoff.
+"""
+import asyncio
+import importlib.util
+import logging
+import random
+from typing import Optional
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 529: Anthropic "overloaded"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff; a Retry-After from upstream is honoured up to the cap."""
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.OCR_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(settings.OCR_RETRY_MAX_DELAY, settings.OCR_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class OcrClient:
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        http2 = transport is None and settings.OCR_HTTP2 and importlib.util.find_spec("h2") is not None
+        self._http = httpx.AsyncClient(
+            base_url=settings.ANTHROPIC_API_URL,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.OCR_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.OCR_MAX_CONCURRENCY,
+            ),
+            http2=http2,
+            transport=transport,
+            headers={
+                "anthropic-version": "2023-06-01",
+                "anthropic-beta": "pdfs-2024-09-25",
+            },
+        )
+        self._slots = asyncio.Semaphore(settings.OCR_MAX_CONCURRENCY)
+
+    async def create_message(self, payload: dict) -> httpx.Response:
+        """POST /v1/messages; returns the last response once it succeeds or retries run out."""
+        for attempt in range(settings.OCR_MAX_RETRIES + 1):
+            last_attempt = attempt == settings.OCR_MAX_RETRIES
+            try:
+                # The slot is only held while the request is in flight, not while backing off
+                async with self._slots:
+                    response = await self._http.post(
+                        "/v1/messages",
+                        json=payload,
+                        headers={"x-api-key": settings.ANTHROPIC_API_KEY},
+                    )
+            except (httpx.ConnectError, httpx.RemoteProtocolError) as e:
+                if last_attempt:
+                    raise
+                logger.warning("OCR upstream connection failed (%s), retrying", e)
+                await asyncio.sleep(_backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            logger.warning("OCR upstream answered %s, retrying", response.status_code)
+            await asyncio.sleep(_backoff(attempt, response.headers.get("retry-after")))
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+_client: Optional[OcrClient] = None
+
+
+def get_client() -> OcrClient:
+    global _client
+    if _client is None:
+        _client = OcrClient()
+    return _client
+
+
+def set_client(client: Optional[OcrClient]) -> None:
+    """Swap the client (tests point it at a mock upstream)."""
+    global _client
+    _client = client
+
+
+async def startup() -> None:
+    get_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,161 @@
+"""
+Shrinks uploads before they are sent to the vision model.
+
+Phone photos of a bill are often 12 megapixels and several MB; base64 adds a
+third on top. The model reads a page just as well at OCR_IMAGE_MAX_EDGE
+pixels, so images are downscaled, re-encoded as JPEG and stripped of EXIF
+(location, device). Multi-page PDFs are cut down to the pages that look like
+the cost table (amounts plus Betriebskosten vocabulary).
+
+preprocess() is CPU bound; call it through asyncio.to_thread. The cache key
+of an upload is the digest of the raw bytes, not of the preprocessed ones.
+"""
+import io
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from PIL import Image, ImageOps, UnidentifiedImageError
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Words that appear on the cost breakdown of a Nebenkostenabrechnung
+COST_TABLE_TERMS = re.compile(
+    r"betriebskosten|nebenkosten|heizkosten|gesamtkosten|umlage|verteilerschlüssel|"
+    r"anteil|grundsteuer|müllabfuhr|hauswart|wasser|summe|nachzahlung|guthaben|"
+    r"vorauszahlung",
+    re.IGNORECASE,
+)
+AMOUNT = re.compile(r"\d{1,3}(?:\.\d{3})*,\d{2}")
+MIN_PAGE_SCORE = 5
+
+
+@dataclass
+class PreparedUpload:
+    data: bytes
+    media_type: str
+    original_size: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - len(self.data)
+
+
+class PreprocessStats:
+    """Totals and per-request savings over the last `window` uploads."""
+
+    def __init__(self, window: int = 500):
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._saved: deque = deque(maxlen=window)
+        self._seconds: deque = deque(maxlen=window)
+
+    def record(self, bytes_in: int, bytes_out: int, seconds: float) -> None:
+        self.requests += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self._saved.append(bytes_in - bytes_out)
+        self._seconds.append(seconds)
+
+    def snapshot(self) -> dict:
+        saved = sorted(self._saved)
+
+        def percentile(p: float) -> Optional[int]:
+            if not saved:
+                return None
+            return saved[min(len(saved) - 1, int(p * len(saved)))]
+
+        return {
+            "requests": self.requests,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved_total": self.bytes_in - self.bytes_out,
+            "bytes_saved_per_request_avg": round(sum(saved) / len(saved)) if saved else 0,
+            "bytes_saved_per_request_p50": percentile(0.50),
+            "bytes_saved_per_request_max": percentile(1.0),
+            "preprocess_ms_avg": round(sum(self._seconds) / len(self._seconds) * 1000, 1) if self._seconds else 0.0,
+        }
+
+
+stats = PreprocessStats()
+
+
+def shrink_image(contents: bytes) -> tuple[bytes, str]:
+    """Downscaled, EXIF-free JPEG of an image upload. Raises on undecodable input."""
+    with Image.open(io.BytesIO(contents)) as img:
+        had_metadata = bool(img.getexif()) or "icc_profile" in img.info
+        edge = settings.OCR_IMAGE_MAX_EDGE
+        resized = max(img.size) > edge
+        # Rotate by the EXIF orientation before the tag is dropped
+        out = ImageOps.exif_transpose(img)
+        if out.mode not in ("RGB", "L"):
+            out = out.convert("RGB")
+        if resized:
+            out.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        out.save(buffer, format="JPEG", quality=settings.OCR_JPEG_QUALITY, optimize=True)
+    data = buffer.getvalue()
+    if len(data) >= len(contents) and not resized and not had_metadata:
+        # Small, clean original (e.g. a crisp PNG screenshot): re-encoding would only grow it
+        raise ValueError("re-encoding does not shrink the image")
+    return data, "image/jpeg"
+
+
+def _page_score(text: str) -> int:
+    return len(COST_TABLE_TERMS.findall(text)) + len(AMOUNT.findall(text))
+
+
+def cost_table_pages(reader: PdfReader) -> list[int]:
+    """Indexes of the pages worth sending, at most OCR_PDF_MAX_PAGES."""
+    limit = settings.OCR_PDF_MAX_PAGES
+    scores = []
+    for index, page in enumerate(reader.pages):
+        try:
+            scores.append((_page_score(page.extract_text() or ""), index))
+        except Exception:  # broken content stream: judge it unreadable
+            scores.append((0, index))
+    hits = sorted(index for score, index in sorted(scores, reverse=True)[:limit] if score >= MIN_PAGE_SCORE)
+    if hits:
+        return hits
+    # No text layer (scanned PDF) or nothing recognisable: the table is usually up front
+    return list(range(min(limit, len(scores))))
+
+
+def trim_pdf(contents: bytes) -> bytes:
+    """The PDF cut down to its cost-table pages. Raises on unreadable input."""
+    reader = PdfReader(io.BytesIO(contents))
+    pages = cost_table_pages(reader)
+    if len(pages) == len(reader.pages):
+        raise ValueError("all pages are needed")
+    writer = PdfWriter()
+    for index in pages:
+        writer.add_page(reader.pages[index])
+    writer.compress_identical_objects()
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def preprocess(contents: bytes, media_type: str) -> PreparedUpload:
+    """What to send upstream for an upload; falls back to the original bytes."""
+    started = time.perf_counter()
+    prepared = PreparedUpload(data=contents, media_type=media_type, original_size=len(contents))
+    try:
+        if media_type == "application/pdf":
+            prepared.data = trim_pdf(contents)
+        else:
+            prepared.data, prepared.media_type = shrink_image(contents)
+    except (ValueError, OSError, UnidentifiedImageError, PdfReadError, Image.DecompressionBombError) as e:
+        logger.debug("OCR upload sent unchanged (%s): %s", media_type, e)
+    stats.record(len(contents), len(prepared.data), time.perf_counter() - started)
+    logger.info(
+        "OCR upload preprocessed: %d -> %d bytes (%d saved)",
+        len(contents), len(prepared.data), prepared.bytes_saved,
+    )
+    return prepared
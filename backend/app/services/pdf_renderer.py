@@ -0,0 +1,142 @@
+"""
+Bounded executor for reportlab rendering.
+
+reportlab is pure Python and CPU bound: a report built inside an endpoint
+blocks the event loop for every other request on the worker. render() runs a
+pdf_service generator in a process pool instead and awaits the result.
+
+At most PDF_RENDER_QUEUE_LIMIT renders may be queued or running per API
+process; beyond that RenderQueueFull is raised and the endpoints answer 503
+with a Retry-After estimate.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    """Too many renders in flight; retry after retry_after seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"PDF render queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RenderStats:
+    """Counters and rolling latency percentiles over the last `window` renders."""
+
+    def __init__(self, window: int = 500):
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._waits: deque = deque(maxlen=window)
+        self._renders: deque = deque(maxlen=window)
+
+    def record(self, wait_seconds: float, render_seconds: float) -> None:
+        self.completed += 1
+        self._waits.append(wait_seconds)
+        self._renders.append(render_seconds)
+
+    def average_render(self) -> float:
+        return sum(self._renders) / len(self._renders) if self._renders else 0.0
+
+    def snapshot(self) -> dict:
+        totals = sorted(w + r for w, r in zip(self._waits, self._renders))
+
+        def percentile(p: float) -> Optional[float]:
+            if not totals:
+                return None
+            return round(totals[min(len(totals) - 1, int(p * len(totals)))] * 1000, 1)
+
+        return {
+            "workers": settings.PDF_RENDER_WORKERS,
+            "queue_limit": settings.PDF_RENDER_QUEUE_LIMIT,
+            "in_flight": _in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": percentile(1.0),
+            "render_ms_avg": round(self.average_render() * 1000, 1),
+            "queue_wait_ms_avg": round(sum(self._waits) / len(self._waits) * 1000, 1) if self._waits else 0.0,
+        }
+
+
+stats = RenderStats()
+_executor: Optional[Executor] = None
+_in_flight = 0
+
+
+def _get_executor() -> Optional[Executor]:
+    """The process pool, created on first use; None runs renders on the loop's thread pool."""
+    global _executor
+    if _executor is None and settings.PDF_RENDER_WORKERS > 0:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _timed_call(fn: Callable[..., Any], kwargs: dict) -> tuple[Any, float]:
+    """Runs in the worker; returns the result and the pure rendering time."""
+    start = time.perf_counter()
+    result = fn(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def _retry_after() -> int:
+    workers = max(settings.PDF_RENDER_WORKERS, 1)
+    return max(1, math.ceil(stats.average_render() * _in_flight / workers))
+
+
+async def render(fn: Callable[..., Any], **kwargs) -> Any:
+    """
+    Run fn(**kwargs) in the render pool and return its result.
+
+    fn must be a module-level function and all arguments picklable (plain
+    values, no ORM objects). Raises RenderQueueFull when the pool is saturated.
+    """
+    global _in_flight, _executor
+    if _in_flight >= settings.PDF_RENDER_QUEUE_LIMIT:
+        stats.rejected += 1
+        raise RenderQueueFull(_retry_after())
+
+    _in_flight += 1
+    submitted = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        result, render_seconds = await loop.run_in_executor(_get_executor(), _timed_call, fn, kwargs)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); start a fresh pool for the next render
+        stats.failed += 1
+        logger.error("PDF render pool broken, recreating it")
+        shutdown()
+        raise
+    except Exception:
+        stats.failed += 1
+        raise
+    finally:
+        _in_flight -= 1
+
+    total = time.perf_counter() - submitted
+    stats.record(max(total - render_seconds, 0.0), render_seconds)
+    return result
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
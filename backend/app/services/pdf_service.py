@@ -1,8 +1,12 @@
 """PDF generation for Widerspruchsbriefe (objection letters)."""
+import copy
+import io
 import os
 import uuid
 from datetime import date
-from typing import List, Optional
+from decimal import Decimal
+from types import MappingProxyType
+from typing import List, NamedTuple, Optional
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
@@ -11,6 +15,125 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
 from reportlab.lib.colors import HexColor
 from app.config import settings
 
+BLUE = HexColor("#3b82f6")
+GRAY = HexColor("#6b7280")
+RULE_GRAY = HexColor("#cccccc")
+
+# Page layout shared by all documents
+PAGE_TEMPLATE = MappingProxyType(dict(
+    pagesize=A4,
+    rightMargin=2.5 * cm,
+    leftMargin=2.5 * cm,
+    topMargin=2 * cm,
+    bottomMargin=2 * cm,
+))
+
+
+def _build_styles() -> MappingProxyType:
+    base = getSampleStyleSheet()["Normal"]
+    styles = [
+        # Objection letter
+        ParagraphStyle("LetterTitle", parent=base, fontSize=14, fontName="Helvetica-Bold",
+                       textColor=BLUE, spaceAfter=6),
+        ParagraphStyle("LetterNormal", parent=base, fontSize=11, leading=16, spaceAfter=4),
+        ParagraphStyle("LetterBold", parent=base, fontSize=11, fontName="Helvetica-Bold",
+                       leading=16, spaceAfter=4),
+        ParagraphStyle("LetterJustify", parent=base, fontSize=11, leading=16,
+                       alignment=TA_JUSTIFY, spaceAfter=8),
+        # Check report
+        ParagraphStyle("ReportTitle", parent=base, fontSize=16, fontName="Helvetica-Bold",
+                       textColor=BLUE, spaceAfter=4),
+        ParagraphStyle("ReportSubtitle", parent=base, fontSize=10,
+                       textColor=HexColor("#9ca3af"), spaceAfter=12),
+        ParagraphStyle("ReportSection", parent=base, fontSize=12, fontName="Helvetica-Bold",
+                       spaceAfter=6, spaceBefore=12),
+        ParagraphStyle("ReportBody", parent=base, fontSize=10, leading=14, spaceAfter=4),
+        ParagraphStyle("ReportSmall", parent=base, fontSize=9, textColor=GRAY, leading=13, spaceAfter=2),
+        ParagraphStyle("ReportScore", parent=base, fontSize=12, spaceAfter=4),
+        ParagraphStyle("ReportItemTitle", parent=base, fontSize=10, spaceAfter=2),
+        ParagraphStyle("ReportPosition", parent=base, fontSize=9, spaceAfter=2),
+        # Both
+        ParagraphStyle("Footer", parent=base, fontSize=8, textColor=HexColor("#999999")),
+    ]
+    return MappingProxyType({style.name: style for style in styles})
+
+
+# Built once per process; documents only read from it
+STYLES = _build_styles()
+
+SEVERITY_LABELS = MappingProxyType({"error": "Fehler", "warning": "Warnung", "ok": "OK"})
+SEVERITY_HEX = MappingProxyType({"error": "#ef4444", "warning": "#f59e0b", "ok": "#10b981"})
+
+
+def _score_hex(check_score: int) -> str:
+    return "#10b981" if check_score >= 70 else ("#f59e0b" if check_score >= 40 else "#ef4444")
+
+
+# Static story fragments, parsed once. platypus stores per-build state on the
+# flowables (_postponed, canv, _frame), so every document gets shallow copies
+# via _fragment() instead of the shared instances.
+FOOTER = (
+    HRFlowable(width="100%", thickness=0.5, color=RULE_GRAY),
+    Spacer(1, 0.2 * cm),
+    Paragraph(
+        "<i>Erstellt mit MietCheck – Nebenkostenabrechnungen einfach prüfen</i>",
+        STYLES["Footer"],
+    ),
+)
+REPORT_HEADER = (
+    Paragraph("MietCheck Prüfbericht", STYLES["ReportTitle"]),
+)
+LETTER_CLOSING = (
+    Paragraph(
+        "Ich bitte Sie daher, die Abrechnung zu korrigieren und mir eine überarbeitete "
+        "Abrechnung zuzusenden. Eine eventuelle Nachzahlung werde ich erst nach Vorlage "
+        "einer korrekten Abrechnung leisten.",
+        STYLES["LetterJustify"],
+    ),
+    Paragraph(
+        "Ich bitte Sie außerdem, mir sämtliche Belege für die abgerechneten Positionen "
+        "zur Einsicht bereit zu stellen (§ 259 BGB).",
+        STYLES["LetterJustify"],
+    ),
+    Spacer(1, 0.3 * cm),
+    Paragraph(
+        "Bitte bestätigen Sie den Eingang dieses Schreibens und nehmen Sie innerhalb "
+        "von 14 Tagen Stellung.",
+        STYLES["LetterJustify"],
+    ),
+    Spacer(1, 0.5 * cm),
+    Paragraph("Mit freundlichen Grüßen,", STYLES["LetterNormal"]),
+    Spacer(1, 1.5 * cm),
+)
+
+
+def _fragment(flowables) -> list:
+    return [copy.copy(f) for f in flowables]
+
+
+class ReportItem(NamedTuple):
+    """Picklable copy of a CheckResult for rendering in a worker process."""
+    severity: str
+    title: str
+    description: str
+    recommendation: Optional[str]
+
+    @classmethod
+    def of(cls, check_result) -> "ReportItem":
+        return cls(check_result.severity, check_result.title, check_result.description, check_result.recommendation)
+
+
+class ReportPosition(NamedTuple):
+    """Picklable copy of a BillPosition for rendering in a worker process."""
+    name: str
+    total_amount: Decimal
+    tenant_amount: Optional[Decimal]
+    is_allowed: bool
+
+    @classmethod
+    def of(cls, position) -> "ReportPosition":
+        return cls(position.name, position.total_amount, position.tenant_amount, position.is_allowed)
+
 
 def generate_objection_letter_pdf(
     tenant_name: str,
@@ -30,49 +153,12 @@ def generate_objection_letter_pdf(
     filepath = os.path.join(settings.PDF_STORAGE_PATH, filename)
     os.makedirs(settings.PDF_STORAGE_PATH, exist_ok=True)
 
-    doc = SimpleDocTemplate(
-        filepath,
-        pagesize=A4,
-        rightMargin=2.5 * cm,
-        leftMargin=2.5 * cm,
-        topMargin=2 * cm,
-        bottomMargin=2 * cm,
-    )
-
-    styles = getSampleStyleSheet()
-    blue = HexColor("#3b82f6")
-
-    title_style = ParagraphStyle(
-        "Title",
-        parent=styles["Normal"],
-        fontSize=14,
-        fontName="Helvetica-Bold",
-        textColor=blue,
-        spaceAfter=6,
-    )
-    normal_style = ParagraphStyle(
-        "Normal",
-        parent=styles["Normal"],
-        fontSize=11,
-        leading=16,
-        spaceAfter=4,
-    )
-    bold_style = ParagraphStyle(
-        "Bold",
-        parent=styles["Normal"],
-        fontSize=11,
-        fontName="Helvetica-Bold",
-        leading=16,
-        spaceAfter=4,
-    )
-    justify_style = ParagraphStyle(
-        "Justify",
-        parent=styles["Normal"],
-        fontSize=11,
-        leading=16,
-        alignment=TA_JUSTIFY,
-        spaceAfter=8,
-    )
+    doc = SimpleDocTemplate(filepath, **PAGE_TEMPLATE)
+
+    title_style = STYLES["LetterTitle"]
+    normal_style = STYLES["LetterNormal"]
+    bold_style = STYLES["LetterBold"]
+    justify_style = STYLES["LetterJustify"]
 
     story = []
 
@@ -91,7 +177,7 @@ def generate_objection_letter_pdf(
     # Date
     story.append(Paragraph(letter_date.strftime("%d. %B %Y"), normal_style))
     story.append(Spacer(1, 0.5 * cm))
-    story.append(HRFlowable(width="100%", thickness=1, color=blue))
+    story.append(HRFlowable(width="100%", thickness=1, color=BLUE))
     story.append(Spacer(1, 0.3 * cm))
 
     # Subject
@@ -122,37 +208,12 @@ def generate_objection_letter_pdf(
         story.append(Paragraph(f"{i}. {reason}", justify_style))
 
     story.append(Spacer(1, 0.3 * cm))
-    story.append(Paragraph(
-        "Ich bitte Sie daher, die Abrechnung zu korrigieren und mir eine überarbeitete "
-        "Abrechnung zuzusenden. Eine eventuelle Nachzahlung werde ich erst nach Vorlage "
-        "einer korrekten Abrechnung leisten.",
-        justify_style,
-    ))
-    story.append(Paragraph(
-        "Ich bitte Sie außerdem, mir sämtliche Belege für die abgerechneten Positionen "
-        "zur Einsicht bereit zu stellen (§ 259 BGB).",
-        justify_style,
-    ))
-    story.append(Spacer(1, 0.3 * cm))
-
-    story.append(Paragraph(
-        "Bitte bestätigen Sie den Eingang dieses Schreibens und nehmen Sie innerhalb "
-        "von 14 Tagen Stellung.",
-        justify_style,
-    ))
-    story.append(Spacer(1, 0.5 * cm))
+    story.extend(_fragment(LETTER_CLOSING))
 
     # Closing
-    story.append(Paragraph("Mit freundlichen Grüßen,", normal_style))
-    story.append(Spacer(1, 1.5 * cm))
     story.append(Paragraph(f"<u>{tenant_name}</u>", normal_style))
     story.append(Spacer(1, 0.3 * cm))
-    story.append(HRFlowable(width="100%", thickness=0.5, color=HexColor("#cccccc")))
-    story.append(Spacer(1, 0.2 * cm))
-    story.append(Paragraph(
-        "<i>Erstellt mit MietCheck – Nebenkostenabrechnungen einfach prüfen</i>",
-        ParagraphStyle("Footer", parent=styles["Normal"], fontSize=8, textColor=HexColor("#999999")),
-    ))
+    story.extend(_fragment(FOOTER))
 
     doc.build(story)
     return filepath
@@ -165,67 +226,34 @@ def generate_check_report_pdf(
     billing_period_start: str,
     billing_period_end: str,
     check_score: Optional[int],
-    check_results: list,
-    positions: list,
+    check_results: List[ReportItem],
+    positions: List[ReportPosition],
     total_costs: Optional[str],
     result_amount: Optional[str],
-) -> str:
-    """Generate a PDF check report for a utility bill and return the file path."""
-    filename = f"pruefbericht_{billing_year}_{uuid.uuid4().hex[:8]}.pdf"
-    filepath = os.path.join(settings.PDF_STORAGE_PATH, filename)
-    os.makedirs(settings.PDF_STORAGE_PATH, exist_ok=True)
+) -> bytes:
+    """Render a PDF check report for a utility bill in memory and return its bytes.
 
-    doc = SimpleDocTemplate(
-        filepath,
-        pagesize=A4,
-        rightMargin=2.5 * cm,
-        leftMargin=2.5 * cm,
-        topMargin=2 * cm,
-        bottomMargin=2 * cm,
-    )
-
-    styles = getSampleStyleSheet()
-    blue = HexColor("#3b82f6")
-    red = HexColor("#ef4444")
-    yellow = HexColor("#f59e0b")
-    green = HexColor("#10b981")
-    gray = HexColor("#6b7280")
-
-    title_style = ParagraphStyle(
-        "Title", parent=styles["Normal"], fontSize=16,
-        fontName="Helvetica-Bold", textColor=blue, spaceAfter=4,
-    )
-    subtitle_style = ParagraphStyle(
-        "Subtitle", parent=styles["Normal"], fontSize=10,
-        textColor=HexColor("#9ca3af"), spaceAfter=12,
-    )
-    section_style = ParagraphStyle(
-        "Section", parent=styles["Normal"], fontSize=12,
-        fontName="Helvetica-Bold", spaceAfter=6, spaceBefore=12,
-    )
-    normal_style = ParagraphStyle(
-        "Body", parent=styles["Normal"], fontSize=10, leading=14, spaceAfter=4,
-    )
-    small_style = ParagraphStyle(
-        "Small", parent=styles["Normal"], fontSize=9,
-        textColor=gray, leading=13, spaceAfter=2,
-    )
-    footer_style = ParagraphStyle(
-        "Footer", parent=styles["Normal"], fontSize=8, textColor=HexColor("#999999"),
-    )
-
-    severity_colors = {"error": red, "warning": yellow, "ok": green}
-    severity_labels = {"error": "Fehler", "warning": "Warnung", "ok": "OK"}
+    Reports are derived data and never written to PDF_STORAGE_PATH; callers
+    stream the bytes (and may keep them in app.services.report_cache).
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, **PAGE_TEMPLATE)
+
+    section_style = STYLES["ReportSection"]
+    normal_style = STYLES["ReportBody"]
+    small_style = STYLES["ReportSmall"]
+    item_style = STYLES["ReportItemTitle"]
+    position_style = STYLES["ReportPosition"]
 
     story = []
 
     # Header
-    story.append(Paragraph("MietCheck Prüfbericht", title_style))
+    story.extend(_fragment(REPORT_HEADER))
     story.append(Paragraph(
         f"Nebenkostenabrechnung {billing_year} · {property_address}",
-        subtitle_style,
+        STYLES["ReportSubtitle"],
     ))
-    story.append(HRFlowable(width="100%", thickness=1, color=blue))
+    story.append(HRFlowable(width="100%", thickness=1, color=BLUE))
     story.append(Spacer(1, 0.3 * cm))
 
     # Summary block
@@ -238,31 +266,26 @@ def generate_check_report_pdf(
         label = "Nachzahlung" if float(result_amount) > 0 else "Guthaben"
         story.append(Paragraph(f"{label}: {abs(float(result_amount)):.2f} €", normal_style))
     if check_score is not None:
-        score_color = green if check_score >= 70 else (yellow if check_score >= 40 else red)
         story.append(Paragraph(
-            f"Prüfscore: <font color='{'#10b981' if check_score >= 70 else ('#f59e0b' if check_score >= 40 else '#ef4444')}'>"
-            f"<b>{check_score}/100</b></font>",
-            ParagraphStyle("Score", parent=styles["Normal"], fontSize=12, spaceAfter=4),
+            f"Prüfscore: <font color='{_score_hex(check_score)}'><b>{check_score}/100</b></font>",
+            STYLES["ReportScore"],
         ))
     story.append(Paragraph(f"Erstellt am: {date.today().strftime('%d.%m.%Y')}", small_style))
     story.append(Spacer(1, 0.3 * cm))
 
     # Check results
-    errors = [r for r in check_results if r.severity == "error"]
-    warnings = [r for r in check_results if r.severity == "warning"]
-    oks = [r for r in check_results if r.severity == "ok"]
+    by_severity = {"error": [], "warning": [], "ok": []}
+    for r in check_results:
+        if r.severity in by_severity:
+            by_severity[r.severity].append(r)
 
-    for severity, items in [("error", errors), ("warning", warnings), ("ok", oks)]:
+    for severity, items in by_severity.items():
         if not items:
             continue
-        label = severity_labels[severity]
-        story.append(Paragraph(f"{label} ({len(items)})", section_style))
+        story.append(Paragraph(f"{SEVERITY_LABELS[severity]} ({len(items)})", section_style))
+        color_hex = SEVERITY_HEX[severity]
         for item in items:
-            color_hex = "#ef4444" if severity == "error" else ("#f59e0b" if severity == "warning" else "#10b981")
-            story.append(Paragraph(
-                f"<font color='{color_hex}'><b>▶ {item.title}</b></font>",
-                ParagraphStyle("ItemTitle", parent=styles["Normal"], fontSize=10, spaceAfter=2),
-            ))
+            story.append(Paragraph(f"<font color='{color_hex}'><b>▶ {item.title}</b></font>", item_style))
             story.append(Paragraph(item.description, small_style))
             if item.recommendation:
                 story.append(Paragraph(f"Empfehlung: {item.recommendation}", small_style))
@@ -271,24 +294,16 @@ def generate_check_report_pdf(
     # Positions
     if positions:
         story.append(Spacer(1, 0.2 * cm))
-        story.append(HRFlowable(width="100%", thickness=0.5, color=HexColor("#cccccc")))
+        story.append(HRFlowable(width="100%", thickness=0.5, color=RULE_GRAY))
         story.append(Paragraph("Kostenpositionen", section_style))
         for pos in positions:
             amount = pos.tenant_amount or pos.total_amount
             allowed_text = "" if pos.is_allowed else " ⚠ Nicht umlagefähig"
-            story.append(Paragraph(
-                f"<b>{pos.name}</b>{allowed_text} – {amount} €",
-                ParagraphStyle("Pos", parent=styles["Normal"], fontSize=9, spaceAfter=2),
-            ))
+            story.append(Paragraph(f"<b>{pos.name}</b>{allowed_text} – {amount} €", position_style))
 
     # Footer
     story.append(Spacer(1, 0.5 * cm))
-    story.append(HRFlowable(width="100%", thickness=0.5, color=HexColor("#cccccc")))
-    story.append(Spacer(1, 0.2 * cm))
-    story.append(Paragraph(
-        "<i>Erstellt mit MietCheck – Nebenkostenabrechnungen einfach prüfen</i>",
-        footer_style,
-    ))
+    story.extend(_fragment(FOOTER))
 
     doc.build(story)
-    return filepath
+    return buffer.getvalue()
@@ -0,0 +1,101 @@
+"""
+Content-addressed cache for rendered check reports.
+
+A report is keyed by a hash of everything that goes into it (see report_key),
+so an unchanged bill is served from disk and the key doubles as its ETag.
+Files are named <bill_id>_<key>.pdf, which lets invalidate() drop all
+entries of a bill. The directory is kept below REPORT_CACHE_MAX_BYTES by
+evicting the least recently served files (mtime is bumped on every hit).
+lookup(), store() and invalidate() do blocking file I/O; call them through
+asyncio.to_thread from async code.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout changes so old renders are not served
+REPORT_VERSION = 1
+
+
+def cache_dir() -> str:
+    return os.path.join(settings.PDF_STORAGE_PATH, "report_cache")
+
+
+def report_key(report_inputs: dict) -> str:
+    """Stable hash of the generate_check_report_pdf arguments."""
+    payload = json.dumps(
+        {"version": REPORT_VERSION, **report_inputs},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(bill_id: int, key: str) -> str:
+    return os.path.join(cache_dir(), f"{bill_id}_{key}.pdf")
+
+
+def lookup(bill_id: int, key: str) -> Optional[str]:
+    """Path of the cached report, or None. A hit counts as a use for the LRU."""
+    path = _path(bill_id, key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store(bill_id: int, key: str, pdf: bytes) -> str:
+    """Write a freshly rendered report into the cache and return its path."""
+    os.makedirs(cache_dir(), exist_ok=True)
+    # Older renders of this bill can never be requested again
+    invalidate(bill_id)
+    path = _path(bill_id, key)
+    # Write under a name lookup() and eviction ignore, then swap in atomically
+    tmp_path = os.path.join(cache_dir(), f".{bill_id}_{key}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+    _evict(keep=path)
+    return path
+
+
+def invalidate(bill_id: int) -> None:
+    for path in glob.glob(os.path.join(cache_dir(), f"{bill_id}_*.pdf")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _evict(keep: str) -> None:
+    entries = []
+    total = 0
+    with os.scandir(cache_dir()) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+    if total <= settings.REPORT_CACHE_MAX_BYTES:
+        return
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total <= settings.REPORT_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+    logger.debug("Report cache evicted down to %d bytes", total)
@@ -0,0 +1,162 @@
+"""
+Pool of persistent, authenticated SMTP sessions.
+
+aiosmtplib.send() connects, negotiates STARTTLS and logs in for every
+message, which costs several round trips and a TLS handshake per mail and
+caps bulk sending at a few messages per second. SmtpPool keeps up to
+SMTP_POOL_SIZE sessions open and reuses each one for up to
+SMTP_MAX_MESSAGES_PER_CONNECTION messages, or until it has been idle for
+SMTP_IDLE_SECONDS. A session whose connection fails is dropped, and the
+message is retried once on a fresh session, which covers servers that close
+idle connections; a refused message (bad recipient, rejected content) leaves
+the session in the pool. send_many() spreads a batch over all sessions concurrently.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.message import Message
+from typing import AsyncIterator, Optional
+import aiosmtplib
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a session is worth one more try on a new connection
+RECONNECT_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError)
+# Refusals of one message; sendmail() resets the envelope, so the session stays usable
+MESSAGE_ERRORS = (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPResponseException)
+
+
+class _Session:
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SmtpPool:
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or settings.SMTP_POOL_SIZE
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: list[_Session] = []  # LIFO, so the most recently used session is reused first
+        self.connections_opened = 0
+        self.messages_sent = 0
+        self.reconnects = 0
+
+    async def _open(self) -> _Session:
+        kwargs = {
+            "hostname": settings.SMTP_HOST,
+            "port": settings.SMTP_PORT,
+            "username": settings.SMTP_USER or None,
+            "password": settings.SMTP_PASSWORD or None,
+            "timeout": settings.SMTP_TIMEOUT,
+        }
+        if settings.SMTP_TLS:
+            kwargs["start_tls"] = True
+        client = aiosmtplib.SMTP(**kwargs)
+        await client.connect()  # includes STARTTLS and login
+        self.connections_opened += 1
+        return _Session(client)
+
+    async def _discard(self, session: _Session) -> None:
+        try:
+            if session.client.is_connected:
+                await session.client.quit()
+        except Exception:
+            session.client.close()
+
+    async def _acquire(self) -> _Session:
+        while self._idle:
+            session = self._idle.pop()
+            if session.client.is_connected and time.monotonic() - session.last_used < settings.SMTP_IDLE_SECONDS:
+                return session
+            await self._discard(session)
+        return await self._open()
+
+    async def _release(self, session: _Session) -> None:
+        if not session.client.is_connected or session.sent >= settings.SMTP_MAX_MESSAGES_PER_CONNECTION:
+            await self._discard(session)
+            return
+        session.last_used = time.monotonic()
+        self._idle.append(session)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[_Session]:
+        """A connected session; dropped instead of reused if the block raises anything but MESSAGE_ERRORS."""
+        async with self._slots:
+            session = await self._acquire()
+            try:
+                yield session
+            except MESSAGE_ERRORS:
+                await self._release(session)
+                raise
+            except BaseException:
+                await self._discard(session)
+                raise
+            await self._release(session)
+
+    async def send(self, msg: Message) -> None:
+        for attempt in range(2):
+            try:
+                async with self.session() as session:
+                    await session.client.send_message(msg)
+                    session.sent += 1
+                self.messages_sent += 1
+                return
+            except RECONNECT_ERRORS:
+                if attempt:
+                    raise
+                self.reconnects += 1
+
+    async def send_many(self, messages: list[Message]) -> list[Optional[Exception]]:
+        """Send a batch over up to `size` sessions at once; the error per message, or None."""
+        results: list[Optional[Exception]] = [None] * len(messages)
+        pending = iter(enumerate(messages))
+
+        async def worker() -> None:
+            for index, msg in pending:
+                try:
+                    await self.send(msg)
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(*(worker() for _ in range(min(self.size, len(messages)))))
+        return results
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await self._discard(session)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+            "reconnects": self.reconnects,
+        }
+
+
+_pool: Optional[SmtpPool] = None
+
+
+def get_pool() -> SmtpPool:
+    global _pool
+    if _pool is None:
+        _pool = SmtpPool()
+    return _pool
+
+
+def set_pool(pool: Optional[SmtpPool]) -> None:
+    """Swap the pool (tests point it at a local SMTP stand-in)."""
+    global _pool
+    _pool = pool
+
+
+async def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
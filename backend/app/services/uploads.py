@@ -0,0 +1,78 @@
+"""
+Chunked intake of multipart uploads.
+
+Starlette spools an UploadFile to a temporary file once it passes 1 MB; a
+plain `await file.read()` then pulls all of it back into worker memory. The
+helpers here read UPLOAD_CHUNK_SIZE at a time, hash and size-check every
+chunk as it arrives and give up as soon as the limit is crossed, so an
+upload never costs more than one chunk of memory.
+"""
+import hashlib
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+import aiofiles
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeds max_size bytes."""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"upload exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class ReceivedUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+async def receive(file: UploadFile, directory: str, max_size: int, filename: Optional[str] = None) -> ReceivedUpload:
+    """
+    Write the upload to `directory`, under `filename` or a temporary name.
+
+    Chunks go to a hidden `.part` file that is renamed into place only once
+    the whole upload has arrived within max_size, so a reader never sees a
+    partial document. On any error the partial file is removed.
+    """
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge(max_size)
+
+    digest = hashlib.sha256()
+    size = 0
+    part = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    try:
+        async with aiofiles.open(part, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(max_size)
+                digest.update(chunk)
+                await out.write(chunk)
+        path = part
+        if filename is not None:
+            path = os.path.join(directory, filename)
+            os.replace(part, path)
+    except BaseException:
+        discard(part)
+        raise
+    return ReceivedUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+async def receive_temporary(file: UploadFile, max_size: int) -> ReceivedUpload:
+    """Like receive() into the system temp directory; the caller removes the file with discard()."""
+    return await receive(file, tempfile.gettempdir(), max_size)
+
+
+def discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
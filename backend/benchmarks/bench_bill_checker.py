@@ -0,0 +1,115 @@
+"""
+Benchmark: column evaluation (run_all_checks default, run_checks_batch) vs.
+chained per-check passes.
+
+Bills, positions and contracts are transient ORM objects, as in the API, so
+attribute reads and writes cost what they cost there. "fresh" positions have
+not been checked yet (create_bill); "stored" ones carry the annotations of an
+earlier run (recheck, PATCH, bulk recheck).
+
+Run from the backend directory:
+    python -m benchmarks.bench_bill_checker [--positions 10 50 200] [--rows 8000] [--clean]
+"""
+import argparse
+import gc
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from app.core.bill_checker import ILLEGAL_CATEGORIES, REFERENCE_VALUES, run_all_checks, run_checks_batch
+from app.models import BillPosition, RentalContract, UtilityBill
+
+RUNS = 5
+
+
+def make_inputs(n_positions: int, seed: int = 0, clean: bool = False):
+    """Bill inputs; clean=True yields positions without findings (pure rule overhead)."""
+    categories = list(REFERENCE_VALUES) + ["other"]
+    if not clean:
+        categories += list(ILLEGAL_CATEGORIES)
+    bill = UtilityBill(
+        billing_period_end=date(2023, 12, 31),
+        received_date=date(2024, 6, 1),
+        total_costs=Decimal("2500.00"),
+    )
+    contract = RentalContract(apartment_size_sqm=Decimal("72.50"), heating_type="central")
+
+    def positions():
+        local = random.Random(seed)
+        out = []
+        for i in range(n_positions):
+            total = Decimal(local.randint(100, 5000)) if not clean else Decimal(local.randint(10, 100))
+            share = Decimal("20.00")
+            amount = (total * share / 100).quantize(Decimal("0.01"))
+            if not clean:
+                amount += Decimal(local.choice([0, 0, 0, 3]))
+            out.append(BillPosition(
+                name=f"Position {i}",
+                category=local.choice(categories),
+                total_amount=total,
+                tenant_share_percent=share,
+                tenant_amount=amount,
+                is_allowed=True,
+                is_plausible=None,
+                reference_value_low=None,
+                reference_value_high=None,
+            ))
+        return out
+
+    return bill, positions, contract
+
+
+def time_per_bill(run, make_batch, stored: bool) -> float:
+    """Best of RUNS, in µs per bill; inputs are built (and pre-checked) outside the timing."""
+    best = float("inf")
+    for _ in range(RUNS):
+        batch = make_batch()
+        if stored:
+            run(batch)
+        gc.collect()
+        start = time.process_time()
+        run(batch)
+        best = min(best, (time.process_time() - start) / len(batch))
+    return best * 1e6
+
+
+def bench(n_positions: int, rows: int, clean: bool) -> None:
+    bills = max(3, rows // n_positions)
+    inputs = [make_inputs(n_positions, seed=seed, clean=clean) for seed in range(bills)]
+
+    def make_batch():
+        return [(bill, positions(), contract) for bill, positions, contract in inputs]
+
+    modes = {
+        "per-check": lambda batch: [run_all_checks(b, p, c, fused=False) for b, p, c in batch],
+        "columns": lambda batch: [run_all_checks(b, p, c) for b, p, c in batch],
+        "batch": run_checks_batch,
+    }
+    for stored in (False, True):
+        timings = {label: time_per_bill(run, make_batch, stored) for label, run in modes.items()}
+        base = timings["per-check"]
+        print(
+            f"{n_positions:>5} positions {'stored' if stored else 'fresh ':<6} | "
+            f"per-check {base:8.1f} µs/bill | "
+            + " | ".join(
+                f"{label} {timings[label]:8.1f} ({(base - timings[label]) / base * 100:+5.1f}%)"
+                for label in ("columns", "batch")
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, nargs="+", default=[5, 10, 50, 200, 1000])
+    parser.add_argument("--rows", type=int, default=8000, help="positions per timed run")
+    parser.add_argument("--clean", action="store_true", help="positions without findings")
+    args = parser.parse_args()
+
+    print("saved vs. per-check in parentheses\n")
+    for n in args.positions:
+        bench(n, args.rows, args.clean)
+
+
+if __name__ == "__main__":
+    main()
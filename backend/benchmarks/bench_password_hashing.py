@@ -0,0 +1,66 @@
+"""
+Benchmark: concurrent logins per second with bcrypt on the event loop vs. on
+the bcrypt thread pool, plus the worst event-loop stall seen meanwhile.
+
+Run from the backend directory:
+    python -m benchmarks.bench_password_hashing [--logins 32] [--rounds 12] [--workers 4]
+"""
+import argparse
+import asyncio
+import time
+
+from app.config import settings
+from app.core import security
+
+
+async def _ticker(stop: asyncio.Event, stalls: list) -> None:
+    """Measures how late a 10 ms sleep wakes up, i.e. how long the loop was blocked."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - start - 0.01)
+
+
+async def _blocking_login(password: str, hashed: str) -> bool:
+    return security.verify_password(password, hashed)
+
+
+async def run(label: str, login, logins: int, hashed: str) -> None:
+    stop = asyncio.Event()
+    stalls = []
+    ticker = asyncio.create_task(_ticker(stop, stalls))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("password123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    assert all(results)
+    print(
+        f"{label:<12} {logins / elapsed:7.1f} logins/s | "
+        f"max loop stall {max(stalls) * 1000:8.1f} ms"
+    )
+
+
+async def main_async(logins: int) -> None:
+    hashed = security.hash_password("password123")
+    await run("event loop", _blocking_login, logins, hashed)
+    await run("thread pool", security.verify_password_async, logins, hashed)
+    security.shutdown_password_hasher()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login attempts")
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.workers
+    print(f"bcrypt cost {args.rounds}, {args.workers} hash threads, {args.logins} concurrent logins\n")
+    asyncio.run(main_async(args.logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: CPU time and peak allocations per check report.
+
+With --baseline REV the pdf_service.py of that git revision is rendered the
+same way, e.g. to compare against per-call stylesheets (2e17894). Run from
+the backend directory:
+    python -m benchmarks.bench_pdf_render [--positions 10 100 500] [--baseline REV]
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+
+from app.config import settings
+from app.services import pdf_service
+
+
+def load_revision(rev: str):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:backend/app/services/pdf_service.py"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    spec = importlib.util.spec_from_loader(f"pdf_service_{rev}", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    exec(compile(source, f"{rev}:pdf_service.py", "exec"), module.__dict__)
+    return module
+
+
+def make_report(n_positions: int) -> dict:
+    severities = ["error", "warning", "ok"]
+    return dict(
+        tenant_name="Erika Mustermann",
+        property_address="Musterstraße 1, 10115 Berlin",
+        billing_year=2023,
+        billing_period_start="2023-01-01",
+        billing_period_end="2023-12-31",
+        check_score=62,
+        check_results=[
+            pdf_service.ReportItem(
+                severities[i % 3], f"Prüfung {i}", "Beschreibung der Auffälligkeit " * 3,
+                "Belege anfordern" if i % 2 else None,
+            )
+            for i in range(max(6, n_positions // 10))
+        ],
+        positions=[
+            pdf_service.ReportPosition(f"Position {i}", Decimal("100.00") + i, Decimal("20.00"), i % 7 != 0)
+            for i in range(n_positions)
+        ],
+        total_costs="2500.00",
+        result_amount="-120.50",
+    )
+
+
+def _discard(result) -> None:
+    # Older revisions rendered to a file and returned its path
+    if isinstance(result, str):
+        os.remove(result)
+
+
+def measure(module, report: dict, repeat: int) -> tuple[float, int]:
+    """Best CPU ms per report, peak traced bytes of one render."""
+    _discard(module.generate_check_report_pdf(**report))  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        result = module.generate_check_report_pdf(**report)
+        best = min(best, time.process_time() - start)
+        _discard(result)
+    tracemalloc.start()
+    _discard(module.generate_check_report_pdf(**report))
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--baseline", metavar="REV", help="git revision to compare against")
+    args = parser.parse_args()
+
+    modules = [("current", pdf_service)]
+    if args.baseline:
+        modules.insert(0, (args.baseline, load_revision(args.baseline)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.PDF_STORAGE_PATH = tmp
+        for n in args.positions:
+            report = make_report(n)
+            for label, module in modules:
+                ms, peak = measure(module, report, args.repeat)
+                print(f"{n:>5} positions | {label:<10} {ms:8.2f} ms CPU/report | peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
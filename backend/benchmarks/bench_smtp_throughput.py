@@ -0,0 +1,69 @@
+"""
+Benchmark: one SMTP connection per message vs. pooled persistent sessions.
+
+Sends to a local SMTP stand-in that delays every reply by --latency seconds,
+to model the round trips to a remote mail server.
+
+Run from the backend directory:
+    python -m benchmarks.bench_smtp_throughput [--messages 200] [--latency 0.005] [--pool-size 4]
+"""
+import argparse
+import asyncio
+import time
+
+import aiosmtplib
+
+from app.config import settings
+from app.services import email_service
+from app.services.smtp_pool import SmtpPool
+from tests.smtp_server import LocalSmtpServer
+
+
+def make_messages(n: int) -> list:
+    return [
+        email_service.build_message(f"user{i}@example.com", f"Nachricht {i}", f"<p>Hallo {i}</p>", f"Hallo {i}")
+        for i in range(n)
+    ]
+
+
+async def per_message(messages: list, server: LocalSmtpServer) -> None:
+    for msg in messages:
+        await aiosmtplib.send(msg, hostname=server.host, port=server.port, start_tls=False)
+
+
+async def pooled(messages: list, pool_size: int) -> None:
+    pool = SmtpPool(size=pool_size)
+    errors = await pool.send_many(messages)
+    await pool.close()
+    assert not any(errors), errors
+
+
+async def run(label: str, coro, server: LocalSmtpServer, n: int) -> None:
+    connections = server.connections
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {n / elapsed:8.1f} msgs/s | {server.connections - connections:4d} connections")
+
+
+async def main_async(n: int, latency: float, pool_size: int) -> None:
+    async with LocalSmtpServer(latency=latency) as server:
+        settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_TLS = server.host, server.port, False
+        settings.SMTP_USER = settings.SMTP_PASSWORD = ""
+        await run("connect per message", per_message(make_messages(n), server), server, n)
+        await run(f"pool of {pool_size}", pooled(make_messages(n), pool_size), server, n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds added to every server reply")
+    parser.add_argument("--pool-size", type=int, default=settings.SMTP_POOL_SIZE)
+    args = parser.parse_args()
+
+    print(f"{args.messages} messages, {args.latency * 1000:.1f} ms per server reply\n")
+    asyncio.run(main_async(args.messages, args.latency, args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Benchmark: per-request access-token verification with and without the
+verified-token cache.
+
+Run from the backend directory:
+    python -m benchmarks.bench_token_decode [--number 20000]
+"""
+import argparse
+import time
+import timeit
+
+from app.core import security
+
+
+def bench(number: int) -> None:
+    token = security.create_access_token(42, "member")
+    security.clear_token_cache()
+    security.decode_access_token(token)
+
+    cases = [
+        ("jwt.decode every request", lambda: security._verify_access_token(token)),
+        ("cached (hit)", lambda: security.decode_access_token(token)),
+    ]
+    for label, fn in cases:
+        best = min(timeit.repeat(fn, number=number, repeat=5, timer=time.process_time))
+        print(f"{label:<26} {best / number * 1e6:8.2f} µs/request")
+    print(security.token_cache_stats())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    bench(args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,11 @@ _pdf_dir = tempfile.mkdtemp()
 _uploads_dir = tempfile.mkdtemp()
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
 os.environ["PDF_STORAGE_PATH"] = _pdf_dir
+os.environ["DOCUMENT_STORAGE_PATH"] = _uploads_dir
 os.environ["ENVIRONMENT"] = "test"
+os.environ["PDF_RENDER_WORKERS"] = "0"  # render on the thread pool; tests opt into processes
+os.environ["BCRYPT_ROUNDS"] = "4"  # bcrypt minimum; keeps password tests fast
+os.environ["RATE_LIMIT_BACKEND"] = "memory"  # per-process stand-in for the shared counters
 
 # Patch os.makedirs to avoid PermissionError for /app/* at import time
 _original_makedirs = os.makedirs
@@ -44,12 +48,19 @@ def _sqlite_engine(url, **kwargs):
 
 _sqla_async.create_async_engine = _sqlite_engine
 
+import json  # noqa: E402
+
+import httpx  # noqa: E402
 import pytest  # noqa: E402
 import pytest_asyncio  # noqa: E402
 from httpx import AsyncClient, ASGITransport  # noqa: E402
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
 
 import app.database as _db_module  # noqa: E402
+from app.core import user_cache  # noqa: E402
+from app.core import rate_limit  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services import ocr_client  # noqa: E402
 from app.database import Base, get_db  # noqa: E402
 from app.main import app  # noqa: E402
 
@@ -57,13 +68,13 @@ from app.main import app  # noqa: E402
 _sqla_async.create_async_engine = _original_cae
 os.makedirs = _original_makedirs
 
-# Patch the hardcoded UPLOADS_DIR in bills module to use a temp dir
-import app.api.bills as _bills_module  # noqa: E402
-_bills_module.UPLOADS_DIR = _uploads_dir
-
 
 @pytest_asyncio.fixture(scope="function")
 async def db_engine():
+    # Every test starts with a fresh database, so ids are reused
+    user_cache.clear()
+    # ... and with fresh rate-limit counters, since all test requests share one client IP
+    rate_limit.set_limiter(None)
     engine = _db_module.engine
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -90,3 +101,33 @@ async def client(db_session):
         yield ac
 
     app.dependency_overrides.clear()
+
+
+class MockOcrUpstream:
+    """Stand-in for the vision-model API behind app.services.ocr_client."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.responses: list[httpx.Response] = []
+
+    def reply(self, extracted: dict) -> None:
+        """Queue a successful messages response whose text is the given extraction."""
+        self.responses.append(httpx.Response(200, json={"content": [{"type": "text", "text": json.dumps(extracted)}]}))
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if not self.responses:
+            return httpx.Response(500, json={"error": "no mock response queued"})
+        return self.responses.pop(0)
+
+
+@pytest_asyncio.fixture
+async def ocr_upstream(monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OCR_RETRY_BASE_DELAY", 0)
+    upstream = MockOcrUpstream()
+    client = ocr_client.OcrClient(transport=httpx.MockTransport(upstream.handle))
+    ocr_client.set_client(client)
+    yield upstream
+    ocr_client.set_client(None)
+    await client.aclose()
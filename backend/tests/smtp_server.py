@@ -0,0 +1,81 @@
+"""
+Local SMTP stand-in for tests and benchmarks.
+
+Speaks just enough ESMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for
+aiosmtplib, without STARTTLS or AUTH, and records connections and messages.
+`latency` delays every reply, to make connection setup cost visible the
+way a remote server's round trips do.
+"""
+import asyncio
+from email import message_from_bytes
+from email.message import Message
+from typing import Optional
+
+
+class LocalSmtpServer:
+    def __init__(self, latency: float = 0.0, fail_after: Optional[int] = None, refuse: tuple[str, ...] = ()):
+        self.latency = latency
+        # Drop the connection after this many messages on it (tests reconnects)
+        self.fail_after = fail_after
+        # Recipients answered with 550 at RCPT
+        self.refuse = refuse
+        self.messages: list[Message] = []
+        self.connections = 0
+        self.host = "127.0.0.1"
+        self.port = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "LocalSmtpServer":
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> "LocalSmtpServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        sent_here = 0
+        try:
+            await self._reply(writer, "220 localhost ESMTP stand-in")
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith("EHLO"):
+                    await self._reply(writer, "250-localhost\r\n250-PIPELINING\r\n250 8BITMIME")
+                elif command.startswith("RCPT") and any(f"<{r.upper()}>" in command for r in self.refuse):
+                    await self._reply(writer, "550 No such user")
+                elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                    await self._reply(writer, "250 OK")
+                elif command == "DATA":
+                    if self.fail_after is not None and sent_here >= self.fail_after:
+                        writer.close()
+                        return
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    data = bytearray()
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    self.messages.append(message_from_bytes(bytes(data)))
+                    sent_here += 1
+                    await self._reply(writer, "250 OK queued")
+                elif command == "QUIT":
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,9 +1,11 @@
 """Tests for MietCheck authentication endpoints."""
+import bcrypt
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import select, update
 
 from app.models.user import User
+from app.core.security import password_needs_rehash, verify_password_async
 
 
 @pytest.mark.asyncio
@@ -82,6 +84,46 @@ async def test_login_verified_user_ok(client: AsyncClient, db_session):
     assert res.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_login_rehashes_password_with_changed_cost(client: AsyncClient, db_session):
+    """A hash made with another BCRYPT_ROUNDS is upgraded on successful login."""
+    old_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode()
+    db_session.add(User(email="rehash@test.de", name="Rehash", password_hash=old_hash, is_verified=True))
+    await db_session.commit()
+    assert password_needs_rehash(old_hash)
+
+    res = await client.post("/api/auth/login", json={
+        "email": "rehash@test.de",
+        "password": "password123",
+    })
+    assert res.status_code == 200
+
+    user = (await db_session.execute(select(User).where(User.email == "rehash@test.de"))).scalar_one()
+    assert user.password_hash != old_hash
+    assert not password_needs_rehash(user.password_hash)
+    assert await verify_password_async("password123", user.password_hash)
+
+
+@pytest.mark.asyncio
+async def test_login_of_unverified_account_does_not_rehash(client: AsyncClient, db_session, monkeypatch):
+    """A refused login does not pay for a new hash it could not store."""
+    import app.api.auth as auth_module
+
+    async def no_rehash(password):
+        raise AssertionError("rehashed for a refused login")
+
+    monkeypatch.setattr(auth_module, "hash_password_async", no_rehash)
+    old_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5)).decode()
+    db_session.add(User(email="unverified@test.de", name="Unverified", password_hash=old_hash, is_verified=False))
+    await db_session.commit()
+
+    res = await client.post("/api/auth/login", json={
+        "email": "unverified@test.de",
+        "password": "password123",
+    })
+    assert res.status_code == 403
+
+
 @pytest.mark.asyncio
 async def test_login_wrong_password(client: AsyncClient, db_session):
     """Wrong password returns 401."""
@@ -2,8 +2,9 @@
 Unit tests for the core bill_checker.py logic.
 These tests run without a database — they use simple mock objects.
 """
+import random
 from decimal import Decimal
-from datetime import date
+from datetime import date, timedelta
 
 import pytest
 
@@ -15,8 +16,19 @@ from app.core.bill_checker import (
     check_completeness,
     calculate_score,
     run_all_checks,
+    run_checks_batch,
+    affected_checks,
+    checks_read_contract,
+    register_check,
+    unregister_check,
+    registered_checks,
+    category_of,
+    Category,
+    CheckRule,
     REFERENCE_VALUES,
+    REFERENCE_TABLE,
     ILLEGAL_CATEGORIES,
+    ILLEGAL_TABLE,
 )
 
 
@@ -475,3 +487,272 @@ class TestRunAllChecks:
         assert isinstance(results, list)
         assert isinstance(score, int)
         assert 0 <= score <= 100
+
+
+class TestFusedMode:
+    def test_fused_matches_separate_passes(self):
+        """The single-pass scanner returns exactly what the chained checks return."""
+        rng = random.Random(42)
+        for _ in range(300):
+            bill, positions, contract = _random_bill_inputs(rng)
+            fused_positions = positions()
+            separate_positions = positions()
+            fused = run_all_checks(bill, fused_positions, contract)
+            separate = run_all_checks(bill, separate_positions, contract, fused=False)
+            assert fused == separate
+            assert _annotations(fused_positions) == _annotations(separate_positions)
+
+    def test_score_counts_every_severity(self):
+        """Errors and warnings from position and bill level rules all reach the score."""
+        bill = make_bill(
+            billing_period_end=date(2022, 12, 31),
+            received_date=date(2024, 2, 1),  # late → error
+            total_costs=Decimal("10.00"),  # sum mismatch → warning
+        )
+        contract = make_contract(heating_type="central")  # heating missing → warning
+        positions = [make_position(category="repair", name="Reparatur")]  # illegal → error
+        results, score = run_all_checks(bill, positions, contract)
+        assert score == calculate_score(results) == 100 - 2 * 20 - 3 * 5
+
+
+# ─── Rule registry ────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def temporary_check():
+    registered = []
+
+    def _register(rule):
+        registered.append(rule.check_type)
+        return register_check(rule)
+
+    yield _register
+    for check_type in registered:
+        unregister_check(check_type)
+
+
+class TestRuleRegistry:
+    def test_builtin_checks_registered_in_order(self):
+        assert [r.check_type for r in registered_checks()] == [
+            "math", "deadline", "plausibility", "legal", "completeness",
+        ]
+
+    def test_every_check_declares_its_reads(self):
+        for rule in registered_checks():
+            assert rule.reads, rule.check_type
+            assert all(f.split(".", 1)[0] in ("bill", "position", "contract") for f in rule.reads)
+
+    def test_tables_match_source_dicts(self):
+        for name, ref in REFERENCE_VALUES.items():
+            entry = REFERENCE_TABLE[category_of(name)]
+            assert (entry.low, entry.high) == (ref["low"], ref["high"])
+        for name, reason in ILLEGAL_CATEGORIES.items():
+            assert ILLEGAL_TABLE[category_of(name)] == reason
+        assert category_of("does_not_exist") == Category.OTHER
+
+    def test_new_check_runs_without_touching_run_all_checks(self, temporary_check):
+        def flag_cable_tv(pos, category, scan):
+            if category == Category.CABLE_TV:
+                return ("custom", "warning", f"Kabel: {pos.name}", "d", None)
+            return None
+
+        temporary_check(CheckRule(
+            check_type="custom",
+            reads=frozenset({"position.category", "position.name"}),
+            position_hook=flag_cable_tv,
+            ok_item=("custom", "ok", "t", "d", None),
+        ))
+        bill = make_bill()
+        contract = make_contract()
+        positions = [
+            make_position(category="heating"),
+            make_position(category="water_sewage", name="Wasser"),
+            make_position(category="cable_tv", name="Kabel-TV", tenant_amount=Decimal("30.00"),
+                          total_amount=Decimal("150.00")),
+        ]
+        results, score = run_all_checks(bill, positions, contract)
+        assert results[-1] == ("custom", "warning", "Kabel: Kabel-TV", "d", None)
+        assert score == 95
+        assert run_checks_batch([(bill, positions, contract)]) == [(results, score)]
+
+    def test_position_hook_skipped_when_inputs_missing(self, temporary_check):
+        seen = []
+        temporary_check(CheckRule(
+            check_type="needs_share",
+            reads=frozenset({"position.tenant_share_percent"}),
+            requires=("position.tenant_share_percent",),
+            position_hook=lambda pos, category, scan: seen.append(pos.name),
+        ))
+        positions = [
+            make_position(name="mit Anteil"),
+            make_position(name="ohne Anteil", tenant_share_percent=None),
+        ]
+        run_all_checks(make_bill(), positions, make_contract())
+        assert seen == ["mit Anteil"]
+
+    def test_requires_only_accepts_position_fields(self):
+        with pytest.raises(ValueError):
+            register_check(CheckRule(check_type="broken", reads=frozenset(), requires=("bill.total_costs",)))
+
+    def test_column_hook_runs_once_per_batch(self, temporary_check):
+        calls = []
+
+        def flag_cable_tv(columns, rows, scans):
+            calls.append(len(columns))
+            for row in rows:
+                if columns.category[row] == Category.CABLE_TV:
+                    yield row, ("custom", "warning", f"Kabel: {columns.name[row]}", "d", None)
+
+        temporary_check(CheckRule(
+            check_type="custom",
+            reads=frozenset({"position.category", "position.name"}),
+            column_hook=flag_cable_tv,
+            ok_item=("custom", "ok", "t", "d", None),
+        ))
+        contract = make_contract()
+        with_tv = [make_position(), make_position(category="cable_tv", name="Kabel-TV")]
+        without_tv = [make_position()]
+        results = run_checks_batch([(make_bill(), with_tv, contract), (make_bill(), without_tv, contract)])
+        assert calls == [3]
+        assert results[0][0][-1] == ("custom", "warning", "Kabel: Kabel-TV", "d", None)
+        assert results[1][0][-1] == ("custom", "ok", "t", "d", None)
+
+    def test_position_and_column_hook_are_exclusive(self):
+        with pytest.raises(ValueError):
+            register_check(CheckRule(
+                check_type="both",
+                reads=frozenset({"position.name"}),
+                position_hook=lambda pos, category, scan: None,
+                column_hook=lambda columns, rows, scans: (),
+            ))
+
+    def test_duplicate_check_type_rejected(self):
+        with pytest.raises(ValueError):
+            register_check(CheckRule(check_type="math", reads=frozenset()))
+
+    def test_contract_rules_skipped_without_contract(self):
+        """Without a contract, plausibility and completeness are skipped instead of crashing."""
+        results, _score = run_all_checks(make_bill(), [make_position()], None)
+        assert {r[0] for r in results} == {"math", "deadline", "legal"}
+
+
+class TestIncrementalChecks:
+    def test_affected_checks_follow_declared_reads(self):
+        assert affected_checks({"bill.received_date"}) == ("deadline",)
+        assert affected_checks({"bill.total_costs"}) == ("math",)
+        assert affected_checks({"contract.apartment_size_sqm"}) == ("plausibility",)
+        assert affected_checks({"bill.notes"}) == ()
+
+    def test_wildcard_matches_every_field_of_entity(self):
+        assert affected_checks({"position.*"}) == ("math", "plausibility", "legal", "completeness")
+
+    def test_checks_read_contract(self):
+        assert not checks_read_contract(("math", "deadline"))
+        assert checks_read_contract(("deadline", "completeness"))
+
+    def test_only_matches_full_run_for_selected_checks(self):
+        bill = make_bill(received_date=date(2025, 2, 1), total_costs=Decimal("900.00"))
+        positions = [make_position(), make_position(category="repair", name="Reparatur")]
+        contract = make_contract()
+        full, _score = run_all_checks(bill, positions, contract)
+        partial, score = run_all_checks(bill, positions, contract, only=("deadline", "legal"))
+        assert partial == [r for r in full if r[0] in ("deadline", "legal")]
+        assert score == calculate_score(partial)
+
+    def test_only_skips_annotations_of_other_checks(self):
+        pos = make_position(tenant_amount=Decimal("2000.00"), total_amount=Decimal("10000.00"))
+        pos.is_plausible = None
+        run_all_checks(make_bill(), [pos], make_contract(), only=("deadline",))
+        assert pos.is_plausible is None
+
+    def test_only_without_position_rules_does_not_read_positions(self):
+        """A deadline-only run (received_date edited) never touches the positions."""
+        results, _score = run_all_checks(make_bill(), [object()], make_contract(), only=("deadline",))
+        assert [r[0] for r in results] == ["deadline"]
+
+    def test_only_rejected_in_reference_mode(self):
+        with pytest.raises(ValueError):
+            run_all_checks(make_bill(), [], make_contract(), fused=False, only=("math",))
+
+
+# ─── run_checks_batch ─────────────────────────────────────────────────────────
+
+def _random_bill_inputs(rng: random.Random):
+    """Build a bill, positions and contract with a mix of clean and faulty values."""
+    period_end = date(2022, 12, 31) + timedelta(days=rng.randint(0, 400))
+    received = rng.choice([None, period_end + timedelta(days=rng.randint(30, 500))])
+    total_costs = rng.choice([None, Decimal(rng.randint(100, 3000))])
+    bill = make_bill(billing_period_end=period_end, received_date=received, total_costs=total_costs)
+    contract = make_contract(
+        apartment_size_sqm=rng.choice([Decimal("0"), Decimal("45.50"), Decimal("80")]),
+        heating_type=rng.choice(["central", "individual"]),
+    )
+    categories = list(REFERENCE_VALUES) + list(ILLEGAL_CATEGORIES) + ["other"]
+    seed = rng.random()
+
+    def positions():
+        # Fresh objects on every call so both paths annotate their own copies
+        local = random.Random(seed)
+        out = []
+        for i in range(local.randint(0, 8)):
+            total = Decimal(local.randint(50, 5000))
+            share = local.choice([None, Decimal("20.00"), Decimal("33.33")])
+            amount = local.choice([
+                None,
+                (total * (share or Decimal("20")) / 100).quantize(Decimal("0.01")),
+                Decimal(local.randint(10, 2000)),
+            ])
+            out.append(make_position(
+                name=f"Pos {i}",
+                category=local.choice(categories),
+                total_amount=total,
+                tenant_share_percent=share,
+                tenant_amount=amount,
+            ))
+        return out
+
+    return bill, positions, contract
+
+
+def _annotations(positions):
+    return [(p.is_allowed, p.is_plausible, p.reference_value_low, p.reference_value_high) for p in positions]
+
+
+class TestRunChecksBatch:
+    def test_matches_per_bill_path(self):
+        """Batch output, scores and position annotations equal run_all_checks()."""
+        rng = random.Random(1234)
+        cases = [_random_bill_inputs(rng) for _ in range(300)]
+
+        expected, expected_annotations = [], []
+        batch_input, batch_positions = [], []
+        for bill, positions, contract in cases:
+            single = positions()
+            expected.append(run_all_checks(bill, single, contract))
+            expected_annotations.append(_annotations(single))
+            batched = positions()
+            batch_input.append((bill, batched, contract))
+            batch_positions.append(batched)
+
+        results = run_checks_batch(batch_input)
+
+        assert results == expected
+        assert [_annotations(p) for p in batch_positions] == expected_annotations
+
+    def test_empty_batch(self):
+        assert run_checks_batch([]) == []
+
+    def test_spans_several_column_blocks(self, monkeypatch):
+        import app.core.bill_checker as bill_checker
+
+        monkeypatch.setattr(bill_checker, "BATCH_BLOCK_ROWS", 4)
+        rng = random.Random(99)
+        cases = [_random_bill_inputs(rng) for _ in range(40)]
+        expected = [run_all_checks(bill, positions(), contract) for bill, positions, contract in cases]
+        assert run_checks_batch((bill, positions(), contract) for bill, positions, contract in cases) == expected
+
+    def test_preserves_input_order(self):
+        late = make_bill(billing_period_end=date(2021, 12, 31), received_date=date(2024, 1, 1))
+        clean = make_bill()
+        contract = make_contract()
+        results = run_checks_batch([(late, [], contract), (clean, [], contract)])
+        assert results[0][1] < results[1][1]
@@ -0,0 +1,54 @@
+"""Tests for syncing stored check results (app.services.bill_recheck)."""
+from app.models.check_result import CheckResult
+from app.models.utility_bill import UtilityBill
+from app.services.bill_recheck import apply_check_results
+
+
+def _stored_bill(items) -> UtilityBill:
+    bill = UtilityBill(id=1, check_score=100)
+    bill.check_results = [
+        CheckResult(id=index, bill_id=1, check_type=check_type, severity=severity,
+                    title=title, description=description, recommendation=recommendation)
+        for index, (check_type, severity, title, description, recommendation) in enumerate(items, start=1)
+    ]
+    return bill
+
+
+def _contents(bill: UtilityBill):
+    rows = sorted(bill.check_results, key=lambda cr: (cr.id is None, cr.id or 0))
+    return [(cr.check_type, cr.severity, cr.title) for cr in rows]
+
+
+STORED = [
+    ("math", "ok", "Rechnung ok", "d", None),
+    ("deadline", "ok", "Frist ok", "d", None),
+    ("plausibility", "ok", "Plausibel", "d", None),
+    ("legal", "ok", "Zulässig", "d", None),
+    ("completeness", "ok", "Vollständig", "d", None),
+]
+
+
+def test_results_stay_in_registry_order_when_a_check_grows():
+    bill = _stored_bill(STORED)
+    changed = apply_check_results(bill, [
+        ("math", "error", "Rechenfehler", "d", "r"),
+        ("math", "warning", "Summendifferenz", "d", "r"),
+    ], ("math",))
+
+    assert changed
+    assert _contents(bill) == [
+        ("math", "error", "Rechenfehler"),
+        ("math", "warning", "Summendifferenz"),
+        ("deadline", "ok", "Frist ok"),
+        ("plausibility", "ok", "Plausibel"),
+        ("legal", "ok", "Zulässig"),
+        ("completeness", "ok", "Vollständig"),
+    ]
+    assert bill.check_score == 100 - 20 - 5
+
+
+def test_unchanged_results_write_nothing():
+    bill = _stored_bill(STORED)
+    assert not apply_check_results(bill, STORED[1:2], ("deadline",))
+    assert not apply_check_results(bill, STORED)
+    assert [cr.id for cr in bill.check_results] == [1, 2, 3, 4, 5]
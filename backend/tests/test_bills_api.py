@@ -1,10 +1,17 @@
 """Tests for the bills API endpoint (integration tests)."""
+import json
+import os
+
+import httpx
 import pytest
-from datetime import date
+from datetime import date, datetime, timedelta
 from httpx import AsyncClient
-from sqlalchemy import update
+from sqlalchemy import select, update
 
+from app.api.bills import LIST_DEFAULT_LIMIT, _bill_response
+from app.config import settings
 from app.models.user import User
+from app.models.utility_bill import UtilityBill
 
 
 async def _make_verified_user(client: AsyncClient, db_session, email="tenant@test.de"):
@@ -235,3 +242,487 @@ async def test_check_finds_math_error(client: AsyncClient, db_session):
     check_results = res.json()["check_results"]
     math_errors = [r for r in check_results if r["check_type"] == "math" and r["severity"] == "error"]
     assert len(math_errors) >= 1
+
+
+@pytest.mark.asyncio
+async def test_patch_received_date_rechecks_only_deadline(client: AsyncClient, db_session):
+    """Changing received_date re-runs the deadline check; other result rows are left untouched."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    assert res.status_code == 201
+    before = res.json()
+    untouched = {r["id"]: r for r in before["check_results"] if r["check_type"] != "deadline"}
+
+    res = await client.patch(f"/api/bills/{before['id']}", json={"received_date": "2025-02-01"})
+    assert res.status_code == 200
+    after = res.json()
+
+    deadline = [r for r in after["check_results"] if r["check_type"] == "deadline"]
+    assert [r["severity"] for r in deadline] == ["error"]
+    assert {r["id"]: r for r in after["check_results"] if r["check_type"] != "deadline"} == untouched
+    assert after["check_score"] == before["check_score"] - 20
+
+
+@pytest.mark.asyncio
+async def test_patch_skips_recheck_beyond_free_tier(client: AsyncClient, db_session):
+    """Editing does not hand free users the rechecks POST /recheck refuses them."""
+    await _make_verified_user(client, db_session, email="admin@test.de")
+    await _make_verified_user(client, db_session, email="tenant@test.de")
+    contract_id = await _create_contract(client)
+    await client.post("/api/bills", json=_bill_payload(contract_id, 2023))
+    # A second bill of the same year, from a premium period that has ended
+    await db_session.execute(update(User).where(User.email == "tenant@test.de").values(subscription_tier="premium"))
+    await db_session.commit()
+    before = (await client.post("/api/bills", json=_bill_payload(contract_id, 2023))).json()
+    await db_session.execute(update(User).where(User.email == "tenant@test.de").values(subscription_tier="free"))
+    await db_session.commit()
+
+    assert (await client.post(f"/api/bills/{before['id']}/recheck")).status_code == 402
+
+    res = await client.patch(f"/api/bills/{before['id']}", json={"received_date": "2025-02-01"})
+    assert res.status_code == 200
+    after = res.json()
+    assert after["received_date"] == "2025-02-01"
+    assert after["status"] == "pending"
+    assert after["check_results"] == before["check_results"]
+    assert after["check_score"] == before["check_score"]
+
+
+@pytest.mark.asyncio
+async def test_patch_notes_keeps_check_results(client: AsyncClient, db_session):
+    """Fields no check reads do not trigger a re-check."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    before = res.json()
+
+    res = await client.patch(f"/api/bills/{before['id']}", json={"notes": "Widerspruch geplant"})
+    assert res.status_code == 200
+    assert res.json()["check_results"] == before["check_results"]
+    assert res.json()["check_score"] == before["check_score"]
+
+
+@pytest.mark.asyncio
+async def test_recheck_keeps_unchanged_rows(client: AsyncClient, db_session):
+    """A recheck without changes keeps the existing check_results rows and score."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    before = res.json()
+
+    res = await client.post(f"/api/bills/{before['id']}/recheck")
+    assert res.status_code == 200
+    assert res.json()["check_results"] == before["check_results"]
+    assert res.json()["check_score"] == before["check_score"]
+
+
+@pytest.mark.asyncio
+async def test_create_bill_response_matches_stored_bill(client: AsyncClient, db_session):
+    """The response built from the inserted rows equals a fresh read of the bill."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+
+    payload = _bill_payload(contract_id)
+    payload["positions"].append({
+        "category": "repair",
+        "name": "Reparatur Dach",
+        "total_amount": "100.00",
+        "tenant_share_percent": "20.00",
+        "tenant_amount": "20.00",
+    })
+    res = await client.post("/api/bills", json=payload)
+    assert res.status_code == 201
+    created = res.json()
+
+    assert [p["name"] for p in created["positions"]] == ["Heizkosten", "Wasser/Abwasser", "Reparatur Dach"]
+    assert [p["is_allowed"] for p in created["positions"]] == [True, True, False]
+    assert created["positions"][0]["reference_value_high"] is not None
+
+    res = await client.get(f"/api/bills/{created['id']}")
+    assert res.json() == created
+
+
+@pytest.mark.asyncio
+async def test_bill_response_refuses_lazy_loads(client: AsyncClient, db_session):
+    """Serializing a bill whose collections were not loaded raises instead of lazy-loading."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    bill_id = res.json()["id"]
+
+    db_session.expunge_all()
+    bill = (await db_session.execute(select(UtilityBill).where(UtilityBill.id == bill_id))).scalar_one()
+    with pytest.raises(RuntimeError, match="not loaded"):
+        await _bill_response(db_session, bill)
+
+
+@pytest.mark.asyncio
+async def test_bill_response_loads_missing_collections_in_production(client: AsyncClient, db_session, monkeypatch):
+    """In production a missing eager load is logged and loaded instead of failing the request."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    created = res.json()
+
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    db_session.expunge_all()
+    bill = (await db_session.execute(select(UtilityBill).where(UtilityBill.id == created["id"]))).scalar_one()
+    response = await _bill_response(db_session, bill)
+    assert response.model_dump(mode="json")["positions"] == created["positions"]
+
+
+async def _create_bills_at(client: AsyncClient, db_session, timestamps) -> list[int]:
+    """Create one bill per timestamp (premium user, so no free-tier limit) and pin created_at."""
+    await _make_verified_user(client, db_session)
+    await db_session.execute(update(User).values(subscription_tier="premium"))
+    await db_session.commit()
+    contract_id = await _create_contract(client)
+    ids = []
+    for created_at in timestamps:
+        res = await client.post("/api/bills", json=_bill_payload(contract_id))
+        assert res.status_code == 201
+        ids.append(res.json()["id"])
+        await db_session.execute(
+            update(UtilityBill).where(UtilityBill.id == ids[-1]).values(created_at=created_at)
+        )
+    await db_session.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_list_bills_keyset_pagination(client: AsyncClient, db_session):
+    """Pages follow (created_at, id) descending; ties on created_at are broken by id."""
+    same = datetime(2024, 3, 1, 12, 0, 0)
+    ids = await _create_bills_at(client, db_session, [
+        datetime(2024, 1, 1, 12, 0, 0), same, same, datetime(2024, 5, 1, 12, 0, 0), same,
+    ])
+    expected = [ids[3], ids[4], ids[2], ids[1], ids[0]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "include": ""}
+        if cursor:
+            params["cursor"] = cursor
+        res = await client.get("/api/bills", params=params)
+        assert res.status_code == 200
+        seen += [b["id"] for b in res.json()]
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_list_bills_default_page_size(client: AsyncClient, db_session):
+    """Without limit= the list is still paged, LIST_DEFAULT_LIMIT bills at a time."""
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    ids = await _create_bills_at(
+        client, db_session, [start + timedelta(minutes=i) for i in range(LIST_DEFAULT_LIMIT + 1)]
+    )
+
+    res = await client.get("/api/bills", params={"fields": "id", "include": ""})
+    assert [b["id"] for b in res.json()] == ids[:0:-1]
+    res = await client.get("/api/bills", params={"fields": "id", "include": "", "cursor": res.headers["x-next-cursor"]})
+    assert res.json() == [{"id": ids[0]}]
+    assert "x-next-cursor" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_list_bills_fields_and_include(client: AsyncClient, db_session):
+    """fields= projects the bill columns and include= selects the related rows."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    created = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()
+
+    res = await client.get("/api/bills", params={"fields": "billing_year,total_costs", "include": "check_results"})
+    assert res.status_code == 200
+    assert res.json() == [{
+        "billing_year": 2023,
+        "total_costs": created["total_costs"],
+        "check_results": created["check_results"],
+    }]
+
+    res = await client.get("/api/bills")
+    assert res.json() == [created]
+
+    res = await client.get("/api/bills", params={"fields": "password"})
+    assert res.status_code == 400
+    res = await client.get("/api/bills", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_download_check_report(client: AsyncClient, db_session):
+    """The report endpoint renders through the PDF render pool and returns a PDF."""
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+
+    res = await client.get(f"/api/bills/{bill_id}/report")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/pdf"
+    assert res.content.startswith(b"%PDF-")
+    assert res.headers["content-length"] == str(len(res.content))
+    assert res.headers["content-disposition"] == 'attachment; filename="pruefbericht_2023.pdf"'
+
+
+@pytest.mark.asyncio
+async def test_check_report_is_cached_until_recheck(client: AsyncClient, db_session):
+    """Repeat downloads reuse the cached render; a recheck drops it."""
+    from app.services import report_cache
+
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+
+    first = await client.get(f"/api/bills/{bill_id}/report")
+    etag = first.headers["etag"]
+    cached = report_cache.lookup(bill_id, etag.strip('"'))
+    assert cached is not None
+
+    second = await client.get(f"/api/bills/{bill_id}/report")
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+    res = await client.get(f"/api/bills/{bill_id}/report", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+
+    assert (await client.post(f"/api/bills/{bill_id}/recheck")).status_code == 200
+    assert report_cache.lookup(bill_id, etag.strip('"')) is None
+
+
+@pytest.mark.asyncio
+async def test_download_reports_zip(client: AsyncClient, db_session):
+    """All reports stream as one ZIP; billing_year and contract_id filter the entries."""
+    import io
+    import zipfile
+
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    ids = {}
+    for year in (2022, 2023):
+        res = await client.post("/api/bills", json=_bill_payload(contract_id, billing_year=year))
+        ids[year] = res.json()["id"]
+
+    res = await client.get("/api/bills/reports.zip")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(res.content)) as archive:
+        assert sorted(archive.namelist()) == sorted(f"pruefbericht_{y}_{i}.pdf" for y, i in ids.items())
+        for name in archive.namelist():
+            assert archive.read(name).startswith(b"%PDF-")
+
+    res = await client.get("/api/bills/reports.zip", params={"billing_year": 2022, "contract_id": contract_id})
+    with zipfile.ZipFile(io.BytesIO(res.content)) as archive:
+        assert archive.namelist() == [f"pruefbericht_2022_{ids[2022]}.pdf"]
+
+    res = await client.get("/api/bills/reports.zip", params={"contract_id": contract_id + 1})
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reports_zip_replaces_failed_render(client: AsyncClient, db_session, monkeypatch, tmp_path):
+    """A report that fails to render becomes a text entry; the other reports are still delivered."""
+    import io
+    import zipfile
+    from app.services import pdf_renderer
+
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    ids = {}
+    for year in (2022, 2023):
+        res = await client.post("/api/bills", json=_bill_payload(contract_id, billing_year=year))
+        ids[year] = res.json()["id"]
+
+    # Empty report cache, so both reports are rendered
+    monkeypatch.setattr(settings, "PDF_STORAGE_PATH", str(tmp_path))
+    render = pdf_renderer.render
+
+    async def failing_render(fn, **kwargs):
+        if kwargs["billing_year"] == 2022:
+            raise RuntimeError("renderer crashed")
+        return await render(fn, **kwargs)
+
+    monkeypatch.setattr(pdf_renderer, "render", failing_render)
+    res = await client.get("/api/bills/reports.zip")
+    assert res.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(res.content)) as archive:
+        assert sorted(archive.namelist()) == [
+            f"pruefbericht_2022_{ids[2022]}_fehler.txt", f"pruefbericht_2023_{ids[2023]}.pdf",
+        ]
+        assert archive.read(f"pruefbericht_2023_{ids[2023]}.pdf").startswith(b"%PDF-")
+
+
+@pytest.mark.asyncio
+async def test_reports_zip_renders_within_window(monkeypatch):
+    """Only one report per render worker is started before the client takes the next piece."""
+    from app.api import bills as bills_api
+
+    started = []
+
+    async def source(bill_id, key, report_inputs):
+        started.append(bill_id)
+        return b"%PDF-" + bytes(1000)
+
+    monkeypatch.setattr(bills_api, "_zip_entry_source", source)
+    monkeypatch.setattr(settings, "PDF_RENDER_WORKERS", 2)
+    stream = bills_api._stream_reports_zip([(f"{i}.pdf", i, "key", {}) for i in range(10)])
+
+    await stream.__anext__()
+    assert len(started) == 2
+    pieces = [piece async for piece in stream]
+    assert started == list(range(10))
+    assert pieces[-1]  # central directory
+
+
+@pytest.mark.asyncio
+async def test_reports_zip_closes_sources_when_client_leaves(monkeypatch):
+    """Stopping the stream waits for the entries in flight and closes cached reports never copied."""
+    import asyncio
+    from app.api import bills as bills_api
+
+    closed, started = [], []
+
+    class CachedReport:
+        def __init__(self, name):
+            self.name = name
+
+        async def close(self):
+            closed.append(self.name)
+
+    async def source(bill_id, key, report_inputs):
+        task = asyncio.current_task()
+        started.append(task)
+        if bill_id == 0:
+            return b"%PDF-"
+        await asyncio.sleep(0.01 if bill_id < 3 else 10)
+        return CachedReport(bill_id)
+
+    monkeypatch.setattr(bills_api, "_zip_entry_source", source)
+    monkeypatch.setattr(settings, "PDF_RENDER_WORKERS", 4)
+    stream = bills_api._stream_reports_zip([(f"{i}.pdf", i, "key", {}) for i in range(4)])
+
+    await stream.__anext__()
+    await asyncio.sleep(0.05)
+    await stream.aclose()
+    assert sorted(closed) == [1, 2]
+    assert all(task.done() for task in started)
+
+
+@pytest.mark.asyncio
+async def test_upload_document_replaces_file(client: AsyncClient, db_session, monkeypatch):
+    """Uploads land in the document store; oversized ones are refused without leftovers."""
+    import app.api.bills as bills_module
+    from app.services import document_store
+
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+
+    first = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("a.pdf", b"%PDF-1 first", "application/pdf")})
+    assert first.status_code == 200
+    second = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("b.pdf", b"%PDF-1 second", "application/pdf")})
+    key = second.json()["document_path"]
+    assert key != first.json()["document_path"]
+    res = await client.get(f"/api/bills/{bill_id}/document")
+    assert res.content == b"%PDF-1 second"
+    assert res.headers["content-type"] == "application/pdf"
+
+    store = document_store.get_store()
+    before = await store.list()
+    monkeypatch.setattr(bills_module, "MAX_FILE_SIZE", 8)
+    res = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("c.pdf", b"%PDF-1 too large", "application/pdf")})
+    assert res.status_code == 400
+    assert await store.list() == before
+    assert os.listdir(store.staging_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_ocr_extract_uses_pooled_client(client: AsyncClient, db_session, ocr_upstream):
+    """The extraction endpoint posts to the shared OCR client and returns the parsed JSON."""
+    await _make_verified_user(client, db_session)
+    ocr_upstream.responses.append(httpx.Response(503))
+    ocr_upstream.reply({"billing_year": 2023, "positions": []})
+
+    res = await client.post(
+        "/api/bills/ocr-extract",
+        files={"file": ("scan.png", b"\x89PNG\r\n\x1a\nfake", "image/png")},
+    )
+    assert res.status_code == 200
+    assert res.json() == {"billing_year": 2023, "positions": []}
+    assert len(ocr_upstream.requests) == 2
+    body = json.loads(ocr_upstream.requests[-1].content)
+    assert body["messages"][0]["content"][0]["source"]["media_type"] == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_ocr_extract_caches_identical_uploads(client: AsyncClient, db_session, ocr_upstream):
+    """Uploading the same bytes again is answered from the cache without an upstream call."""
+    await _make_verified_user(client, db_session)
+    ocr_upstream.reply({"billing_year": 2023, "positions": []})
+    ocr_upstream.reply({"billing_year": 2022, "positions": []})
+    scan = b"\x89PNG\r\n\x1a\nsame scan"
+
+    first = await client.post("/api/bills/ocr-extract", files={"file": ("a.png", scan, "image/png")})
+    again = await client.post("/api/bills/ocr-extract", files={"file": ("b.png", scan, "image/png")})
+    assert first.json() == again.json() == {"billing_year": 2023, "positions": []}
+    assert len(ocr_upstream.requests) == 1
+
+    other = await client.post("/api/bills/ocr-extract", files={"file": ("c.png", scan + b"!", "image/png")})
+    assert other.json()["billing_year"] == 2022
+    assert len(ocr_upstream.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_admin_recheck_bills_in_pages(client: AsyncClient, db_session):
+    """Each call re-checks one page; next_after_id leads through all checked bills."""
+    ids = await _create_bills_at(client, db_session, [datetime(2024, 1, 1, 12, 0, 0)] * 3)
+
+    pages, after_id = [], 0
+    while after_id is not None:
+        res = await client.post("/api/admin/recheck-bills", params={"after_id": after_id, "limit": 2})
+        assert res.status_code == 200
+        pages.append(res.json())
+        after_id = res.json()["next_after_id"]
+    assert [page["checked"] for page in pages] == [2, 1]
+    assert pages[0]["next_after_id"] == ids[1]
+
+
+@pytest.mark.asyncio
+async def test_admin_recheck_all_bills(client: AsyncClient, db_session, monkeypatch):
+    """A changed reference table reaches stored bills through the bulk recheck; a second run changes nothing."""
+    from decimal import Decimal
+    from app.core import bill_checker
+
+    await _make_verified_user(client, db_session)  # first user is admin
+    contract_id = await _create_contract(client)
+    res = await client.post("/api/bills", json=_bill_payload(contract_id))
+    before = res.json()
+
+    res = await client.post("/api/admin/recheck-bills")
+    assert res.json() == {"checked": 1, "changed": 0, "next_after_id": None}
+
+    # Heating reference lowered to 2 €/m²: 200 € on 60 m² becomes an error
+    table = list(bill_checker.REFERENCE_TABLE)
+    heating = table[bill_checker.Category.HEATING]
+    table[bill_checker.Category.HEATING] = heating._replace(
+        high=2.0, error_limit=3.0, high_decimal=Decimal("2.0"),
+    )
+    monkeypatch.setattr(bill_checker, "REFERENCE_TABLE", tuple(table))
+
+    res = await client.post("/api/admin/recheck-bills")
+    assert res.json() == {"checked": 1, "changed": 1, "next_after_id": None}
+    res = await client.post("/api/admin/recheck-bills")
+    assert res.json() == {"checked": 1, "changed": 0, "next_after_id": None}
+
+    after = (await client.get(f"/api/bills/{before['id']}")).json()
+    plausibility = [r["severity"] for r in after["check_results"] if r["check_type"] == "plausibility"]
+    assert plausibility == ["error", "warning"]  # heating now, water/sewage as before
+    assert after["check_score"] == before["check_score"] - 20
+    heating_position = next(p for p in after["positions"] if p["category"] == "heating")
+    assert heating_position["is_plausible"] is False
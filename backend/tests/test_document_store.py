@@ -0,0 +1,198 @@
+"""Tests for the content-addressed document store."""
+import hashlib
+import os
+import time
+from typing import AsyncIterator, Optional
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.utility_bill import UtilityBill
+from app.services import document_store
+from tests.test_bills_api import _bill_payload, _create_contract, _make_verified_user
+
+
+class MemoryDocumentStore(document_store.DocumentStore):
+    """Object-store stand-in: blobs live in a dict, there is no local path."""
+
+    def __init__(self, staging_dir: str):
+        self.staging_dir = staging_dir
+        self.blobs: dict[str, tuple[bytes, float]] = {}
+
+    async def put(self, source_path: str, key: str) -> None:
+        with open(source_path, "rb") as f:
+            data = f.read()
+        os.remove(source_path)
+        self.blobs[key] = (self.blobs.get(key, (data, 0))[0], time.time())
+
+    async def exists(self, key: str) -> bool:
+        return key in self.blobs
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        yield self.blobs[key][0]
+
+    async def delete(self, key: str, older_than: Optional[float] = None) -> bool:
+        if key not in self.blobs or (older_than is not None and self.blobs[key][1] >= older_than):
+            return False
+        del self.blobs[key]
+        return True
+
+    async def list(self) -> list[tuple[str, float]]:
+        return [(key, modified) for key, (_data, modified) in self.blobs.items()]
+
+
+def _staged(store: document_store.DocumentStore, data: bytes) -> tuple[str, str]:
+    path = os.path.join(store.staging_dir, f".{hashlib.md5(data).hexdigest()}.part")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path, document_store.blob_key(hashlib.sha256(data).hexdigest(), "application/pdf")
+
+
+def _age(store: document_store.LocalDocumentStore, key: str, seconds: float) -> None:
+    then = time.time() - seconds
+    os.utime(store.local_path(key), (then, then))
+
+
+@pytest.mark.asyncio
+async def test_local_store_deduplicates_into_fanout(tmp_path):
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    source, key = _staged(store, b"%PDF-1 scan")
+    await store.put(source, key)
+    again, same_key = _staged(store, b"%PDF-1 scan")
+    await store.put(again, same_key)
+
+    assert same_key == key
+    assert store.local_path(key) == str(tmp_path / key[:2] / key[2:4] / key)
+    assert [k for k, _modified in await store.list()] == [key]
+    assert os.listdir(store.staging_dir) == []
+    assert b"".join([chunk async for chunk in store.read(key)]) == b"%PDF-1 scan"
+
+
+def test_keys_are_validated(tmp_path):
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    assert not document_store.is_blob_key("/app/uploads/bill_1_abc.pdf")
+    with pytest.raises(ValueError):
+        store.local_path("../../etc/passwd")
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_only_old_unreferenced_blobs(client: AsyncClient, db_session, tmp_path):
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    keys = {}
+    for name in ("referenced", "orphan", "fresh_orphan"):
+        source, keys[name] = _staged(store, name.encode())
+        await store.put(source, keys[name])
+    _age(store, keys["referenced"], 2 * settings.DOCUMENT_GC_GRACE_SECONDS)
+    _age(store, keys["orphan"], 2 * settings.DOCUMENT_GC_GRACE_SECONDS)
+
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+    bill = await db_session.get(UtilityBill, bill_id)
+    bill.document_path = keys["referenced"]
+    await db_session.flush()
+
+    assert await document_store.sweep(db_session, store) == 1
+    remaining = {k for k, _modified in await store.list()}
+    assert remaining == {keys["referenced"], keys["fresh_orphan"]}
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_stale_staging_files(db_session, tmp_path):
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    stale, _key = _staged(store, b"crashed upload")
+    then = time.time() - 2 * settings.DOCUMENT_GC_GRACE_SECONDS
+    os.utime(stale, (then, then))
+    fresh, _key = _staged(store, b"upload in progress")
+
+    assert await document_store.sweep(db_session, store) == 0
+    assert os.listdir(store.staging_dir) == [os.path.basename(fresh)]
+
+
+def test_delete_keeps_blob_refreshed_by_concurrent_put(tmp_path, monkeypatch):
+    """A re-upload between the sweep's age check and its removal keeps the blob."""
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    source, key = _staged(store, b"%PDF-1 scan")
+    store._put(source, key)
+    _age(store, key, 2 * settings.DOCUMENT_GC_GRACE_SECONDS)
+    rename = os.rename
+
+    def rename_after_put(src, dst):
+        again, _key = _staged(store, b"%PDF-1 scan")
+        store._put(again, key)
+        rename(src, dst)
+
+    monkeypatch.setattr(document_store.os, "rename", rename_after_put)
+    assert not store._delete(key, older_than=time.time() - settings.DOCUMENT_GC_GRACE_SECONDS)
+    assert os.path.exists(store.local_path(key))
+    assert os.listdir(store.staging_dir) == []
+
+
+def test_put_stores_its_copy_when_sweep_removed_the_blob(tmp_path, monkeypatch):
+    """A blob deleted between a re-upload's checks is replaced, not reported as an error."""
+    store = document_store.LocalDocumentStore(str(tmp_path))
+    source, key = _staged(store, b"%PDF-1 scan")
+    store._put(source, key)
+    utime = os.utime
+
+    def utime_after_sweep(path, *args):
+        store._delete(key, older_than=None)
+        utime(path, *args)
+
+    monkeypatch.setattr(document_store.os, "utime", utime_after_sweep)
+    again, _key = _staged(store, b"%PDF-1 scan")
+    store._put(again, key)
+    with open(store.local_path(key), "rb") as f:
+        assert f.read() == b"%PDF-1 scan"
+    assert os.listdir(store.staging_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_blob(client: AsyncClient, db_session):
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    first = (await client.post("/api/bills", json=_bill_payload(contract_id, 2022))).json()["id"]
+    second = (await client.post("/api/bills", json=_bill_payload(contract_id, 2023))).json()["id"]
+    scan = b"%PDF-1 shared scan"
+    store = document_store.get_store()
+
+    for bill_id in (first, second):
+        res = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("scan.pdf", scan, "application/pdf")})
+        assert res.status_code == 200
+    paths = (await db_session.execute(
+        select(UtilityBill.document_path).where(UtilityBill.id.in_([first, second]))
+    )).scalars().all()
+    key = paths[0]
+    assert paths == [key, key]
+    assert [k for k, _modified in await store.list()].count(key) == 1
+
+    # Still referenced by the second bill after the first lets go
+    assert (await client.delete(f"/api/bills/{first}/upload")).status_code == 204
+    _age(store, key, 2 * settings.DOCUMENT_GC_GRACE_SECONDS)
+    await document_store.sweep(db_session)
+    assert await store.exists(key)
+
+    assert (await client.delete(f"/api/bills/{second}/upload")).status_code == 204
+    assert await document_store.sweep(db_session) >= 1
+    assert not await store.exists(key)
+
+
+@pytest.mark.asyncio
+async def test_download_streams_from_store_without_local_path(client: AsyncClient, db_session, tmp_path):
+    store = MemoryDocumentStore(str(tmp_path))
+    document_store.set_store(store)
+    try:
+        await _make_verified_user(client, db_session)
+        contract_id = await _create_contract(client)
+        bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+        res = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("scan.png", b"\x89PNG scan", "image/png")})
+        assert res.json()["document_path"].endswith(".png")
+
+        res = await client.get(f"/api/bills/{bill_id}/document")
+        assert res.status_code == 200
+        assert res.content == b"\x89PNG scan"
+        assert res.headers["content-type"] == "image/png"
+    finally:
+        document_store.set_store(None)
@@ -0,0 +1,110 @@
+"""Tests for ranged, conditional file downloads."""
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core import downloads
+from tests.test_bills_api import _bill_payload, _create_contract, _make_verified_user
+
+DOCUMENT = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=0-9,20-29", None),  # multiple ranges: whole file
+    ("items=0-9", None),
+    ("bytes=abc", None),
+    ("bytes=9-0", None),
+])
+def test_parse_range(header, expected):
+    assert downloads.parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(downloads.RangeNotSatisfiable):
+        downloads.parse_range(header, 1000)
+
+
+async def _uploaded_bill(client: AsyncClient, db_session) -> tuple[int, str]:
+    await _make_verified_user(client, db_session)
+    contract_id = await _create_contract(client)
+    bill_id = (await client.post("/api/bills", json=_bill_payload(contract_id))).json()["id"]
+    res = await client.post(f"/api/bills/{bill_id}/upload", files={"file": ("scan.pdf", DOCUMENT, "application/pdf")})
+    return bill_id, res.json()["document_path"]
+
+
+@pytest.mark.asyncio
+async def test_document_download_ranges_and_conditionals(client: AsyncClient, db_session):
+    bill_id, key = await _uploaded_bill(client, db_session)
+    url = f"/api/bills/{bill_id}/document"
+
+    full = await client.get(url)
+    assert full.status_code == 200
+    assert full.content == DOCUMENT
+    etag = full.headers["etag"]
+    assert etag == f'"{key.split(".")[0]}"'
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = await client.get(url, headers={"Range": "bytes=1000-1999"})
+    assert part.status_code == 206
+    assert part.content == DOCUMENT[1000:2000]
+    assert part.headers["content-range"] == f"bytes 1000-1999/{len(DOCUMENT)}"
+
+    resumed = await client.get(url, headers={"Range": "bytes=5000-", "If-Range": etag})
+    assert resumed.status_code == 206
+    assert resumed.content == DOCUMENT[5000:]
+
+    changed = await client.get(url, headers={"Range": "bytes=5000-", "If-Range": '"other"'})
+    assert changed.status_code == 200
+    assert changed.content == DOCUMENT
+
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+    since = await client.get(url, headers={"If-Modified-Since": full.headers["last-modified"]})
+    assert since.status_code == 304
+
+    beyond = await client.get(url, headers={"Range": f"bytes={len(DOCUMENT)}-"})
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(DOCUMENT)}"
+
+
+@pytest.mark.asyncio
+async def test_x_accel_redirect_hands_file_to_nginx(client: AsyncClient, db_session, monkeypatch):
+    bill_id, key = await _uploaded_bill(client, db_session)
+    monkeypatch.setattr(settings, "X_ACCEL_REDIRECT", True)
+
+    res = await client.get(f"/api/bills/{bill_id}/document")
+    assert res.status_code == 200
+    assert res.content == b""
+    assert res.headers["x-accel-redirect"] == f"/_protected/documents/{key[:2]}/{key[2:4]}/{key}"
+    assert res.headers["content-type"] == "application/pdf"
+    assert "abrechnung_" in res.headers["content-disposition"]
+
+
+async def _send_through(response: downloads.RangedFileResponse, method: str = "GET") -> list[dict]:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await response({"type": "http", "method": method}, None, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_ranged_file_response_sends_the_range_in_chunks(tmp_path, monkeypatch):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(DOCUMENT)
+    monkeypatch.setattr(downloads, "CHUNK_SIZE", 8)
+
+    sent = await _send_through(downloads.RangedFileResponse(str(path), len(DOCUMENT), 206, {}, offset=10, count=20))
+    assert dict(sent[0]["headers"])[b"content-length"] == b"20"
+    assert [len(m["body"]) for m in sent[1:]] == [8, 8, 4, 0]
+    assert b"".join(m["body"] for m in sent[1:]) == DOCUMENT[10:30]
+
+    head = await _send_through(downloads.RangedFileResponse(str(path), len(DOCUMENT), 200, {}), method="HEAD")
+    assert head[1:] == [{"type": "http.response.body", "body": b"", "more_body": False}]
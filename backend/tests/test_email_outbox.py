@@ -0,0 +1,126 @@
+"""Tests for the transactional email outbox."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.email_log import EmailLog
+from app.services import email_outbox, email_service
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    """Records delivered messages; set `fail` to an exception to make delivery fail."""
+
+    class FakeSmtp:
+        sent = []
+        fail = None
+
+    async def deliver_many(messages):
+        if FakeSmtp.fail is not None:
+            return [FakeSmtp.fail] * len(messages)
+        FakeSmtp.sent.extend(messages)
+        return [None] * len(messages)
+
+    monkeypatch.setattr(email_service, "deliver_many", deliver_many)
+    return FakeSmtp
+
+
+async def _queued(db_session) -> list[EmailLog]:
+    return (await db_session.execute(select(EmailLog).order_by(EmailLog.id))).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_register_queues_mail_without_smtp(client: AsyncClient, db_session, smtp):
+    res = await client.post("/api/auth/register", json={
+        "email": "neu@test.de", "name": "Neu", "password": "sicheres-passwort",
+    })
+    assert res.status_code in (200, 201)
+    assert smtp.sent == []
+
+    rows = await _queued(db_session)
+    assert [row.subject for row in rows] == ["E-Mail verifizieren – MietCheck", "Willkommen bei MietCheck!"]
+    assert all(row.status == "pending" and row.to_email == "neu@test.de" for row in rows)
+
+    assert await email_outbox.dispatch_once(db_session) == 2
+    assert [msg["Subject"] for msg in smtp.sent] == [row.subject for row in rows]
+    assert {row.status for row in await _queued(db_session)} == {"sent"}
+    assert await email_outbox.dispatch_once(db_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_with_backoff(db_session, smtp, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 2)
+    email_outbox.enqueue(db_session, "a@test.de", "Betreff", "<p>Hallo</p>")
+    await db_session.commit()
+
+    smtp.fail = ConnectionError("connection refused")
+    assert await email_outbox.dispatch_once(db_session) == 1
+    (row,) = await _queued(db_session)
+    assert (row.status, row.attempts, row.error) == ("pending", 1, "connection refused")
+    assert row.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+    # Not due yet
+    assert await email_outbox.dispatch_once(db_session) == 0
+
+    row.next_attempt_at = datetime.now(timezone.utc)
+    await db_session.commit()
+    assert await email_outbox.dispatch_once(db_session) == 1
+    assert (row.status, row.attempts) == ("failed", 2)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_claim_is_picked_up_after_lease(db_session, smtp):
+    row = email_outbox.enqueue(db_session, "a@test.de", "Betreff", "<p>Hallo</p>")
+    # Claimed by a worker that died before sending
+    row.status = "sending"
+    row.attempts = 1
+    row.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+
+    assert await email_outbox.dispatch_once(db_session) == 1
+    assert (row.status, row.attempts) == ("sent", 2)
+    assert len(smtp.sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_abandoned_last_attempt_is_not_claimed_again(db_session, smtp, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+    row = email_outbox.enqueue(db_session, "a@test.de", "Betreff", "<p>Hallo</p>")
+    # Its worker died during the last allowed attempt
+    row.status = "sending"
+    row.attempts = 3
+    row.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db_session.commit()
+
+    assert await email_outbox.dispatch_once(db_session) == 0
+    assert (row.status, row.attempts, row.error) == ("failed", 3, "send abandoned")
+    assert smtp.sent == []
+
+
+def test_send_lease_must_cover_a_batch():
+    from pydantic import ValidationError
+    from app.config import Settings
+
+    Settings(EMAIL_OUTBOX_BATCH_SIZE=50, SMTP_POOL_SIZE=4, SMTP_TIMEOUT=30, EMAIL_SEND_LEASE_SECONDS=780)
+    with pytest.raises(ValidationError, match="EMAIL_SEND_LEASE_SECONDS"):
+        Settings(EMAIL_OUTBOX_BATCH_SIZE=50, SMTP_POOL_SIZE=4, SMTP_TIMEOUT=30, EMAIL_SEND_LEASE_SECONDS=300)
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_request_queues_nothing(db_session, smtp):
+    email_outbox.enqueue(db_session, "a@test.de", "Betreff", "<p>Hallo</p>")
+    await db_session.rollback()
+    assert await _queued(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_commit_wakes_dispatcher(db_session, monkeypatch):
+    monkeypatch.setattr(email_outbox, "_wakeup", asyncio.Event())
+    email_outbox.enqueue(db_session, "a@test.de", "Betreff", "<p>Hallo</p>")
+    assert not email_outbox._wakeup.is_set()
+    await db_session.commit()
+    assert email_outbox._wakeup.is_set()
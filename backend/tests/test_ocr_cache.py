@@ -0,0 +1,65 @@
+"""Tests for the OCR extraction cache."""
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.models.ocr_result import OcrResult
+from app.models.user import User
+from app.services import ocr_cache
+
+
+def _digest(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+@pytest.fixture
+async def user_id(db_session):
+    user = User(email="ocr@test.de", name="OCR", password_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    return user.id
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(db_session, user_id):
+    digest = _digest(b"scan")
+    await ocr_cache.store(db_session, user_id, digest, "model:v1", {"billing_year": 2023})
+    assert await ocr_cache.lookup(db_session, user_id, digest, "model:v1") == {"billing_year": 2023}
+    assert await ocr_cache.lookup(db_session, user_id, digest, "model:v2") is None
+
+    await db_session.execute(update(OcrResult).values(
+        created_at=datetime.now(timezone.utc) - timedelta(hours=settings.OCR_CACHE_TTL_HOURS + 1)
+    ))
+    assert await ocr_cache.lookup(db_session, user_id, digest, "model:v1") is None
+
+
+@pytest.mark.asyncio
+async def test_table_is_trimmed_to_newest_entries(db_session, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_CACHE_MAX_ENTRIES", 2)
+    for i in range(4):
+        await ocr_cache.store(db_session, user_id, _digest(bytes([i])), "model:v1", {"i": i})
+
+    assert (await db_session.execute(select(func.count()).select_from(OcrResult))).scalar() == 2
+    assert await ocr_cache.lookup(db_session, user_id, _digest(bytes([3])), "model:v1") == {"i": 3}
+    assert await ocr_cache.lookup(db_session, user_id, _digest(bytes([0])), "model:v1") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_store_of_same_scan_overwrites(db_session, db_engine, user_id):
+    """A row written by another request after our miss does not make store() fail."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    digest = _digest(b"scan")
+    await db_session.commit()
+    assert await ocr_cache.lookup(db_session, user_id, digest, "model:v1") is None
+
+    async with async_sessionmaker(db_engine, class_=AsyncSession)() as other:
+        await ocr_cache.store(other, user_id, digest, "model:v1", {"billing_year": 2022})
+        await other.commit()
+
+    await ocr_cache.store(db_session, user_id, digest, "model:v1", {"billing_year": 2023})
+    assert await ocr_cache.lookup(db_session, user_id, digest, "model:v1") == {"billing_year": 2023}
+    assert (await db_session.execute(select(func.count()).select_from(OcrResult))).scalar() == 1
@@ -0,0 +1,67 @@
+"""Tests for the pooled OCR upstream client."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import ocr_client
+
+
+@pytest.mark.asyncio
+async def test_retries_on_overload_then_succeeds(ocr_upstream):
+    ocr_upstream.responses += [httpx.Response(529), httpx.Response(429, headers={"retry-after": "0"})]
+    ocr_upstream.reply({"billing_year": 2023})
+
+    response = await ocr_client.get_client().create_message({"messages": []})
+    assert response.status_code == 200
+    assert len(ocr_upstream.requests) == 3
+    assert ocr_upstream.requests[0].headers["x-api-key"] == "test-key"
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(ocr_upstream, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_MAX_RETRIES", 2)
+    ocr_upstream.responses += [httpx.Response(503)] * 5
+
+    response = await ocr_client.get_client().create_message({"messages": []})
+    assert response.status_code == 503
+    assert len(ocr_upstream.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(ocr_upstream):
+    ocr_upstream.responses.append(httpx.Response(400))
+    response = await ocr_client.get_client().create_message({"messages": []})
+    assert response.status_code == 400
+    assert len(ocr_upstream.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_MAX_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def slow_upstream(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    client = ocr_client.OcrClient(transport=httpx.MockTransport(slow_upstream))
+    try:
+        await asyncio.gather(*(client.create_message({}) for _ in range(6)))
+    finally:
+        await client.aclose()
+    assert peak == 2
+
+
+def test_backoff_is_jittered_and_capped(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(settings, "OCR_RETRY_MAX_DELAY", 4.0)
+    delays = {ocr_client._backoff(10) for _ in range(20)}
+    assert len(delays) > 1
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert ocr_client._backoff(0, retry_after="30") == 4.0
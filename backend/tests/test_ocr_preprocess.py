@@ -0,0 +1,104 @@
+"""Tests for shrinking OCR uploads before the vision call."""
+import io
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.config import settings
+from app.services import ocr_preprocess
+
+COST_PAGE = [
+    "Betriebskostenabrechnung 2023",
+    "Grundsteuer 1.234,56 Umlage nach Wohnfläche Ihr Anteil 123,45",
+    "Müllabfuhr 880,00 Ihr Anteil 88,00",
+    "Wasser 2.100,00 Ihr Anteil 210,00",
+    "Summe 421,45 Vorauszahlung 400,00 Nachzahlung 21,45",
+]
+
+
+def _photo(size=(4000, 3000), orientation=None) -> bytes:
+    img = Image.effect_noise(size, 40).convert("RGB")
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+def _pdf(pages: list[list[str]]) -> bytes:
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for lines in pages:
+        for i, line in enumerate(lines):
+            c.drawString(72, 760 - i * 18, line)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def test_large_photo_is_downscaled_and_stripped():
+    photo = _photo(orientation=6)  # rotated 90° on the phone
+    prepared = ocr_preprocess.preprocess(photo, "image/jpeg")
+
+    assert prepared.media_type == "image/jpeg"
+    assert prepared.bytes_saved > 0
+    with Image.open(io.BytesIO(prepared.data)) as img:
+        assert max(img.size) == settings.OCR_IMAGE_MAX_EDGE
+        assert img.height > img.width  # orientation applied before the tag was dropped
+        assert not img.getexif()
+
+
+def test_small_clean_image_is_sent_unchanged():
+    buffer = io.BytesIO()
+    Image.new("L", (200, 100), 255).save(buffer, format="PNG")
+    png = buffer.getvalue()
+
+    prepared = ocr_preprocess.preprocess(png, "image/png")
+    assert prepared.data == png
+    assert prepared.media_type == "image/png"
+
+
+def test_undecodable_upload_is_sent_unchanged():
+    prepared = ocr_preprocess.preprocess(b"\x89PNG\r\n\x1a\nbroken", "image/png")
+    assert prepared.data == b"\x89PNG\r\n\x1a\nbroken"
+    assert prepared.bytes_saved == 0
+
+
+def test_pdf_is_trimmed_to_cost_table_pages():
+    cover = ["Sehr geehrte Mieterin, anbei erhalten Sie Ihre Abrechnung."]
+    legal = ["Hinweise zum Widerspruchsrecht nach § 556 BGB."]
+    pdf = _pdf([cover, COST_PAGE, legal, legal])
+
+    prepared = ocr_preprocess.preprocess(pdf, "application/pdf")
+    pages = PdfReader(io.BytesIO(prepared.data)).pages
+    assert len(pages) == 1
+    assert "Nachzahlung" in pages[0].extract_text()
+
+
+def test_scanned_pdf_keeps_leading_pages(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_PDF_MAX_PAGES", 2)
+    pdf = _pdf([[] for _ in range(4)])
+
+    prepared = ocr_preprocess.preprocess(pdf, "application/pdf")
+    assert len(PdfReader(io.BytesIO(prepared.data)).pages) == 2
+
+
+def test_short_pdf_is_sent_unchanged():
+    pdf = _pdf([COST_PAGE])
+    assert ocr_preprocess.preprocess(pdf, "application/pdf").data == pdf
+
+
+def test_stats_record_bytes_saved():
+    stats = ocr_preprocess.PreprocessStats()
+    stats.record(1000, 400, 0.01)
+    stats.record(500, 500, 0.01)
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["bytes_saved_total"] == 600
+    assert snapshot["bytes_saved_per_request_avg"] == 300
+    assert snapshot["bytes_saved_per_request_max"] == 600
@@ -0,0 +1,88 @@
+"""Tests for the bounded PDF render executor."""
+import asyncio
+import os
+import threading
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.services import pdf_renderer
+from app.services.pdf_service import generate_check_report_pdf, ReportItem, ReportPosition
+
+
+def _report_kwargs() -> dict:
+    return dict(
+        tenant_name="Test Mieter",
+        property_address="Teststraße 1, 10115 Berlin",
+        billing_year=2023,
+        billing_period_start="2023-01-01",
+        billing_period_end="2023-12-31",
+        check_score=80,
+        check_results=[ReportItem("warning", "Hohe Kosten", "Beschreibung", None)],
+        positions=[ReportPosition("Heizkosten", Decimal("1000.00"), Decimal("200.00"), True)],
+        total_costs="200.00",
+        result_amount="20.00",
+    )
+
+
+_release = threading.Event()
+
+
+def _blocking_render() -> str:
+    _release.wait(5)
+    return "done"
+
+
+@pytest.mark.asyncio
+async def test_render_in_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_RENDER_WORKERS", 1)
+    try:
+        pdf = await pdf_renderer.render(generate_check_report_pdf, **_report_kwargs())
+    finally:
+        pdf_renderer.shutdown()
+    assert pdf.startswith(b"%PDF-")
+
+
+@pytest.mark.asyncio
+async def test_queue_limit_rejects_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_RENDER_QUEUE_LIMIT", 2)
+    _release.clear()
+    running = [asyncio.create_task(pdf_renderer.render(_blocking_render)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    rejected_before = pdf_renderer.stats.rejected
+    with pytest.raises(pdf_renderer.RenderQueueFull) as exc_info:
+        await pdf_renderer.render(_blocking_render)
+    assert exc_info.value.retry_after >= 1
+    assert pdf_renderer.stats.rejected == rejected_before + 1
+
+    _release.set()
+    assert await asyncio.gather(*running) == ["done", "done"]
+    assert pdf_renderer.stats.snapshot()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_record_latency():
+    completed_before = pdf_renderer.stats.completed
+    await pdf_renderer.render(generate_check_report_pdf, **_report_kwargs())
+    snapshot = pdf_renderer.stats.snapshot()
+    assert snapshot["completed"] == completed_before + 1
+    assert snapshot["latency_ms_p50"] is not None
+    assert snapshot["render_ms_avg"] > 0
+
+
+def test_shared_fragments_survive_repeated_builds():
+    """Static header/footer flowables are copied per document, so multi-page reports build repeatedly."""
+    kwargs = _report_kwargs()
+    kwargs["positions"] = [ReportPosition(f"Position {i}", Decimal("10.00"), None, True) for i in range(300)]
+    sizes = {len(generate_check_report_pdf(**kwargs)) for _ in range(3)}
+    assert len(sizes) == 1
+
+
+def test_check_report_is_rendered_in_memory():
+    before = set(os.listdir(settings.PDF_STORAGE_PATH)) if os.path.isdir(settings.PDF_STORAGE_PATH) else set()
+    pdf = generate_check_report_pdf(**_report_kwargs())
+    assert pdf.startswith(b"%PDF-")
+    after = set(os.listdir(settings.PDF_STORAGE_PATH)) if os.path.isdir(settings.PDF_STORAGE_PATH) else set()
+    assert after == before
@@ -0,0 +1,68 @@
+"""Tests for the sliding-window rate limiter."""
+import pytest
+from httpx import AsyncClient
+
+from app.core.rate_limit import DatabaseBackend, MemoryBackend, RateLimiter, retry_after
+
+WINDOW = 900
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_slides_into_next_window():
+    backend = MemoryBackend(max_keys=10)
+    for _ in range(3):
+        counts = await backend.hit("k", WINDOW, now=10 * WINDOW + 5)
+    assert counts == (3, 0)
+    assert await backend.hit("k", WINDOW, now=11 * WINDOW + 5) == (1, 3)
+    # A gap of more than one window forgets everything
+    assert await backend.hit("k", WINDOW, now=13 * WINDOW) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recent_keys():
+    backend = MemoryBackend(max_keys=2)
+    await backend.hit("a", WINDOW, now=0)
+    await backend.hit("b", WINDOW, now=0)
+    await backend.hit("a", WINDOW, now=0)
+    await backend.hit("c", WINDOW, now=0)
+    assert len(backend) == 2
+    assert await backend.hit("b", WINDOW, now=0) == (1, 0)  # "b" was evicted, not "a"
+
+
+def test_retry_after_weights_previous_window():
+    # 10 hits last window, at a quarter into this one 7.5 still count
+    assert retry_after(count=2, prev_count=10, limit=10, window=WINDOW, now=WINDOW / 4) is None
+    wait = retry_after(count=4, prev_count=10, limit=10, window=WINDOW, now=WINDOW / 4)
+    # allowed once 10 * (1 - f) + 4 + 1 <= 10, i.e. at f = 0.5
+    assert wait == WINDOW / 4
+    # Over the limit within this window: wait into the next one
+    assert retry_after(count=11, prev_count=0, limit=10, window=WINDOW, now=0) > WINDOW
+
+
+@pytest.mark.asyncio
+async def test_database_backend_shares_counters(db_engine):
+    worker_a, worker_b = DatabaseBackend(db_engine), DatabaseBackend(db_engine)
+    assert await worker_a.hit("auth:1.2.3.4", WINDOW, now=5 * WINDOW) == (1, 0)
+    assert await worker_b.hit("auth:1.2.3.4", WINDOW, now=5 * WINDOW + 1) == (2, 0)
+    assert await worker_a.hit("auth:1.2.3.4", WINDOW, now=6 * WINDOW) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_limiter_falls_back_when_backend_fails():
+    class Broken:
+        async def hit(self, key, window, now):
+            raise ConnectionError("database down")
+
+    limiter = RateLimiter(Broken(), fallback=MemoryBackend(max_keys=10))
+    assert await limiter.hit("k", limit=1, window=WINDOW) is None
+    assert await limiter.hit("k", limit=1, window=WINDOW) is not None
+
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited(client: AsyncClient):
+    for _ in range(10):
+        res = await client.post("/api/auth/login", json={"email": "x@test.de", "password": "wrongpass"})
+        assert res.status_code == 401
+    res = await client.post("/api/auth/login", json={"email": "x@test.de", "password": "wrongpass"})
+    assert res.status_code == 429
+    assert int(res.headers["retry-after"]) > 0
@@ -0,0 +1,42 @@
+"""Tests for the rendered report cache."""
+import os
+
+from app.config import settings
+from app.services import report_cache
+
+
+def _render(size: int) -> bytes:
+    return b"x" * size
+
+
+def test_key_depends_on_inputs():
+    inputs = {"tenant_name": "Max", "check_score": 80, "positions": [("Wasser", "12.50", None, True)]}
+    assert report_cache.report_key(inputs) == report_cache.report_key(dict(inputs))
+    assert report_cache.report_key(inputs) != report_cache.report_key({**inputs, "check_score": 81})
+
+
+def test_store_replaces_older_renders_of_the_bill():
+    report_cache.store(901, "a" * 64, _render(10))
+    path = report_cache.store(901, "b" * 64, _render(10))
+    assert report_cache.lookup(901, "a" * 64) is None
+    assert report_cache.lookup(901, "b" * 64) == path
+
+    report_cache.invalidate(901)
+    assert report_cache.lookup(901, "b" * 64) is None
+
+
+def test_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_CACHE_MAX_BYTES", 250)
+    for bill_id in (911, 912):
+        report_cache.store(bill_id, "c" * 64, _render(100))
+        path = report_cache.lookup(bill_id, "c" * 64)
+        os.utime(path, (bill_id, bill_id))
+    # Serving 911 makes 912 the oldest entry
+    report_cache.lookup(911, "c" * 64)
+
+    report_cache.store(913, "c" * 64, _render(100))
+    assert report_cache.lookup(912, "c" * 64) is None
+    assert report_cache.lookup(911, "c" * 64) is not None
+    assert report_cache.lookup(913, "c" * 64) is not None
+    for bill_id in (911, 913):
+        report_cache.invalidate(bill_id)
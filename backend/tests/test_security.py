@@ -0,0 +1,58 @@
+"""Tests for token handling in app.core.security."""
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+
+from app.config import settings
+from app.core import security
+
+
+def _token(exp: datetime, type_: str = "access") -> str:
+    return jwt.encode(
+        {"sub": "7", "role": "member", "type": type_, "exp": exp},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM,
+    )
+
+
+def test_decode_access_token_is_cached():
+    security.clear_token_cache()
+    token = security.create_access_token(7, "member")
+    before = security.token_cache_stats()
+
+    first = security.decode_access_token(token)
+    second = security.decode_access_token(token)
+    assert first.sub == 7 and second is first
+
+    stats = security.token_cache_stats()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["size"] == 1
+
+
+def test_cached_token_expires_exactly(monkeypatch):
+    security.clear_token_cache()
+    exp = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=30)
+    token = _token(exp)
+    assert security.decode_access_token(token) is not None
+
+    monkeypatch.setattr(security.time, "time", lambda: exp.timestamp())
+    assert security.decode_access_token(token) is not None  # still valid in its last second
+    monkeypatch.setattr(security.time, "time", lambda: exp.timestamp() + 1)
+    assert security.decode_access_token(token) is None
+    assert security.token_cache_stats()["size"] == 0
+
+
+def test_invalid_tokens_are_not_cached():
+    security.clear_token_cache()
+    assert security.decode_access_token("not-a-token") is None
+    assert security.decode_access_token(_token(datetime.now(timezone.utc) + timedelta(minutes=5), "refresh")) is None
+    assert security.token_cache_stats()["size"] == 0
+
+
+def test_cache_is_bounded(monkeypatch):
+    security.clear_token_cache()
+    monkeypatch.setattr(settings, "TOKEN_CACHE_MAX_ENTRIES", 2)
+    tokens = [security.create_access_token(i, "member") for i in range(3)]
+    for token in tokens:
+        security.decode_access_token(token)
+    assert security.token_cache_stats()["size"] == 2
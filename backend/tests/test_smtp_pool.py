@@ -0,0 +1,88 @@
+"""Tests for the pooled SMTP sessions, against a local SMTP stand-in."""
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.email_log import EmailLog
+from app.services import email_outbox, email_service, smtp_pool
+from tests.smtp_server import LocalSmtpServer
+
+
+@pytest.fixture
+async def server(monkeypatch):
+    async with LocalSmtpServer() as server:
+        monkeypatch.setattr(settings, "SMTP_HOST", server.host)
+        monkeypatch.setattr(settings, "SMTP_PORT", server.port)
+        monkeypatch.setattr(settings, "SMTP_USER", "")
+        monkeypatch.setattr(settings, "SMTP_PASSWORD", "")
+        monkeypatch.setattr(settings, "SMTP_TLS", False)
+        yield server
+        await smtp_pool.shutdown()
+
+
+def _messages(n: int) -> list:
+    return [email_service.build_message(f"user{i}@test.de", f"Betreff {i}", f"<p>{i}</p>") for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_send_many_reuses_sessions(server):
+    pool = smtp_pool.SmtpPool(size=3)
+    errors = await pool.send_many(_messages(20))
+    await pool.close()
+
+    assert errors == [None] * 20
+    assert len(server.messages) == 20
+    assert server.connections <= 3
+    assert pool.stats()["connections_opened"] == server.connections
+
+
+@pytest.mark.asyncio
+async def test_session_is_replaced_after_max_messages(server, monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_MAX_MESSAGES_PER_CONNECTION", 5)
+    pool = smtp_pool.SmtpPool(size=1)
+    await pool.send_many(_messages(12))
+    await pool.close()
+
+    assert len(server.messages) == 12
+    assert server.connections == 3
+
+
+@pytest.mark.asyncio
+async def test_refused_recipient_keeps_the_session(server):
+    import aiosmtplib
+
+    server.refuse = ("user1@test.de",)
+    pool = smtp_pool.SmtpPool(size=1)
+    errors = await pool.send_many(_messages(4))
+    await pool.close()
+
+    assert isinstance(errors[1], aiosmtplib.SMTPRecipientsRefused)
+    assert [e is None for i, e in enumerate(errors) if i != 1] == [True] * 3
+    assert len(server.messages) == 3
+    assert server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_retried_on_a_new_session(server):
+    server.fail_after = 2
+    pool = smtp_pool.SmtpPool(size=1)
+    errors = await pool.send_many(_messages(5))
+    await pool.close()
+
+    assert errors == [None] * 5
+    assert len(server.messages) == 5
+    assert pool.reconnects == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_mail_goes_out_through_the_pool(db_session, server):
+    recipients = [f"mieter{i}@test.de" for i in range(10)]
+    email_outbox.enqueue_bulk(db_session, recipients, "Neuigkeiten", "<p>Hallo</p>", "Hallo")
+    await db_session.commit()
+
+    assert await email_outbox.dispatch_once(db_session) == 10
+
+    rows = (await db_session.execute(select(EmailLog))).scalars().all()
+    assert {row.status for row in rows} == {"sent"}
+    assert sorted(msg["To"] for msg in server.messages) == recipients
+    assert server.connections <= settings.SMTP_POOL_SIZE
@@ -0,0 +1,67 @@
+"""Tests for chunked upload intake."""
+import hashlib
+import os
+import tempfile
+import tracemalloc
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.services import uploads
+
+MB = 1024 * 1024
+
+
+def _upload(size: int) -> tuple[UploadFile, str]:
+    """An UploadFile backed by a file on disk, as Starlette hands over large uploads."""
+    spooled = tempfile.TemporaryFile()
+    block = os.urandom(MB)
+    digest = hashlib.sha256()
+    for offset in range(0, size, MB):
+        chunk = block[: min(MB, size - offset)]
+        spooled.write(chunk)
+        digest.update(chunk)
+    spooled.seek(0)
+    return UploadFile(spooled, filename="scan.pdf"), digest.hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_receive_streams_with_bounded_memory(tmp_path):
+    warm_up, _digest = _upload(1)  # first use starts aiofiles' worker thread
+    await uploads.receive(warm_up, str(tmp_path), MB, "warm_up.pdf")
+    os.remove(tmp_path / "warm_up.pdf")
+    upload, digest = _upload(8 * MB)
+
+    tracemalloc.start()
+    try:
+        received = await uploads.receive(upload, str(tmp_path), 10 * MB, "bill.pdf")
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < MB // 2  # a few chunks, not the 8 MB document
+    assert received.size == 8 * MB
+    assert received.sha256 == digest
+    assert received.path == str(tmp_path / "bill.pdf")
+    assert os.listdir(tmp_path) == ["bill.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_receive_aborts_over_limit(tmp_path):
+    upload, _digest = _upload(3 * MB)
+
+    with pytest.raises(uploads.UploadTooLarge):
+        await uploads.receive(upload, str(tmp_path), 1 * MB, "bill.pdf")
+    # Stopped right after the limit instead of draining the upload, and left nothing behind
+    assert upload.file.tell() <= 1 * MB + uploads.UPLOAD_CHUNK_SIZE
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_receive_rejects_declared_size_before_reading(tmp_path):
+    upload, _digest = _upload(2 * MB)
+    upload.size = 2 * MB
+
+    with pytest.raises(uploads.UploadTooLarge):
+        await uploads.receive(upload, str(tmp_path), 1 * MB)
+    assert upload.file.tell() == 0
@@ -0,0 +1,62 @@
+"""Tests for the authenticated-user cache behind get_current_user_claims."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.core import user_cache
+from app.models.user import User
+
+
+async def _register(client: AsyncClient, db_session, email="cache@test.de") -> int:
+    await client.post("/api/auth/register", json={
+        "email": email,
+        "name": "Cache",
+        "password": "password123",
+    })
+    return (await db_session.execute(select(User.id).where(User.email == email))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_claims_are_served_from_cache_until_invalidated(client: AsyncClient, db_session):
+    user_id = await _register(client, db_session)
+    assert (await client.get("/api/mietrecht/staedte")).status_code == 200
+    assert user_cache.get(user_id).email == "cache@test.de"
+
+    # Changed behind the cache's back: the snapshot is still used
+    await db_session.execute(update(User).where(User.id == user_id).values(is_active=False))
+    await db_session.commit()
+    assert (await client.get("/api/mietrecht/staedte")).status_code == 200
+
+    user_cache.invalidate(user_id)
+    assert (await client.get("/api/mietrecht/staedte")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_admin_patch_invalidates_cached_user(client: AsyncClient, db_session):
+    user_id = await _register(client, db_session)  # first user is admin
+    assert (await client.get("/api/mietrecht/staedte")).status_code == 200
+
+    res = await client.patch(f"/api/admin/users/{user_id}", json={"subscription_tier": "premium"})
+    assert res.status_code == 200
+    assert user_cache.get(user_id) is None
+
+    assert (await client.get("/api/mietrecht/staedte")).status_code == 200
+    assert user_cache.get(user_id).subscription_tier == "premium"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_repeats_after_commit(db_session):
+    claims = user_cache.CurrentUserClaims(1, "a@test.de", "A", "member", True, True, "free", None)
+    user_cache.invalidate(1, db_session)
+    # Re-cached by a concurrent request before the change is committed
+    user_cache.put(claims)
+    await db_session.commit()
+    assert user_cache.get(1) is None
+
+
+def test_entries_expire(monkeypatch):
+    claims = user_cache.CurrentUserClaims(2, "b@test.de", "B", "member", True, True, "free", None)
+    user_cache.put(claims)
+    assert user_cache.get(2) == claims
+    monkeypatch.setattr(user_cache.time, "monotonic", lambda: float("inf"))
+    assert user_cache.get(2) is None
@@ -15,7 +15,7 @@ export function CostBreakdownChart({ bills }: CostBreakdownChartProps) {
   // Aggregate positions by category across all bills
   const categoryMap = new Map<string, number>();
   for (const bill of bills) {
-    for (const pos of bill.positions) {
+    for (const pos of bill.positions ?? []) {
       const cat = pos.category || "Sonstiges";
       const amount = parseFloat(pos.tenant_amount || pos.total_amount || "0");
       categoryMap.set(cat, (categoryMap.get(cat) || 0) + amount);
@@ -30,6 +30,26 @@ async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
   return res.json();
 }
 
+// Follows the X-Next-Cursor header of a keyset-paginated list to its last page.
+async function requestAll<T>(path: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const sep = path.includes("?") ? "&" : "?";
+    const res = await fetch(
+      `${API_BASE}${path}${cursor ? `${sep}cursor=${encodeURIComponent(cursor)}` : ""}`,
+      { credentials: "include" },
+    );
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new ApiError(res.status, err.detail || `HTTP ${res.status}`);
+    }
+    items.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
+
 export const api = {
   // Auth
   login: (email: string, password: string) =>
@@ -78,7 +98,8 @@ export const api = {
   deleteContract: (id: number) => request<void>(`/contracts/${id}`, { method: "DELETE" }),
 
   // Bills
-  getBills: () => request<any[]>("/bills"),
+  // positions feed the dashboard's cost breakdown
+  getBills: () => requestAll<any>("/bills?limit=100&include=positions,check_results"),
   getBill: (id: number) => request<any>(`/bills/${id}`),
   createBill: (data: any) => request<any>("/bills", { method: "POST", body: JSON.stringify(data) }),
   updateBill: (id: number, data: any) => request<any>(`/bills/${id}`, { method: "PATCH", body: JSON.stringify(data) }),
@@ -102,6 +123,13 @@ export const api = {
   deleteBillDocument: (id: number) => request<void>(`/bills/${id}/upload`, { method: "DELETE" }),
   getBillDocumentUrl: (id: number) => `${API_BASE}/bills/${id}/document`,
   getBillReportUrl: (id: number) => `${API_BASE}/bills/${id}/report`,
+  getBillReportsZipUrl: (filter: { contractId?: number; billingYear?: number } = {}) => {
+    const params = new URLSearchParams();
+    if (filter.contractId !== undefined) params.set("contract_id", String(filter.contractId));
+    if (filter.billingYear !== undefined) params.set("billing_year", String(filter.billingYear));
+    const query = params.toString();
+    return `${API_BASE}/bills/reports.zip${query ? `?${query}` : ""}`;
+  },
   ocrExtractBill: (file: File) => {
     const form = new FormData();
     form.append("file", file);